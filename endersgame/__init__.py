@@ -1,9 +1,29 @@
 from endersgame.gameconfig import EPSILON, HORIZON
-from endersgame.accounting.pnl import DEFAULT_TRADE_BACKOFF
-from endersgame.mixins.historymixin import DEFAULT_HISTORY_LEN
-from endersgame.attackers.attacker import Attacker
-from endersgame.datasources.streamgenerator import stream_generator
-from endersgame.datasources.streamgeneratorgenerator import stream_generator_generator
-from endersgame.riverstats.fewmean import FEWMean
-from endersgame.riverstats.fewvar import FEWVar
-from endersgame.accounting.pnlutil import add_pnl_summaries, zero_pnl_summary
+
+# Everything else is imported on first use, so that `import endersgame` does not pull in river or requests
+_LAZY_ATTRIBUTES = {
+    'DEFAULT_TRADE_BACKOFF': 'endersgame.accounting.pnl',
+    'DEFAULT_HISTORY_LEN': 'endersgame.mixins.historymixin',
+    'Attacker': 'endersgame.attackers.attacker',
+    'stream_generator': 'endersgame.datasources.streamgenerator',
+    'stream_generator_generator': 'endersgame.datasources.streamgeneratorgenerator',
+    'FEWMean': 'endersgame.riverstats.fewmean',
+    'FEWVar': 'endersgame.riverstats.fewvar',
+    'add_pnl_summaries': 'endersgame.accounting.pnlutil',
+    'zero_pnl_summary': 'endersgame.accounting.pnlutil',
+}
+
+__all__ = ['EPSILON', 'HORIZON'] + list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module 'endersgame' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
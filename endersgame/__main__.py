@@ -0,0 +1,232 @@
+import argparse
+import csv
+import importlib
+import json
+import math
+import subprocess
+import sys
+from functools import partial
+import numpy as np
+from endersgame.gameconfig import HORIZON
+
+"""
+    Command line entry point, installed as `endersgame` (or run as `python -m endersgame`):
+
+        endersgame backtest endersgame.examples.macdattacker:MacdAttacker --file btc.csv --file eth.npy
+        endersgame backtest mypkg.mymodule:MyAttacker --kwargs '{"a": 0.02}' --stream-id 0 1 2 --workers 4
+        endersgame convert --stream-id 0 1 2 --directory ./npy
+        endersgame backtest mypkg.mymodule:MyAttacker --file ./npy/train/stream_0.npy --workers 4
+        endersgame benchmark
+
+    Results are printed (or written with --output) as JSON.
+"""
+
+IMPORT_TIME_BUDGET_MS = 250     # Regression budget for a cold `import endersgame`, numpy included
+DEFERRED_DEPENDENCIES = ['river', 'requests']   # Should not be imported by `import endersgame`
+
+
+def main(argv=None) -> int:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 1
+    try:
+        result = args.handler(args)
+    except (ImportError, AttributeError, ValueError, OSError) as e:
+        print(f'endersgame {args.command}: {e}', file=sys.stderr)
+        return 1
+    text = json.dumps(_finite(result), indent=2, default=_to_json, allow_nan=False)
+    if getattr(args, 'output', None):
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='endersgame', description='Evaluate and profile attackers')
+    subparsers = parser.add_subparsers(dest='command')
+
+    backtest = subparsers.add_parser('backtest', help='Score attackers over streams and print Pnl summaries')
+    backtest.add_argument('attackers', nargs='+', help='Attacker classes as module:Class or module.Class')
+    backtest.add_argument('--kwargs', default='{}', help='JSON dict of constructor arguments for every attacker')
+    backtest.add_argument('--file', action='append', default=[], help='Local .csv or .npy stream (repeatable)')
+    backtest.add_argument('--stream-id', type=int, nargs='*', default=[], help='Remote stream ids to download')
+    backtest.add_argument('--category', default='train', help='Category of remote streams')
+    backtest.add_argument('--cache-dir', default=None, help='Cache remote streams here (default: no cache)')
+    backtest.add_argument('--offline', action='store_true', help='Read remote streams only from the cache')
+    backtest.add_argument('--horizon', type=int, default=HORIZON)
+    backtest.add_argument('--chunk-size', type=int, default=None, help='Feed attackers chunks of this size')
+    backtest.add_argument('--max-points', type=int, default=None, help='Truncate each stream')
+    backtest.add_argument('--workers', type=int, default=0, help='Worker processes (0 runs in-process)')
+    backtest.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+    backtest.set_defaults(handler=backtest_command)
+
+    convert = subparsers.add_parser('convert', help='Save remote streams as .npy files for memory mapped replay')
+    convert.add_argument('--stream-id', type=int, nargs='+', required=True, help='Remote stream ids')
+    convert.add_argument('--category', default='train', help='Category of remote streams')
+    convert.add_argument('--directory', default=None, help='Where to write the .npy files')
+    convert.add_argument('--cache-dir', default=None, help='Read remote streams through this cache')
+    convert.add_argument('--offline', action='store_true', help='Read remote streams only from the cache')
+    convert.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+    convert.set_defaults(handler=convert_command)
+
+    benchmark = subparsers.add_parser('benchmark', help='Run the built-in throughput benchmarks')
+    benchmark.add_argument('--which', choices=['all', 'runner', 'microbatch', 'import'], default='all')
+    benchmark.add_argument('--num-points', type=int, default=200000, help='Points for the runner benchmark')
+    benchmark.add_argument('--num-streams', type=int, default=2000, help='Streams for the microbatch benchmark')
+    benchmark.add_argument('--output', default=None, help='Write JSON here instead of stdout')
+    benchmark.set_defaults(handler=benchmark_command)
+    return parser
+
+
+def backtest_command(args) -> dict:
+    from endersgame.runners.tournamentrunner import TournamentRunner
+    kwargs = json.loads(args.kwargs)
+    factories = {path: partial(import_attacker(path), **kwargs) if kwargs else import_attacker(path)
+                 for path in args.attackers}
+    names = list(args.file) + [f'{args.category}/{stream_id}' for stream_id in args.stream_id]
+    if not names:
+        raise ValueError('no streams given, use --file or --stream-id')
+    streams = [_npy_path_or_array(path) for path in args.file]
+    streams += [download_stream(stream_id=stream_id, category=args.category, max_points=args.max_points,
+                                cache=args.cache_dir, offline=args.offline)
+                for stream_id in args.stream_id]
+    runner = TournamentRunner(attacker_factories=factories, horizon=args.horizon, chunk_size=args.chunk_size,
+                              max_points_per_stream=args.max_points, max_workers=args.workers)
+    leaderboard = runner.run(streams=streams)
+    for entry in leaderboard:
+        entry['streams'] = dict(zip(names, entry['streams']))
+    return {'streams': names, 'elapsed_seconds': runner.elapsed_seconds, 'leaderboard': leaderboard}
+
+
+def convert_command(args) -> dict:
+    from endersgame.datasources.npystore import convert_stream, read_manifest, default_store_directory
+    directory = args.directory or default_store_directory()
+    paths = {f'{args.category}/{stream_id}': convert_stream(stream_id=stream_id, category=args.category,
+                                                            directory=directory, cache=args.cache_dir,
+                                                            offline=args.offline)
+             for stream_id in args.stream_id}
+    manifest = read_manifest(directory)
+    return {'directory': directory,
+            'streams': {key: {'path': path, 'length': manifest[key]['length']} for key, path in paths.items()}}
+
+
+def benchmark_command(args) -> dict:
+    result = {}
+    if args.which in ['all', 'runner']:
+        from endersgame.runners.forgetfulrunner import benchmark_overhead
+        result['runner'] = benchmark_overhead(num_points=args.num_points)
+    if args.which in ['all', 'microbatch']:
+        from endersgame.runners.microbatcher import benchmark_microbatching
+        result['microbatch'] = benchmark_microbatching(num_streams=args.num_streams)
+    if args.which in ['all', 'import']:
+        result['import'] = measure_import_time()
+    return result
+
+
+def measure_import_time(module: str = 'endersgame') -> dict:
+    """
+    Imports the module in a fresh interpreter with -X importtime.
+    :return: Cumulative import time, the slowest imports, and any deferred dependencies that were imported
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, check=True)
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    total_ms = timings[module][1] / 1000
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {'module': module,
+            'total_ms': total_ms,
+            'budget_ms': IMPORT_TIME_BUDGET_MS,
+            'within_budget': total_ms <= IMPORT_TIME_BUDGET_MS,
+            'slowest_self_ms': {name: self_us / 1000 for name, (self_us, _) in slowest},
+            'deferred_dependencies_imported': [name for name in DEFERRED_DEPENDENCIES if name in timings]}
+
+
+def import_attacker(path: str):
+    """
+    :param path:  'package.module:ClassName' or 'package.module.ClassName'
+    """
+    if ':' in path:
+        module_name, attr = path.split(':', 1)
+    elif '.' in path:
+        module_name, attr = path.rsplit('.', 1)
+    else:
+        raise ValueError(f'{path} is not of the form module:Class')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def load_stream(path: str) -> np.ndarray:
+    """
+    Reads a .npy array, or a CSV file with a 'value' column (or a single column of numbers, with or without header).
+    """
+    if path.endswith('.npy'):
+        return np.load(path).astype(np.float64).ravel()
+    with open(path, newline='') as f:
+        rows = [row for row in csv.reader(f) if row]
+    if not rows:
+        return np.zeros(0)
+    header = [name.strip().lower() for name in rows[0]]
+    if 'value' in header:
+        column = header.index('value')
+        rows = rows[1:]
+    else:
+        column = len(header) - 1
+        try:
+            float(rows[0][column])
+        except ValueError:
+            rows = rows[1:]
+    return np.array([float(row[column]) for row in rows], dtype=np.float64)
+
+
+def _npy_path_or_array(path: str):
+    """
+    Plain float64 .npy files are passed on as paths, so that workers memory map them rather than receive copies.
+    """
+    if path.endswith('.npy'):
+        mapped = np.load(path, mmap_mode='r')
+        if mapped.ndim == 1 and mapped.dtype == np.float64:
+            return path
+    return load_stream(path)
+
+
+def download_stream(stream_id: int, category: str = 'train', max_points: int = None, cache=None,
+                    offline: bool = False) -> np.ndarray:
+    from itertools import islice
+    from endersgame.datasources.streamgenerator import stream_generator
+    values = stream_generator(stream_id=stream_id, category=category, return_float=True, cache=cache, offline=offline)
+    return np.fromiter(islice(values, max_points), dtype=np.float64)
+
+
+def _finite(obj):
+    """
+    Replaces inf and nan (e.g. the win_loss_ratio of a run without losses) by None, as strict JSON has no such values.
+    """
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def _to_json(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+from typing import Dict, List
+import numpy as np
+from endersgame import EPSILON
+from endersgame.accounting.pnl import DEFAULT_TRADE_BACKOFF
+from endersgame.gameconfig import HORIZON
+
+_NEVER = -2 ** 62      # last_attack_ndx of streams that have not attacked
+
+
+class MultiStreamPnl:
+    """
+Pnl for many streams at once, with state held in arrays indexed by stream.
+- Scores decisions exactly as a separate Pnl per stream would, without per decision records.
+- Pending decisions live in a ring of max_horizon + 1 slots per stream, indexed by resolution index.
+- Resolved decisions are accumulated into per stream totals, from which summary() is computed.
+"""
+
+    def __init__(self, num_streams: int, epsilon: float = EPSILON, backoff: int = DEFAULT_TRADE_BACKOFF,
+                 max_horizon: int = HORIZON):
+        self.num_streams = num_streams
+        self.epsilon = epsilon
+        self.backoff = backoff
+        self.max_horizon = max_horizon
+        self.current_ndx = np.zeros(num_streams, dtype=np.int64)
+        self.last_attack_ndx = np.full(num_streams, _NEVER, dtype=np.int64)
+
+        ring_size = max_horizon + 1
+        self._pending_decision = np.zeros((num_streams, ring_size))
+        self._pending_anchor = np.zeros((num_streams, ring_size))
+
+        self.num_resolved = np.zeros(num_streams, dtype=np.int64)
+        self.total_profit = np.zeros(num_streams)
+        self.total_squared_profit = np.zeros(num_streams)
+        self.wins = np.zeros(num_streams, dtype=np.int64)
+        self.losses = np.zeros(num_streams, dtype=np.int64)
+        self._all = np.arange(num_streams)
+
+    def tick(self, xs, horizon: int = 0, decisions=None, ndxs=None):
+        """
+        Advances the streams ndxs (default: all, in which case xs has one value per stream) by one data point.
+        :param xs:         Data points, one per stream in ndxs
+        :param horizon:    Horizon of the decisions, at most max_horizon
+        :param decisions:  Decisions made at xs, or None for no decisions
+        :param ndxs:       Distinct stream indexes
+        """
+        ndxs = self._all if ndxs is None else np.asarray(ndxs, dtype=np.int64)
+        xs = np.asarray(xs, dtype=np.float64)
+        current = self.current_ndx[ndxs]
+        ring_size = self.max_horizon + 1
+
+        # Resolve decisions due now. A new decision never lands in this slot, as 0 < horizon < ring_size.
+        slots = current % ring_size
+        due = self._pending_decision[ndxs, slots]
+        resolving = np.flatnonzero(due)
+        if len(resolving):
+            streams, slots_due = ndxs[resolving], slots[resolving]
+            x, anchor = xs[resolving], self._pending_anchor[streams, slots_due]
+            pnl = np.where(due[resolving] > 0, x - anchor, anchor - x) - self.epsilon
+            self.num_resolved[streams] += 1
+            self.total_profit[streams] += pnl
+            self.total_squared_profit[streams] += pnl * pnl
+            self.wins[streams] += pnl > 0
+            self.losses[streams] += pnl < 0
+            self._pending_decision[streams, slots_due] = 0.
+
+        if decisions is not None:
+            decisions = np.asarray(decisions, dtype=np.float64)
+            attacking = np.flatnonzero(decisions)
+            if len(attacking):
+                if not 0 < horizon <= self.max_horizon:
+                    raise ValueError('Decisions need a horizon between 1 and max_horizon')
+                streams = ndxs[attacking]
+                current_attacking = current[attacking]
+                allowed = current_attacking - self.last_attack_ndx[streams] >= self.backoff
+                streams, current_attacking = streams[allowed], current_attacking[allowed]
+                target_slots = (current_attacking + horizon) % ring_size
+                if np.any(self._pending_decision[streams, target_slots]):
+                    raise ValueError('Two pending decisions resolve at the same index. Use a constant horizon.')
+                self._pending_decision[streams, target_slots] = decisions[attacking][allowed]
+                self._pending_anchor[streams, target_slots] = xs[attacking][allowed]
+                self.last_attack_ndx[streams] = current_attacking
+
+        self.current_ndx[ndxs] = current + 1
+
+    def is_backing_off(self, ndxs=None) -> np.ndarray:
+        """
+        Boolean array, True where a decision made now would be ignored.
+        """
+        ndxs = self._all if ndxs is None else ndxs
+        return self.current_ndx[ndxs] - self.last_attack_ndx[ndxs] < self.backoff
+
+    def num_pending(self) -> np.ndarray:
+        return np.count_nonzero(self._pending_decision, axis=1)
+
+    def summary(self, stream_ndx: int) -> Dict:
+        """Summary of one stream, with the same fields as Pnl.summary()."""
+        num_resolved = int(self.num_resolved[stream_ndx])
+        total_profit = float(self.total_profit[stream_ndx])
+        current_ndx = int(self.current_ndx[stream_ndx])
+        if num_resolved == 0:
+            return {
+                "current_ndx": current_ndx,
+                "num_resolved_decisions": 0,
+                "total_profit": 0,
+                "win_loss_ratio": None,
+                "average_profit_per_decision": None,
+                "avg_profit_per_decision_std_ratio": None
+            }
+
+        wins = int(self.wins[stream_ndx])
+        losses = int(self.losses[stream_ndx])
+        avg_profit_per_decision = total_profit / num_resolved
+        variance = float(self.total_squared_profit[stream_ndx]) / num_resolved - avg_profit_per_decision ** 2
+        pnl_std = np.sqrt(max(variance, 0.)) if num_resolved > 1 else 0
+        return {
+            "current_ndx": current_ndx,
+            "num_resolved_decisions": num_resolved,
+            "total_profit": total_profit,
+            "wins": wins,
+            "losses": losses,
+            "win_loss_ratio": wins / losses if losses != 0 else float('inf'),
+            "profit_per_decision": avg_profit_per_decision,
+            "standardized_profit_per_decision": avg_profit_per_decision / pnl_std if pnl_std != 0 else float('inf')
+        }
+
+    def summaries(self) -> List[Dict]:
+        return [self.summary(stream_ndx) for stream_ndx in range(self.num_streams)]
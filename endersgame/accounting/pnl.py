@@ -46,12 +46,37 @@ Simple logging of PnL (Profit and Loss) for all decisions made by an attacker.
         self._resolve_decisions(x)
         self.current_ndx += 1
 
+    def is_backing_off(self) -> bool:
+        """
+        True if a non-zero decision made at the current index would be ignored because
+        it falls within self.backoff data points of the last non-zero decision.
+        """
+        return self.last_attack_ndx is not None and self.current_ndx - self.last_attack_ndx < self.backoff
+
+    def backoff_mask(self, decisions) -> np.ndarray:
+        """
+        For the next len(decisions) data points, with these decisions, whether is_backing_off() would be True
+        at each. Does not change state.
+        """
+        decisions = np.asarray(decisions, dtype=np.float64)
+        mask = np.zeros(len(decisions), dtype=bool)
+        last_attack_ndx = self.last_attack_ndx
+        for offset in [-1] + np.flatnonzero(decisions).tolist():
+            if offset >= 0:
+                ndx = self.current_ndx + offset
+                if last_attack_ndx is not None and ndx - last_attack_ndx < self.backoff:
+                    continue    # Ignored, so the backoff runs on from the last decision that counted
+                last_attack_ndx = ndx
+            if last_attack_ndx is not None:
+                start = max(last_attack_ndx + 1 - self.current_ndx, 0)
+                mask[start:max(last_attack_ndx + self.backoff - self.current_ndx, 0)] = True
+        return mask
+
     def _add_decision(self, x: float, horizon: int, decision: float):
         """
         Adds a non-zero decision to the pending decisions' dictionary.
         """
-        if decision == 0 or (self.last_attack_ndx is not None and
-                              self.current_ndx - self.last_attack_ndx < self.backoff):
+        if decision == 0 or self.is_backing_off():
             return
         anchor = None if self.with_trading_lag else x
         self._pending_decisions[self.current_ndx] = {
@@ -81,24 +106,59 @@ Simple logging of PnL (Profit and Loss) for all decisions made by an attacker.
                 final_decision += 1
             if self.current_ndx != final_decision:
                 continue
-            anchor = pending['anchor']
-            decision = pending['decision']
-
-            pnl = (x - anchor if  decision > 0 else anchor - x) - self.epsilon
-            self._pnl_data[decision_ndx] = {
-                    'decision_ndx': decision_ndx,
-                    'resolution_ndx': self.current_ndx,
-                    'horizon': pending['horizon'],
-                    'decision': decision,
-                    'y_decision': anchor,
-                    'y_resolution': x,
-                    'pnl': pnl
-                }
+            self._record_resolution(decision_ndx=decision_ndx, pending=pending, x=x)
             resolved_indices.append(decision_ndx)
 
         for idx in resolved_indices:
             del self._pending_decisions[idx]
 
+    def _record_resolution(self, decision_ndx: int, pending: Dict, x: float):
+        anchor = pending['anchor']
+        decision = pending['decision']
+
+        pnl = (x - anchor if  decision > 0 else anchor - x) - self.epsilon
+        self._pnl_data[decision_ndx] = {
+                'decision_ndx': decision_ndx,
+                'resolution_ndx': self.current_ndx,
+                'horizon': pending['horizon'],
+                'decision': decision,
+                'y_decision': anchor,
+                'y_resolution': x,
+                'pnl': pnl
+            }
+
+    def tick_many(self, xs, horizon: int = 0, decisions=None):
+        """
+        Equivalent to calling tick() for each data point and decision in turn, but only does
+        work at the points where a decision is made or resolved.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        decisions = np.zeros(len(xs)) if decisions is None else np.asarray(decisions, dtype=np.float64)
+        if self.with_trading_lag:
+            for x, decision in zip(xs.tolist(), decisions.tolist()):
+                self.tick(x=x, horizon=horizon, decision=decision)
+            return
+        decision_offsets = np.flatnonzero(decisions)
+        if len(decision_offsets) and horizon == 0:
+            raise ValueError("Cannot make a decision with a non-zero horizon")
+
+        start_ndx = self.current_ndx
+        end_ndx = start_ndx + len(xs)
+        for offset in decision_offsets.tolist():
+            self.current_ndx = start_ndx + offset
+            self._add_decision(float(xs[offset]), horizon, float(decisions[offset]))
+
+        # Sorting is stable, so decisions due at the same time resolve in the same order as in tick()
+        due = [(decision_ndx + pending['horizon'], decision_ndx)
+               for decision_ndx, pending in self._pending_decisions.items()
+               if start_ndx <= decision_ndx + pending['horizon'] < end_ndx]
+        due.sort(key=lambda resolution: resolution[0])
+        for resolution_ndx, decision_ndx in due:
+            self.current_ndx = resolution_ndx
+            pending = self._pending_decisions.pop(decision_ndx)
+            self._record_resolution(decision_ndx=decision_ndx, pending=pending, x=float(xs[resolution_ndx - start_ndx]))
+        self.current_ndx = end_ndx
+
     def reset_pnl(self):
         """Resets all PnL tracking variables."""
         self.current_ndx = 0
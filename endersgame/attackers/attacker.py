@@ -1,5 +1,6 @@
 from endersgame.attackers.attackerwithpnl import AttackerWithPnl
 from endersgame.mixins.historymixin import HistoryMixin
+from endersgame.mixins.deltahistory import DEFAULT_HISTORY_SCALE
 from endersgame import EPSILON
 from endersgame.gameconfig import HORIZON, DEFAULT_HISTORY_LEN
 from typing import Dict, Any
@@ -18,6 +19,7 @@ ATTACKER_DESCRIPTION = """
           tick(x)                              To add your own logic that assimilated the incoming data point ...
           predict()                            To provide a decision by any means or ...
           predict_from_history(xs:[float])     To provide a decision only using the lagged values
+          predict_using_history_batch(windows) Optionally, to score many windows at once (see runners/historybacktest.py)
           
      You probably want to keep the provided tick_and_predict() method as this will handle pnl and history for you. 
      
@@ -28,9 +30,12 @@ ATTACKER_DESCRIPTION = """
 
 class Attacker(AttackerWithPnl,  HistoryMixin):
 
-    def __init__(self, epsilon:float=EPSILON, max_history_len= DEFAULT_HISTORY_LEN, backoff:int=DEFAULT_TRADE_BACKOFF):
-        super().__init__(epsilon=epsilon, backoff=backoff)
-        HistoryMixin.__init__(self, max_history_len=max_history_len)  # Initialize HistoryMixin
+    def __init__(self, epsilon:float=EPSILON, max_history_len= DEFAULT_HISTORY_LEN, backoff:int=DEFAULT_TRADE_BACKOFF,
+                 history_path:str=None, history_dtype:str=None, history_scale:float=DEFAULT_HISTORY_SCALE,
+                 skip_during_backoff:bool=False):
+        super().__init__(epsilon=epsilon, backoff=backoff, skip_during_backoff=skip_during_backoff)
+        HistoryMixin.__init__(self, max_history_len=max_history_len, history_path=history_path,
+                              history_dtype=history_dtype, history_scale=history_scale)  # Initialize HistoryMixin
 
     def tick_and_predict(self, x: float, horizon: int = HORIZON) -> float:
         """
@@ -39,10 +44,19 @@ class Attacker(AttackerWithPnl,  HistoryMixin):
         """
         self.tick(x=x)
         self.tick_history(x=x)
-        decision = self.predict(horizon=horizon)
+        decision = self.predict_unless_backing_off(horizon=horizon)
         self.pnl.tick(x=x, horizon=horizon, decision=decision)
         return decision
 
+    def tick_many_and_record(self, xs: np.ndarray, decisions: np.ndarray, horizon: int = HORIZON) -> np.ndarray:
+        """
+            Chunked version of the boilerplate above, maintaining history and pnl in bulk
+            whenever predict_many() is implemented.
+        """
+        decisions = super().tick_many_and_record(xs=xs, decisions=decisions, horizon=horizon)
+        self.tick_history_many(xs=xs)
+        return decisions
+
     def tick(self, x):
         # Your logic goes here for all data assimilation
         # You don't need to worry about any kind of updates for the future profit tracking.
@@ -60,6 +74,36 @@ class Attacker(AttackerWithPnl,  HistoryMixin):
         raise NotImplementedError(
             "You derived from AttackerWithHistoryMixin but failed to implement either predict_using_history or predict")
 
+    def predict_using_history_batch(self, windows: np.ndarray, horizon: int = HORIZON):
+        """
+        Optional vectorized counterpart of predict_using_history().
+        :param windows:    2-d array whose rows are windows of max_history_len observations in chronological order
+        :param horizon:    The number of observations to predict ahead
+        :return: Array of decisions, one per row, or None (as here) if not implemented
+        """
+        return None
+
+    def predict_many(self, xs: np.ndarray, horizon: int = HORIZON):
+        """
+        Scores every window ending in the chunk xs with predict_using_history_batch(), if implemented.
+        """
+        window_len = self.max_history_len
+        if window_len < 1:
+            return None
+        num_lagged = min(len(self.history), window_len - 1)
+        lagged = np.array(self.get_recent_history(num_lagged), dtype=np.float64) if num_lagged > 0 else np.zeros(0)
+        combined = np.concatenate([lagged, xs])
+        if len(combined) >= window_len:
+            windows = np.lib.stride_tricks.sliding_window_view(combined, window_len)
+        else:
+            windows = np.zeros((0, window_len))
+        batch_decisions = self.predict_using_history_batch(windows=windows, horizon=horizon)
+        if batch_decisions is None:
+            return None
+        decisions = np.zeros(len(xs))
+        decisions[len(xs) - len(windows):] = batch_decisions
+        return decisions
+
     def predict(self, horizon: int = HORIZON) -> float:
         """
         :param horizon:
@@ -80,8 +124,7 @@ class Attacker(AttackerWithPnl,  HistoryMixin):
     def from_dict(cls, state: Dict[str, Any]):
         max_history_len_with_fallback = state.get('max_history_len', DEFAULT_HISTORY_LEN)
         instance = super().from_dict(state)
-        history_data = state.get('history', [])
-        instance.history = HistoryMixin.set_history(history_data=history_data, maxlen=max_history_len_with_fallback)
+        instance.history = HistoryMixin.history_from_dict(state)
         instance.max_history_len = max_history_len_with_fallback
         return instance
 
@@ -3,15 +3,24 @@ from endersgame.attackers.baseattacker import BaseAttacker
 from endersgame import EPSILON, DEFAULT_TRADE_BACKOFF
 from endersgame.gameconfig import HORIZON
 from typing import Dict, Any
+import numpy as np
 
 class AttackerWithPnl(BaseAttacker):
     """
     An attacker that tracks profit and loss (PnL).
+
+    With skip_during_backoff=True, decisions made while the Pnl backoff would discard them anyway are
+    taken to be 0, and self.skipped_predictions counts these decisions discarded during backoff.
+    tick_and_predict() does not call predict() for them at all. tick_and_predict_many() has already
+    evaluated predict_many() for the whole chunk, so there the count is the same but nothing is saved.
+    Only use this if predict() has no side effects you rely on.
     """
 
-    def __init__(self, epsilon: float = EPSILON, backoff: int = DEFAULT_TRADE_BACKOFF):
+    def __init__(self, epsilon: float = EPSILON, backoff: int = DEFAULT_TRADE_BACKOFF, skip_during_backoff: bool = False):
         super().__init__()
         self.pnl = Pnl(epsilon=epsilon, backoff=backoff)
+        self.skip_during_backoff = skip_during_backoff
+        self.skipped_predictions = 0
 
     def tick_and_predict(self, x: float, horizon: int = HORIZON) -> float:
         """
@@ -21,10 +30,34 @@ class AttackerWithPnl(BaseAttacker):
         :return: A float indicating directional opinion, if any (1=up, 0=neither, -1=down).
         """
         self.tick(x=x)
-        decision = self.predict(horizon=horizon)
+        decision = self.predict_unless_backing_off(horizon=horizon)
         self.pnl.tick(x=x, horizon=horizon, decision=decision)
         return decision
 
+    def tick_many_and_record(self, xs: np.ndarray, decisions: np.ndarray, horizon: int = HORIZON) -> np.ndarray:
+        """
+        Chunked tick_and_predict() finishes here: with skip_during_backoff, decisions during the backoff are taken
+        to be 0 and counted in skipped_predictions as decisions discarded during backoff, then the Pnl is brought
+        up to date. They were already predicted in the chunk, since which points back off depends on the decisions.
+        """
+        if self.skip_during_backoff:
+            backing_off = self.pnl.backoff_mask(decisions=decisions)
+            self.skipped_predictions += int(np.count_nonzero(backing_off))
+            decisions = np.where(backing_off, 0., decisions)
+        decisions = super().tick_many_and_record(xs=xs, decisions=decisions, horizon=horizon)
+        self.pnl.tick_many(xs=xs, horizon=horizon, decisions=decisions)
+        return decisions
+
+    def predict_unless_backing_off(self, horizon: int = HORIZON) -> float:
+        """
+        Calls predict(), unless skip_during_backoff is set and the decision could not count. Such decisions are
+        discarded during backoff: taken to be 0 and counted in skipped_predictions.
+        """
+        if self.skip_during_backoff and self.pnl.is_backing_off():
+            self.skipped_predictions += 1
+            return 0
+        return self.predict(horizon=horizon)
+
     def tick(self, x: float):
         """
         Implement the tick method.
@@ -53,6 +86,9 @@ class AttackerWithPnl(BaseAttacker):
         """
         state = super().to_dict()
         state['pnl'] = self.pnl.to_dict()
+        if self.skip_during_backoff:
+            state['skip_during_backoff'] = True
+            state['skipped_predictions'] = self.skipped_predictions
         return state
 
     @classmethod
@@ -63,4 +99,6 @@ class AttackerWithPnl(BaseAttacker):
 
         attacker = cls(epsilon=epsilon, backoff=backoff)
         attacker.pnl = Pnl.from_dict(pnl_state)
+        attacker.skip_during_backoff = state.get('skip_during_backoff', False)
+        attacker.skipped_predictions = state.get('skipped_predictions', 0)
         return attacker
@@ -1,5 +1,6 @@
 from endersgame.gameconfig import HORIZON
 from typing import Dict
+import numpy as np
 
 class BaseAttacker:
     """
@@ -34,6 +35,52 @@ class BaseAttacker:
         self.tick(x=x)
         return self.predict(horizon=horizon)
 
+    def tick_many(self, xs: np.ndarray):
+        """
+        Assimilate a chunk of data points. Override this, together with predict_many(), if it can be vectorized.
+        :param xs:  Data points in chronological order
+        """
+        for x in xs.tolist():
+            self.tick(x=x)
+
+    def predict_many(self, xs: np.ndarray, horizon: int = HORIZON):
+        """
+        Optional vectorized hook used by tick_and_predict_many().
+
+        Starting from the state *before* the chunk xs, return the decisions that tick_and_predict() would
+        have returned for each point in xs, without changing state (tick_many() is called afterwards for that).
+        Return None, as here, to have the chunk processed point by point instead.
+
+        :param xs:       Data points in chronological order
+        :param horizon:  The prediction horizon
+        :return: Array of decisions the same length as xs, or None
+        """
+        return None
+
+    def tick_and_predict_many(self, xs, horizon: int = HORIZON) -> np.ndarray:
+        """
+        :param xs:        A chunk of data points in chronological order
+        :param horizon:   The prediction horizon
+        :return:    Array of decisions, one per data point, as tick_and_predict() would have returned
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        decisions = self.predict_many(xs=xs, horizon=horizon)
+        if decisions is None:
+            return np.array([self.tick_and_predict(x=x, horizon=horizon) for x in xs.tolist()], dtype=np.float64)
+        return self.tick_many_and_record(xs=xs, decisions=np.asarray(decisions, dtype=np.float64), horizon=horizon)
+
+    def tick_many_and_record(self, xs: np.ndarray, decisions: np.ndarray, horizon: int = HORIZON) -> np.ndarray:
+        """
+        Vectorized hook used by tick_and_predict_many() once predict_many() has given the decisions for a chunk.
+        Brings all state up to date with the chunk. Subclasses that keep more state than tick_many() does
+        (a Pnl or a history, say) extend this rather than tick_and_predict_many().
+
+        :param decisions:  From predict_many()
+        :return: The decisions tick_and_predict() would have returned
+        """
+        self.tick_many(xs=xs)
+        return decisions
+
     def to_dict(self):
         return {}
 
@@ -0,0 +1,56 @@
+import numpy as np
+from endersgame import EPSILON
+from endersgame.accounting.multistreampnl import MultiStreamPnl
+from endersgame.accounting.pnl import DEFAULT_TRADE_BACKOFF
+from endersgame.gameconfig import HORIZON
+
+
+class MultiStreamAttacker:
+    """
+    Base class for attackers covering many streams at once. Where an Attacker holds scalar state for one
+    stream, a MultiStreamAttacker holds arrays with one entry per stream and advances them together:
+
+        attacker = MyMultiStreamAttacker(num_streams=5000)
+        decisions = attacker.tick_and_predict(xs=latest_values)       # One value per stream
+
+    Derived classes implement tick(xs, ndxs) and predict(ndxs, horizon), where ndxs are the indexes of
+    the streams being advanced (distinct, though not necessarily all streams). Accounting is done by
+    a MultiStreamPnl, as AttackerWithPnl does for single streams.
+
+    The method tick_and_predict_streams() makes any MultiStreamAttacker a group for the MicroBatcher.
+    """
+
+    def __init__(self, num_streams: int, epsilon: float = EPSILON, backoff: int = DEFAULT_TRADE_BACKOFF,
+                 max_horizon: int = HORIZON):
+        self.num_streams = num_streams
+        self.pnl = MultiStreamPnl(num_streams=num_streams, epsilon=epsilon, backoff=backoff, max_horizon=max_horizon)
+        self._all = np.arange(num_streams)
+
+    def tick(self, xs: np.ndarray, ndxs: np.ndarray):
+        """
+        Assimilate xs[i] into the state of stream ndxs[i]
+        """
+        pass
+
+    def predict(self, ndxs: np.ndarray, horizon: int = HORIZON) -> np.ndarray:
+        """
+        :return: Decisions for the streams ndxs, usually mostly zero
+        """
+        raise NotImplementedError('predict must be implemented by derived class')
+
+    def tick_and_predict(self, xs, horizon: int = HORIZON, ndxs=None) -> np.ndarray:
+        """
+        :param xs:       One data point per stream in ndxs
+        :param horizon:  The prediction horizon
+        :param ndxs:     Stream indexes, by default all streams in order
+        :return: Decisions, one per stream in ndxs
+        """
+        ndxs = self._all if ndxs is None else np.asarray(ndxs, dtype=np.int64)
+        xs = np.asarray(xs, dtype=np.float64)
+        self.tick(xs=xs, ndxs=ndxs)
+        decisions = self.predict(ndxs=ndxs, horizon=horizon)
+        self.pnl.tick(xs=xs, horizon=horizon, decisions=decisions, ndxs=ndxs)
+        return decisions
+
+    def tick_and_predict_streams(self, ndxs, xs, horizon: int = HORIZON) -> np.ndarray:
+        return self.tick_and_predict(xs=xs, horizon=horizon, ndxs=ndxs)
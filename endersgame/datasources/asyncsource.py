@@ -0,0 +1,257 @@
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit
+import numpy as np
+from endersgame.datasources.chunkgenerator import rechunk
+from endersgame.datasources.csvparser import StreamCsvParser
+from endersgame.datasources.streamcache import CachedResponse
+from endersgame.datasources.streamurl import stream_url
+
+"""
+    Read streams from an event loop, without a thread per stream:
+
+        async for x in AsyncStreamSource(stream_id=0):                      # {'x': value}, as stream_generator
+            ...
+        async for xs in AsyncStreamSource(stream_id=0).chunks(1000):        # float64 arrays, as chunk_generator
+            ...
+
+        connections = asyncio.Semaphore(8)                                 # Shared limit across streams
+        feeds = {k: AsyncStreamSource(stream_id=k, connections=connections) for k in range(20)}
+        await AsyncRunner(attacker_factory=MyAttacker).run(feeds=feeds)
+
+    Files are requested prefetch at a time per stream, each over its own asyncio connection (http_get is a
+    minimal HTTP/1.1 client on asyncio.open_connection), and parsed by StreamCsvParser as their bytes arrive.
+    A file cut short yields the rows that arrived whole. A source that is not an
+    HTTP URL (see datasource.py) is read in a worker thread instead. Stopping the iteration, or cancelling the
+    task iterating, cancels the requests still in flight.
+"""
+
+DEFAULT_PREFETCH = 4
+DEFAULT_TIMEOUT = 30    # Seconds per file
+READ_SIZE = 65536       # Bytes read from a connection at a time
+
+
+class AsyncStreamSource:
+
+    def __init__(self, stream_id, category='train', base_url: str = None, source=None,
+                 prefetch: int = DEFAULT_PREFETCH, connections: asyncio.Semaphore = None,
+                 return_float: bool = False, timeout: float = DEFAULT_TIMEOUT, on_error: str = 'skip',
+                 errors: dict = None):
+        """
+        :param base_url:     Root of the remote data, default DEFAULT_BASE_URL from streamurl
+        :param source:       Instead of base_url, any data source accepted by get_source()
+        :param prefetch:     Files of this stream requested ahead of the consumer, including the one it waits for
+        :param connections:  Semaphore bounding the requests in flight, shared by sources to bound them together
+        :param return_float: Yield floats, otherwise {'x': value} dicts as stream_generator
+        :param on_error, errors:  As for stream_generator
+        """
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        self.stream_id = stream_id
+        self.category = category
+        self.base_url = base_url
+        self.source = source
+        self.prefetch = prefetch
+        self.connections = connections
+        self.return_float = return_float
+        self.timeout = timeout
+        self.on_error = on_error
+        self.errors = errors if errors is not None else {}
+        self.stats = {'files': 0, 'bytes': 0, 'requests': 0, 'cancelled': 0, 'truncated_files': 0}
+
+    async def __aiter__(self):
+        chunks = self.chunks()
+        try:
+            async for xs in chunks:
+                for x in xs.tolist():
+                    yield x if self.return_float else {'x': x}
+        finally:
+            await chunks.aclose()
+
+    async def chunks(self, chunk_size: int = None):
+        """
+        float64 arrays of chunk_size values (the last may be shorter), or one per file if chunk_size is None.
+        """
+        # Closed explicitly, so that stopping early cancels the requests in flight at once
+        arrays = self._iter_arrays()
+        carry = []
+        try:
+            if chunk_size is None:
+                async for xs in arrays:
+                    if len(xs):
+                        yield xs
+                return
+            async for xs in arrays:
+                chunks = list(rechunk(carry + [xs], chunk_size=chunk_size))
+                carry = [chunks.pop()] if chunks and len(chunks[-1]) < chunk_size else []
+                for chunk in chunks:
+                    yield chunk
+        finally:
+            await arrays.aclose()
+        for chunk in carry:
+            yield chunk
+
+    async def _iter_arrays(self):
+        fetch = self._fetcher()
+        in_flight = deque()
+        next_file_number = 1
+        try:
+            while True:
+                while len(in_flight) < self.prefetch:
+                    in_flight.append(asyncio.ensure_future(self._fetch_and_parse(fetch, next_file_number)))
+                    next_file_number += 1
+                status_code, num_bytes, xs = await in_flight.popleft()
+                if status_code != 200:
+                    return
+                self.stats['files'] += 1
+                self.stats['bytes'] += num_bytes
+                yield xs
+        finally:
+            for task in in_flight:      # Also when the consumer stops early or is cancelled
+                if task.cancel():
+                    self.stats['cancelled'] += 1
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _fetch_and_parse(self, fetch, file_number: int):
+        parser = StreamCsvParser(on_error=self.on_error, errors=self.errors)
+        if self.connections is None:
+            status_code, num_bytes, xs = await fetch(file_number, parser)
+        else:
+            async with self.connections:
+                status_code, num_bytes, xs = await fetch(file_number, parser)
+        self.stats['requests'] += 1
+        return status_code, num_bytes, xs
+
+    def _fetcher(self):
+        """
+        :return: A coroutine function taking a file number and a parser, and returning status_code, bytes and values
+        """
+        if self.source is not None and not (isinstance(self.source, str) and _is_http(self.source)):
+            from endersgame.datasources.datasource import get_source
+            source = get_source(self.source)
+
+            async def fetch(file_number, parser):
+                response = await asyncio.to_thread(source.fetch, category=self.category, stream_id=self.stream_id,
+                                                   file_number=file_number)
+                if response.status_code != 200:
+                    return response.status_code, 0, None
+                return 200, len(response.content), _join(parser.feed(response.content), parser.close())
+            return fetch
+
+        base_url = self.source if self.source is not None else self.base_url
+
+        async def fetch(file_number, parser):
+            # Rows are parsed as the bytes arrive, overlapping parsing with the download
+            url = stream_url(category=self.category, stream_id=self.stream_id, file_number=file_number,
+                             base_url=base_url)
+            arrays = []
+            status_code, num_bytes, complete = await asyncio.wait_for(
+                _http_get(url, on_data=lambda piece: arrays.append(parser.feed(piece))), timeout=self.timeout)
+            if status_code != 200:
+                return status_code, 0, None
+            if not complete:
+                self.stats['truncated_files'] += 1
+            arrays.append(parser.close(complete=complete))
+            return 200, num_bytes, _join(*arrays)
+        return fetch
+
+
+async def http_get(url: str, timeout: float = DEFAULT_TIMEOUT) -> CachedResponse:
+    """
+    GET url over a new connection, which is closed afterwards.
+    :return: A response with status_code and content (the body, only when status_code is 200)
+    """
+    pieces = []
+    status_code, _, complete = await asyncio.wait_for(_http_get(url, on_data=pieces.append), timeout=timeout)
+    if not complete:
+        raise ConnectionError(f'Incomplete response from {url}')
+    return CachedResponse(status_code=status_code, content=b''.join(pieces) if status_code == 200 else b'')
+
+
+async def _http_get(url: str, on_data):
+    """
+    :param on_data:  Called with each piece of the body as it arrives, when status_code is 200
+    :return: status_code, bytes in the body, and whether the body arrived in full
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=True if secure else None)
+    try:
+        writer.write(f'GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nUser-Agent: endersgame\r\n'
+                     f'Accept-Encoding: identity\r\nConnection: close\r\n\r\n'.encode('ascii'))
+        await writer.drain()
+        status_line = await reader.readline()
+        try:
+            status_code = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise ConnectionError(f'Malformed HTTP status line {status_line!r} from {url}')
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        num_bytes = 0
+        try:
+            async for piece in _body(reader, headers):
+                num_bytes += len(piece)
+                if status_code == 200:
+                    on_data(piece)
+        except asyncio.IncompleteReadError as e:
+            if status_code == 200 and e.partial:
+                on_data(e.partial)
+            return status_code, num_bytes + len(e.partial), False
+        return status_code, num_bytes, True
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def _body(reader, headers: dict):
+    """
+    The pieces of a response body as they arrive. Raises IncompleteReadError if the connection closes too soon.
+    """
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            line = await reader.readline()
+            if not line.endswith(b'\n'):      # The connection closed before the terminating 0 chunk
+                raise asyncio.IncompleteReadError(partial=b'', expected=None)
+            try:
+                size = int(line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise ConnectionError(f'Malformed chunk size {line!r}')
+            if size == 0:
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):      # Trailers
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining > 0:
+            piece = await reader.read(min(remaining, READ_SIZE))
+            if not piece:
+                raise asyncio.IncompleteReadError(partial=b'', expected=remaining)
+            remaining -= len(piece)
+            yield piece
+    else:
+        while piece := await reader.read(READ_SIZE):
+            yield piece
+
+
+def _join(*arrays) -> np.ndarray:
+    arrays = [xs for xs in arrays if len(xs)]
+    return np.concatenate(arrays) if len(arrays) > 1 else arrays[0] if arrays else np.zeros(0)
+
+
+def _is_http(source: str) -> bool:
+    return source.startswith(('http://', 'https://'))
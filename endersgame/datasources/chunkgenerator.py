@@ -0,0 +1,83 @@
+import io
+import numpy as np
+from endersgame.datasources.csvparser import parse_stream_csv
+from endersgame.datasources.datasource import iter_files, open_source
+from endersgame.datasources.streamgenerator import VALID_PUBLIC_CATEGORIES
+
+"""
+    Like stream_generator, but yields float64 arrays rather than one Python object per value:
+
+        for xs in chunk_generator(stream_id=0, chunk_size=1000):
+            decisions = attacker.tick_and_predict_many(xs)
+
+    Without chunk_size, each array holds one whole remote file. Files are parsed with np.loadtxt, falling back
+    to StreamCsvParser only for files it cannot read (quoted fields or malformed rows, for instance).
+"""
+
+
+def chunk_generator(stream_id, category='train', chunk_size: int = None, cache=None, offline: bool = False,
+                    prefetch: int = 0, base_url: str = None, source=None, on_error: str = 'skip',
+                    errors: dict = None):
+    """
+    :param chunk_size:  Length of the arrays yielded (the last may be shorter). None yields one array per file.
+    :param cache:       As for stream_generator: a StreamCache, a directory, or True for the default
+    :param offline:     Serve only from the cache
+    :param prefetch:    If positive (and there is no cache), download this many files ahead
+    :param base_url:    Root of the remote data, when not using the cache
+    :param source:      As for stream_generator: a data source, registered name, URL or directory
+    :param on_error:    As for stream_generator: 'skip', 'nan' or 'raise' for rows that cannot be read
+    :param errors:      As for stream_generator, a dict the counts of rows read and problems met are added to.
+                        A failed download ends the stream, as for stream_generator, and is counted as a fetch_error.
+    """
+    assert category.lower() in VALID_PUBLIC_CATEGORIES, 'Only train and test data is available,sorry! '
+    source = open_source(source=source, cache=cache, offline=offline, prefetch=prefetch, base_url=base_url)
+    arrays = (csv_to_array(content, on_error=on_error, errors=errors)
+              for content in iter_files(source, stream_id=stream_id, category=category, errors=errors))
+    if chunk_size is None:
+        for xs in arrays:
+            if len(xs):
+                yield xs
+    else:
+        yield from rechunk(arrays, chunk_size=chunk_size)
+
+
+def rechunk(arrays, chunk_size: int):
+    """
+    Regroups a sequence of arrays into arrays of chunk_size values (the last may be shorter).
+    """
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    carry = np.zeros(0)
+    for xs in arrays:
+        if len(carry):
+            xs = np.concatenate([carry, xs])
+        num_full = len(xs) // chunk_size * chunk_size
+        for start in range(0, num_full, chunk_size):
+            yield xs[start:start + chunk_size]
+        carry = xs[num_full:]
+    if len(carry):
+        yield carry
+
+
+def csv_to_array(content, on_error: str = 'raise', errors: dict = None) -> np.ndarray:
+    """
+    The 'value' column of a CSV file as a float64 array.
+    :param content:   bytes or str, with a header row
+    :param on_error:  As for StreamCsvParser, for files np.loadtxt cannot read
+    """
+    text = content.decode('utf-8') if isinstance(content, (bytes, bytearray)) else content
+    header, _, body = text.strip().partition('\n')
+    if not body.strip():
+        return np.zeros(0)
+    columns = [name.strip().strip('"') for name in header.split(',')]
+    if 'value' in columns:
+        try:
+            xs = np.loadtxt(io.StringIO(body), delimiter=',', usecols=columns.index('value'), dtype=np.float64,
+                            ndmin=1)
+            if errors is not None:
+                errors['rows'] = errors.get('rows', 0) + len(xs)
+            return xs
+        except ValueError:
+            pass
+    # Quoted fields, a byte order mark, another name for the value column or malformed rows
+    return parse_stream_csv(content, on_error=on_error, errors=errors)
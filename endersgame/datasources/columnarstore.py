@@ -0,0 +1,203 @@
+import json
+import os
+import zlib
+from collections import OrderedDict
+import numpy as np
+
+"""
+    Many streams in one store: a flat array of all their values, one stream after another, and an index
+    of where each stream starts.
+
+        with ColumnarStoreWriter('/data/train_store', compress=True) as writer:
+            for stream_id, xs in streams.items():
+                writer.append(stream_id, xs)
+
+        store = ColumnarStore('/data/train_store')
+        xs = store.get(812, start=1000000, stop=2000000)    # Reads only what is needed
+        for stream_id, xs in store:                         # All streams, in the order written
+            ...
+
+    Uncompressed values are memory mapped, and slices are views. Compressed stores hold the values in
+    zlib compressed blocks of block_size, so a slice decompresses only the blocks it overlaps.
+"""
+
+MANIFEST_FILE = 'manifest.json'
+OFFSETS_FILE = 'offsets.npy'
+VALUES_FILE = 'values.bin'
+BLOCK_OFFSETS_FILE = 'block_offsets.npy'
+DEFAULT_BLOCK_SIZE = 65536      # Values per compressed block
+
+
+class ColumnarStoreWriter:
+
+    def __init__(self, directory: str, compress: bool = False, block_size: int = DEFAULT_BLOCK_SIZE,
+                 compression_level: int = 6):
+        """
+        :param compress:     Store values in zlib compressed blocks
+        :param block_size:   Values per block, when compressing
+        """
+        self.directory = directory
+        self.compress = compress
+        self.block_size = block_size
+        self.compression_level = compression_level
+        self.stream_ids = []
+        self._written = set()
+        self.offsets = [0]
+        self.block_offsets = [0]
+        self._pending = []          # Values not yet in a compressed block
+        self._num_pending = 0
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(os.path.join(directory, VALUES_FILE), 'wb')
+
+    def append(self, stream_id, xs):
+        if stream_id in self._written:
+            raise ValueError(f'stream {stream_id} has already been written')
+        xs = np.ascontiguousarray(xs, dtype=np.float64)
+        self._written.add(stream_id)
+        self.stream_ids.append(stream_id)
+        self.offsets.append(self.offsets[-1] + len(xs))
+        if not self.compress:
+            self._file.write(xs.tobytes())
+            return
+        self._pending.append(xs)
+        self._num_pending += len(xs)
+        if self._num_pending >= self.block_size:
+            pending = np.concatenate(self._pending)
+            num_full = len(pending) // self.block_size * self.block_size
+            for start in range(0, num_full, self.block_size):
+                self._write_block(pending[start:start + self.block_size])
+            self._pending = [pending[num_full:]]
+            self._num_pending = len(pending) - num_full
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.compress and self._num_pending:
+            self._write_block(np.concatenate(self._pending))
+        self._file.close()
+        np.save(os.path.join(self.directory, OFFSETS_FILE), np.array(self.offsets, dtype=np.int64))
+        if self.compress:
+            np.save(os.path.join(self.directory, BLOCK_OFFSETS_FILE), np.array(self.block_offsets, dtype=np.int64))
+        manifest = {'stream_ids': self.stream_ids, 'num_values': self.offsets[-1],
+                    'compressed': self.compress, 'block_size': self.block_size if self.compress else None}
+        with open(os.path.join(self.directory, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+
+    def _write_block(self, xs: np.ndarray):
+        compressed = zlib.compress(xs.tobytes(), self.compression_level)
+        self._file.write(compressed)
+        self.block_offsets.append(self.block_offsets[-1] + len(compressed))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()      # Without a manifest, so the incomplete store cannot be opened
+
+
+class ColumnarStore:
+
+    def __init__(self, directory: str, max_cached_blocks: int = 4):
+        """
+        :param max_cached_blocks:  Decompressed blocks kept for reuse by nearby reads
+        """
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        self.stream_ids = manifest['stream_ids']
+        self.num_values = manifest['num_values']
+        self.compressed = manifest['compressed']
+        self.block_size = manifest['block_size']
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE))
+        self._ndx = {stream_id: ndx for ndx, stream_id in enumerate(self.stream_ids)}
+        values_path = os.path.join(directory, VALUES_FILE)
+        if self.compressed:
+            self.block_offsets = np.load(os.path.join(directory, BLOCK_OFFSETS_FILE))
+            self._file = open(values_path, 'rb')
+            self._blocks = OrderedDict()
+            self.max_cached_blocks = max_cached_blocks
+        elif self.num_values:
+            self._values = np.memmap(values_path, dtype=np.float64, mode='r', shape=(self.num_values,))
+        else:
+            self._values = np.zeros(0)
+
+    def __len__(self) -> int:
+        return len(self.stream_ids)
+
+    def __contains__(self, stream_id) -> bool:
+        return stream_id in self._ndx
+
+    def length(self, stream_id) -> int:
+        ndx = self._ndx[stream_id]
+        return int(self.offsets[ndx + 1] - self.offsets[ndx])
+
+    def get(self, stream_id, start: int = 0, stop: int = None) -> np.ndarray:
+        """
+        Values start:stop of a stream, with the same clipping as slicing a list (negative indexes count from the end).
+        """
+        ndx = self._ndx[stream_id]
+        begin, end = int(self.offsets[ndx]), int(self.offsets[ndx + 1])
+        start, stop, _ = slice(start, stop).indices(end - begin)
+        return self._read(begin + start, begin + max(start, stop))
+
+    def __getitem__(self, stream_id) -> np.ndarray:
+        return self.get(stream_id)
+
+    def __iter__(self):
+        """
+        (stream_id, values) for every stream, in the order written.
+        """
+        for stream_id in self.stream_ids:
+            yield stream_id, self.get(stream_id)
+
+    def iter_streams(self):
+        """
+        The values of every stream, in order, as ForgetfulRunner.run() and TournamentRunner.run() take them.
+        """
+        for _, xs in self:
+            yield xs
+
+    def iter_chunks(self, stream_id, chunk_size: int):
+        for start in range(0, self.length(stream_id), chunk_size):
+            yield self.get(stream_id, start, start + chunk_size)
+
+    def close(self):
+        if self.compressed:
+            self._file.close()
+
+    def _read(self, start: int, stop: int) -> np.ndarray:
+        if not self.compressed:
+            return self._values[start:stop]
+        if start >= stop:
+            return np.zeros(0)
+        first_block, last_block = start // self.block_size, (stop - 1) // self.block_size
+        parts = [self._block(block_ndx) for block_ndx in range(first_block, last_block + 1)]
+        xs = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        offset = first_block * self.block_size
+        return xs[start - offset:stop - offset]
+
+    def _block(self, block_ndx: int) -> np.ndarray:
+        if block_ndx in self._blocks:
+            self._blocks.move_to_end(block_ndx)
+            return self._blocks[block_ndx]
+        begin, end = int(self.block_offsets[block_ndx]), int(self.block_offsets[block_ndx + 1])
+        self._file.seek(begin)
+        xs = np.frombuffer(zlib.decompress(self._file.read(end - begin)), dtype=np.float64)
+        self._blocks[block_ndx] = xs
+        if len(self._blocks) > self.max_cached_blocks:
+            self._blocks.popitem(last=False)
+        return xs
+
+
+def write_columnar_store(directory: str, streams: dict, compress: bool = False,
+                         block_size: int = DEFAULT_BLOCK_SIZE) -> ColumnarStore:
+    """
+    :param streams:  Dict from stream id (int or str) to values
+    """
+    with ColumnarStoreWriter(directory, compress=compress, block_size=block_size) as writer:
+        for stream_id, xs in streams.items():
+            writer.append(stream_id, xs)
+    return ColumnarStore(directory)
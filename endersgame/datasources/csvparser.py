@@ -0,0 +1,178 @@
+import csv
+import math
+import numpy as np
+
+"""
+    Incremental parser for stream files, which can be fed bytes as they arrive:
+
+        parser = StreamCsvParser(on_error='nan')
+        for piece in response.iter_content(65536):
+            xs = parser.feed(piece)         # Values of the rows completed so far
+        xs = parser.close()                 # The last row, if the file did not end with a newline
+        parser.errors                       # {'rows': 1000, 'bad_value': 2, 'short_row': 0, ...}
+
+        xs = parse_stream_csv(content)      # All at once
+
+    The value column is found by name in the header (ignoring case, quotes and a byte order mark), trying
+    each of value_columns in turn. A file with one unnamed column of numbers needs no header. Rows that
+    cannot be read are skipped, replaced by nan, or raise ValueError, as on_error says, and are counted in
+    errors by reason. The first few are kept in error_samples.
+"""
+
+VALUE_COLUMNS = ('value', 'x')      # Names accepted for the value column, in order of preference
+ON_ERROR_POLICIES = ('skip', 'nan', 'raise')
+ERROR_REASONS = ('bad_value', 'short_row', 'truncated_row', 'no_value_column')
+MAX_ERROR_SAMPLES = 5
+BOM = b'\xef\xbb\xbf'
+
+_EMPTY = np.zeros(0)
+
+
+def new_error_counts() -> dict:
+    return {'rows': 0, **{reason: 0 for reason in ERROR_REASONS}}
+
+
+class StreamCsvParser:
+
+    def __init__(self, on_error: str = 'skip', value_columns=VALUE_COLUMNS, errors: dict = None):
+        """
+        :param on_error:       'skip' drops a bad row, 'nan' yields nan in its place, 'raise' raises ValueError
+        :param value_columns:  Header names accepted for the value column
+        :param errors:         Dict of counts to add to, to total them over several files
+        """
+        if on_error not in ON_ERROR_POLICIES:
+            raise ValueError(f'on_error must be one of {ON_ERROR_POLICIES}')
+        self.on_error = on_error
+        self.value_columns = [name.lower() for name in value_columns]
+        self.errors = errors if errors is not None else {}
+        for key, count in new_error_counts().items():
+            self.errors.setdefault(key, count)
+        self.error_samples = []      # (line_number, reason, line)
+        self.line_number = 0
+        self._buffer = bytearray()
+        self._column = None         # Index of the value column, once known
+        self._header = None         # The header row as bytes, to recognize repeats
+        self._no_column = False     # The header has no value column, so no row can be read
+
+    def feed(self, data) -> np.ndarray:
+        """
+        :param data:  The next bytes (or str) of the file, split anywhere
+        :return: Values of the rows completed by data
+        """
+        self._buffer += data.encode('utf-8') if isinstance(data, str) else data
+        end = self._buffer.rfind(b'\n')
+        if end < 0:
+            return _EMPTY
+        lines = bytes(self._buffer[:end]).split(b'\n')
+        del self._buffer[:end + 1]
+        return self._parse(lines)
+
+    def close(self, complete: bool = True) -> np.ndarray:
+        """
+        :param complete:  False if the file was cut short, in which case a last row without a newline is dropped
+        :return: Value of that last row, if any
+        """
+        tail = bytes(self._buffer)
+        self._buffer.clear()
+        if not tail.strip():
+            return _EMPTY
+        if not complete:
+            self.line_number += 1
+            self._error('truncated_row', tail)
+            return _EMPTY
+        return self._parse([tail])
+
+    def _parse(self, lines: list) -> np.ndarray:
+        ndx = 0
+        while self._column is None and not self._no_column and ndx < len(lines):
+            self.line_number += 1
+            line = lines[ndx].removeprefix(BOM) if self.line_number == 1 else lines[ndx]
+            ndx += 1
+            if line.strip() and not self._read_header(line.strip()):
+                ndx -= 1        # Headerless, so this line is the first row
+                self.line_number -= 1
+        lines = lines[ndx:]
+        if self._no_column:
+            self.line_number += len(lines)
+            return _EMPTY
+        try:
+            # Fast path for the usual case, where every line is a plain row
+            column = self._column
+            values = [float(line.split(b',')[column]) for line in lines if not line.isspace() and line]
+            self.line_number += len(lines)
+        except (ValueError, IndexError):
+            values = self._parse_slowly(lines)
+        self.errors['rows'] += len(values)
+        return np.array(values, dtype=np.float64) if values else _EMPTY
+
+    def _parse_slowly(self, lines: list) -> list:
+        values = []
+        for line in lines:
+            self.line_number += 1
+            line = line.strip()
+            if not line or line == self._header:      # The header is repeated where files were joined together
+                continue
+            value = self._value(line)
+            if value is not None:
+                values.append(value)
+        return values
+
+    def _read_header(self, line: bytes) -> bool:
+        """
+        Finds the value column. :return: True if line was a header, False if it is the first row of a headerless file
+        """
+        fields = _split(line)
+        names = [field.decode('utf-8', 'replace').strip().strip('"').lower() for field in fields]
+        for name in self.value_columns:
+            if name in names:
+                self._column = names.index(name)
+                self._header = line
+                return True
+        if len(fields) == 1 and _is_number(fields[0]):
+            self._column = 0
+            return False
+        self._no_column = True
+        self._error('no_value_column', line)
+        return True
+
+    def _value(self, line: bytes):
+        fields = _split(line)
+        if len(fields) <= self._column:
+            return self._error('short_row', line)
+        try:
+            return float(fields[self._column])
+        except ValueError:
+            return self._error('bad_value', line)
+
+    def _error(self, reason: str, line: bytes):
+        self.errors[reason] += 1
+        if len(self.error_samples) < MAX_ERROR_SAMPLES:
+            self.error_samples.append((self.line_number, reason, line.decode('utf-8', 'replace')))
+        if self.on_error == 'raise':
+            if reason == 'no_value_column':
+                raise ValueError(f"CSV file has no value column (looked for {', '.join(self.value_columns)})")
+            raise ValueError(f'{reason} at line {self.line_number}: {line!r}')
+        return math.nan if self.on_error == 'nan' else None
+
+
+def parse_stream_csv(content, on_error: str = 'skip', **kwargs) -> np.ndarray:
+    """
+    The values of a whole file. Keyword arguments are those of StreamCsvParser.
+    """
+    parser = StreamCsvParser(on_error=on_error, **kwargs)
+    xs, last = parser.feed(content), parser.close()
+    return np.concatenate([xs, last]) if len(last) else xs
+
+
+def _split(line: bytes) -> list:
+    if b'"' not in line:
+        return line.split(b',')
+    return [field.encode('utf-8') for field in next(csv.reader([line.decode('utf-8', 'replace')]))]
+
+
+def _is_number(field: bytes) -> bool:
+    try:
+        float(field)
+        return True
+    except ValueError:
+        return False
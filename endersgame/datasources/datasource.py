@@ -0,0 +1,210 @@
+import os
+from endersgame.datasources.streamcache import CachedResponse, StreamCache
+from endersgame.datasources.streamurl import stream_url
+
+"""
+    Where stream files come from. A data source is anything with a fetch(category, stream_id, file_number) method
+    returning a response with status_code and content, as StreamCache does:
+
+        stream_generator(stream_id=0, source='https://mirror.example.com/endersdata')   # Any HTTP base URL
+        stream_generator(stream_id=0, source='/data/endersdata')                        # A local copy
+        stream_generator(stream_id=0, source=MemorySource({0: xs}))                     # Arrays already in memory
+
+        register_source('fixtures', MemorySource({0: xs}))
+        stream_generator(stream_id=0, source='fixtures')
+
+    A source given as a string is a registered name, an http(s):// URL, a file:// URL or a directory laid out like
+    the remote data (category/stream_{stream_id}_file_{file_number}.csv). Without a source, stream_generator uses
+    $ENDERSGAME_SOURCE if it is set, and otherwise the GitHub data as before. Every source serves files with the
+    same names and contents, so iteration is identical whichever is used.
+
+    The cache and prefetch options of stream_generator are sources too (CacheSource, and PrefetchingSource in
+    prefetcher.py), chosen by open_source(), so every file is read through some source's fetch():
+
+        for content in iter_files(open_source(cache=True), stream_id=0):      # The raw bytes of each file
+            ...
+"""
+
+SOURCE_ENV_VAR = 'ENDERSGAME_SOURCE'
+DEFAULT_VALUES_PER_FILE = 1000
+
+_REGISTERED_SOURCES = {}
+
+
+class DataSource:
+
+    def fetch(self, category: str, stream_id, file_number: int) -> CachedResponse:
+        """
+        A response with status_code 200 and the file's content, or another status_code if there is no such file.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases anything held between calls to fetch(), such as downloads started ahead. The source stays usable.
+        """
+        pass
+
+
+class HttpSource(DataSource):
+
+    def __init__(self, base_url: str = None, session=None, timeout: float = 30):
+        """
+        :param base_url:  Root of the data, default DEFAULT_BASE_URL from streamurl
+        :param session:   A requests.Session to reuse for all files
+        :param timeout:   Seconds per request, or None to wait indefinitely
+        """
+        self.base_url = base_url
+        self.session = session
+        self.timeout = timeout
+
+    def fetch(self, category, stream_id, file_number):
+        url = stream_url(category=category, stream_id=stream_id, file_number=file_number, base_url=self.base_url)
+        if self.session is None:
+            import requests
+            get = requests.get
+        else:
+            get = self.session.get
+        response = get(url) if self.timeout is None else get(url, timeout=self.timeout)
+        return CachedResponse(status_code=response.status_code,
+                              content=response.content if response.status_code == 200 else b'')
+
+
+class LocalDirectorySource(DataSource):
+
+    def __init__(self, directory: str):
+        """
+        :param directory:  Laid out as the remote data: category/stream_{stream_id}_file_{file_number}.csv
+        """
+        self.directory = directory
+
+    def path(self, category, stream_id, file_number) -> str:
+        return os.path.join(self.directory, category.lower(), f'stream_{stream_id}_file_{file_number}.csv')
+
+    def fetch(self, category, stream_id, file_number):
+        try:
+            with open(self.path(category=category, stream_id=stream_id, file_number=file_number), 'rb') as f:
+                return CachedResponse(status_code=200, content=f.read())
+        except FileNotFoundError:
+            return CachedResponse(status_code=404)
+
+
+class MemorySource(DataSource):
+
+    def __init__(self, streams: dict = None, category='train', values_per_file: int = DEFAULT_VALUES_PER_FILE):
+        """
+        :param streams:          Dict from stream id to values, all in category
+        :param values_per_file:  Values in each file served, as the remote data is split into files
+        """
+        self.values_per_file = values_per_file
+        self.streams = {}
+        for stream_id, xs in (streams or {}).items():
+            self.add(stream_id=stream_id, xs=xs, category=category)
+
+    def add(self, stream_id, xs, category='train'):
+        self.streams[(category.lower(), stream_id)] = [float(x) for x in xs]
+
+    def fetch(self, category, stream_id, file_number):
+        xs = self.streams.get((category.lower(), stream_id))
+        start = (file_number - 1) * self.values_per_file
+        if xs is None or file_number < 1 or start >= len(xs):
+            return CachedResponse(status_code=404)
+        rows = ''.join(f'{x!r}\n' for x in xs[start:start + self.values_per_file])
+        return CachedResponse(status_code=200, content=f'value\n{rows}'.encode('utf-8'))
+
+
+class CacheSource(DataSource):
+
+    def __init__(self, cache=None, offline: bool = False):
+        """
+        :param cache:    A StreamCache, a cache directory, or None or True for the default directory
+        :param offline:  Serve only from the cache
+        """
+        self.cache = cache if isinstance(cache, StreamCache) else StreamCache(
+            directory=cache if isinstance(cache, str) else None)
+        self.offline = offline
+
+    def fetch(self, category, stream_id, file_number):
+        return self.cache.fetch(category=category, stream_id=stream_id, file_number=file_number,
+                                offline=self.offline or None)
+
+
+def register_source(name: str, source: DataSource):
+    """
+    Makes source available to stream_generator(source=name) and $ENDERSGAME_SOURCE=name.
+    """
+    _REGISTERED_SOURCES[name] = source
+
+
+def unregister_source(name: str):
+    _REGISTERED_SOURCES.pop(name, None)
+
+
+def get_source(source=None) -> DataSource:
+    """
+    :param source:  A data source, a registered name, an http(s):// or file:// URL, or a directory.
+                    None means $ENDERSGAME_SOURCE, or the GitHub data if that is not set.
+    """
+    if source is None:
+        source = os.environ.get(SOURCE_ENV_VAR) or None
+        if source is None:
+            return HttpSource()
+    if not isinstance(source, str):
+        if not hasattr(source, 'fetch'):
+            raise TypeError(f'{source!r} is not a data source')
+        return source
+    if source in _REGISTERED_SOURCES:
+        return _REGISTERED_SOURCES[source]
+    if source.startswith(('http://', 'https://')):
+        return HttpSource(base_url=source)
+    if source.startswith('file://'):
+        return LocalDirectorySource(directory=source[len('file://'):])
+    if os.path.isdir(source):
+        return LocalDirectorySource(directory=source)
+    raise ValueError(f'Unknown data source {source!r}: not a registered name, URL or directory')
+
+
+def open_source(source=None, cache=None, offline: bool = False, prefetch: int = 0, base_url: str = None) -> DataSource:
+    """
+    The source stream_generator and chunk_generator read from, given their arguments: source (or $ENDERSGAME_SOURCE)
+    if there is one, otherwise a CacheSource if cache or offline is given, otherwise the remote data at base_url,
+    prefetch files ahead if prefetch is positive. Call close() on it when done.
+    """
+    if source is None and not offline and cache is None:
+        source = os.environ.get(SOURCE_ENV_VAR) or None
+    if source is not None:
+        return get_source(source)
+    if offline or cache is not None:
+        return CacheSource(cache=cache, offline=offline)
+    if prefetch:
+        from endersgame.datasources.prefetcher import PrefetchingSource
+        return PrefetchingSource(prefetch=prefetch, base_url=base_url)
+    return HttpSource(base_url=base_url, timeout=None)
+
+
+def iter_files(source: DataSource, stream_id, category='train', errors: dict = None, verbose: bool = False):
+    """
+    The content of each file of a stream, in order, up to the first missing one. An exception from fetch() also
+    ends the stream, and is counted in errors['fetch_errors']. The source is closed afterwards.
+    """
+    errors = errors if errors is not None else {}
+    errors.setdefault('fetch_errors', 0)
+    file_number = 1
+    try:
+        while True:
+            try:
+                response = source.fetch(category=category, stream_id=stream_id, file_number=file_number)
+            except Exception as e:
+                # Network errors end the stream, as a missing file does
+                errors['fetch_errors'] += 1
+                if verbose:
+                    print(f"An error occurred while fetching file_number={file_number}: {e}")
+                return
+            if response.status_code != 200:
+                if verbose:
+                    print(f"No more files found for stream_id={stream_id} in category='{category}'.")
+                return
+            yield response.content
+            file_number += 1
+    finally:
+        source.close()
@@ -0,0 +1,91 @@
+import json
+import os
+import numpy as np
+from endersgame.datasources.chunkgenerator import chunk_generator
+
+"""
+    Convert streams once to .npy files, then open them instantly as read-only memory maps:
+
+        convert_stream(stream_id=0, category='train')        # Downloads (or reads the cache) and writes the .npy
+        xs = load_stream(stream_id=0, category='train')      # np.memmap, no parsing and no copy
+
+    Processes that open the same file share its pages through the OS page cache, so a pool of workers
+    replaying one stream holds it in memory only once. manifest.json in the store records the length of
+    every converted stream.
+"""
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def default_store_directory() -> str:
+    from endersgame.datasources.streamcache import default_cache_directory
+    return os.path.join(default_cache_directory(), 'npy')
+
+
+def stream_path(stream_id, category='train', directory: str = None) -> str:
+    return os.path.join(directory or default_store_directory(), category.lower(), f'stream_{stream_id}.npy')
+
+
+def convert_stream(stream_id, category='train', directory: str = None, cache=None, offline: bool = False,
+                   base_url: str = None) -> str:
+    """
+    Writes all the values of a stream to a single float64 .npy file, replacing any previous one. If no values are
+    found (ValueError) or a download fails (ConnectionError), any previous file is kept and nothing is written.
+    :param cache, offline, base_url:  As for chunk_generator
+    :return: Path of the file
+    """
+    directory = directory or default_store_directory()
+    errors = {}
+    chunks = list(chunk_generator(stream_id=stream_id, category=category, cache=cache, offline=offline,
+                                  base_url=base_url, errors=errors))
+    if errors.get('fetch_errors'):
+        raise ConnectionError(f'Failed to download all of stream {stream_id} in {category}')
+    if not chunks:
+        raise ValueError(f'No values found for stream {stream_id} in {category}')
+    xs = np.concatenate(chunks)
+    path = stream_path(stream_id=stream_id, category=category, directory=directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        np.save(f, np.ascontiguousarray(xs, dtype=np.float64))
+    os.replace(temporary, path)
+    _update_manifest(directory, key=f'{category.lower()}/{stream_id}',
+                     entry={'path': os.path.relpath(path, directory), 'length': len(xs)})
+    return path
+
+
+def convert_streams(stream_ids, category='train', directory: str = None, **kwargs) -> list:
+    return [convert_stream(stream_id=stream_id, category=category, directory=directory, **kwargs)
+            for stream_id in stream_ids]
+
+
+def load_stream(stream_id, category='train', directory: str = None) -> np.ndarray:
+    """
+    :return: The stream as a read-only memory map
+    """
+    return open_npy(stream_path(stream_id=stream_id, category=category, directory=directory))
+
+
+def open_npy(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode='r')
+
+
+def read_manifest(directory: str = None) -> dict:
+    """
+    :return: Dict from 'category/stream_id' to the relative path and length of the converted stream
+    """
+    try:
+        with open(os.path.join(directory or default_store_directory(), MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_manifest(directory: str, key: str, entry: dict):
+    manifest = read_manifest(directory)
+    manifest[key] = entry
+    path = os.path.join(directory, MANIFEST_FILE)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temporary, path)
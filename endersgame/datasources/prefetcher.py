@@ -0,0 +1,196 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from endersgame.datasources.csvparser import StreamCsvParser, new_error_counts
+from endersgame.datasources.datasource import DataSource, HttpSource, iter_files
+
+"""
+    Download the files of a stream ahead of the consumer:
+
+        prefetcher = StreamPrefetcher(stream_id=0, prefetch=4)
+        for x in prefetcher:
+            ...
+        prefetcher.stats        # files, bytes, bytes_per_second, seconds the consumer spent waiting ...
+
+    While the values of one file are being consumed, up to prefetch further files are downloaded by a
+    small thread pool over one pooled requests.Session. At most prefetch files are held in memory. The end
+    of a stream is only discovered by a failed request, so up to prefetch - 1 requests past it are wasted.
+
+    The downloads are made by a PrefetchingSource, which stream_generator(prefetch=...) also reads from, and
+    which can read ahead from any other data source as well.
+"""
+
+DEFAULT_PREFETCH = 4
+
+
+class StreamPrefetcher:
+
+    def __init__(self, stream_id, category='train', prefetch: int = DEFAULT_PREFETCH, max_workers: int = None,
+                 base_url: str = None, session=None, return_float: bool = False, timeout: float = 30,
+                 on_error: str = 'skip', errors: dict = None):
+        """
+        :param prefetch:      Files requested ahead of the consumer, including the one it is waiting for
+        :param max_workers:   Download threads, default prefetch
+        :param base_url:      Root of the data, default DEFAULT_BASE_URL from streamurl
+        :param session:       A requests.Session to reuse, otherwise one is created with a pool of max_workers connections
+        :param return_float:  Yield floats rather than {'x': value} dicts, as stream_generator
+        :param on_error, errors:  As for StreamCsvParser
+        """
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        self.stream_id = stream_id
+        self.category = category
+        self.prefetch = prefetch
+        self.max_workers = max_workers or prefetch
+        self.base_url = base_url
+        self.session = session
+        self.return_float = return_float
+        self.timeout = timeout
+        self.on_error = on_error
+        self.errors = errors if errors is not None else new_error_counts()
+        self.stats = {'files': 0, 'bytes': 0, 'requests': 0, 'max_in_flight': 0,
+                      'download_seconds': 0., 'wait_seconds': 0., 'elapsed_seconds': 0., 'bytes_per_second': None}
+
+    def __iter__(self):
+        for content in self.iter_contents():
+            parser = StreamCsvParser(on_error=self.on_error, errors=self.errors)
+            for value in parser.feed(content).tolist() + parser.close().tolist():
+                yield value if self.return_float else {'x': value}
+
+    def iter_contents(self):
+        """
+        The raw content of each file of the stream, in order.
+        """
+        source = PrefetchingSource(prefetch=self.prefetch, max_workers=self.max_workers, base_url=self.base_url,
+                                   session=self.session, timeout=self.timeout)
+        # A failed download ends the stream and is counted in errors['fetch_errors'], as in stream_generator
+        files = iter_files(source, stream_id=self.stream_id, category=self.category, errors=self.errors)
+        start_time = time.perf_counter()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                content = next(files, None)
+                self.stats['wait_seconds'] += time.perf_counter() - wait_start
+                if content is None:
+                    break
+                self.stats['files'] += 1
+                self.stats['bytes'] += len(content)
+                yield content
+        finally:
+            files.close()       # Closes the source, also when the consumer stops early
+            for key in ['requests', 'max_in_flight', 'download_seconds']:
+                self.stats[key] = source.stats[key]
+            elapsed = time.perf_counter() - start_time
+            self.stats['elapsed_seconds'] = elapsed
+            self.stats['bytes_per_second'] = self.stats['bytes'] / elapsed if elapsed > 0 else None
+
+
+class PrefetchingSource(DataSource):
+
+    def __init__(self, source: DataSource = None, prefetch: int = DEFAULT_PREFETCH, max_workers: int = None,
+                 base_url: str = None, session=None, timeout: float = 30):
+        """
+        A data source which, asked for a file, also starts fetching the next prefetch - 1 files of the stream.
+
+        :param source:       Where files come from, default HttpSource(base_url, session, timeout)
+        :param prefetch:     Files requested ahead, including the one asked for
+        :param max_workers:  Download threads, default prefetch
+        :param session:      A requests.Session to reuse, otherwise one is created with a pool of max_workers connections
+        """
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        self.source = source
+        self.prefetch = prefetch
+        self.max_workers = max_workers or prefetch
+        self.base_url = base_url
+        self.session = session
+        self.timeout = timeout
+        self._own_session = None
+        self._http = None
+        self._executor = None
+        self._in_flight = {}        # (category, stream_id, file_number) -> Future of the response
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'max_in_flight': 0, 'download_seconds': 0.}
+
+    def fetch(self, category, stream_id, file_number):
+        if self._executor is None:
+            self._start()
+        for ahead in range(file_number, file_number + self.prefetch):
+            key = (category, stream_id, ahead)
+            if key not in self._in_flight:
+                self._in_flight[key] = self._executor.submit(self._download, category, stream_id, ahead)
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], len(self._in_flight))
+        response = self._in_flight.pop((category, stream_id, file_number)).result()
+        if response.status_code != 200:
+            # The end of the stream, so the files requested beyond it are not wanted
+            for key in [key for key in self._in_flight if key[:2] == (category, stream_id) and key[2] > file_number]:
+                self._in_flight.pop(key).cancel()
+        return response
+
+    def close(self):
+        running = [future for future in self._in_flight.values() if not future.cancel() and not future.done()]
+        self._in_flight = {}
+        if self._executor is not None:
+            # Without waiting for downloads already under way, which finish in the background
+            try:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            except TypeError:       # Python 3.8 and earlier, where the futures cancelled above are enough
+                self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._own_session is not None:
+            # Downloads under way still use the session, so the last of them to finish closes it
+            _close_when_done(self._own_session, running)
+            self._own_session = None
+
+    def _start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.source is None:
+            session = self.session
+            if session is None:
+                session = self._own_session = make_session(pool_size=self.max_workers)
+            self._http = HttpSource(base_url=self.base_url, session=session, timeout=self.timeout)
+
+    def _download(self, category, stream_id, file_number):
+        start_time = time.perf_counter()
+        source = self.source if self.source is not None else self._http
+        try:
+            # An exception is raised again by fetch() for this file, so that the reader can end the stream there
+            return source.fetch(category=category, stream_id=stream_id, file_number=file_number)
+        finally:
+            with self._lock:
+                self.stats['requests'] += 1
+                self.stats['download_seconds'] += time.perf_counter() - start_time
+
+
+def _close_when_done(session, futures):
+    """
+    Closes session once all futures are done, right away if there are none.
+    """
+    if not futures:
+        session.close()
+        return
+    remaining = set(futures)
+    lock = threading.Lock()
+
+    def on_done(future):
+        with lock:
+            remaining.discard(future)
+            last = not remaining
+        if last:
+            session.close()
+
+    for future in futures:
+        future.add_done_callback(on_done)
+
+
+def make_session(pool_size: int = DEFAULT_PREFETCH):
+    """
+    A requests.Session keeping up to pool_size connections open per host.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
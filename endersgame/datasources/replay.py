@@ -0,0 +1,182 @@
+import asyncio
+import time
+from datetime import datetime
+import numpy as np
+from endersgame.gameconfig import HORIZON
+
+"""
+    Replay a stream at a controlled speed, to see whether an attacker keeps up with it:
+
+        replay = ReplaySource.from_stream(stream_id=0, rate=500, cache=True)     # 500 values a second
+        result = load_test(attacker=MyAttacker(), source=replay)
+        result['max_lag_seconds'], result['kept_up']
+
+        replay = ReplaySource(xs, timestamps=ts, speed=60)      # Recorded timing, sixty times faster
+        replay = ReplaySource(xs, rate=1000, burst_size=50)     # Fifty values at once, twenty times a second
+        async for x in ReplaySource(xs, rate=1000):             # Also from an event loop, e.g. as an AsyncRunner feed
+            ...
+
+    Each value is due at a scheduled time after the start. The replay waits until then before releasing it,
+    or releases it at once if it is already late. Lateness only builds up while the consumer takes longer
+    over a value than the time between values, so the lag recorded for each value measures how far behind
+    the consumer has fallen.
+"""
+
+DEFAULT_TOLERANCE = 0.05    # Seconds of lag still counted as keeping up
+
+
+class ReplaySource:
+
+    def __init__(self, values, rate: float = None, timestamps=None, speed: float = 1.0, jitter: float = 0.,
+                 burst_size: int = 1, seed: int = None, return_float: bool = False,
+                 clock=time.perf_counter, sleep=time.sleep):
+        """
+        :param values:      The values to replay
+        :param rate:        Values per second. Give either rate or timestamps.
+        :param timestamps:  Recorded times of the values in seconds (or datetimes), replayed speed times faster
+        :param jitter:      Each value's due time is moved by up to this many seconds either way, at random
+        :param burst_size:  Values released together. The mean rate is unchanged, so bursts are further apart.
+        :param return_float:  Yield floats, otherwise {'x': value} dicts as stream_generator
+        :param clock, sleep:  Replaceable for testing
+        """
+        if (rate is None) == (timestamps is None):
+            raise ValueError('Give either rate or timestamps')
+        if rate is not None and rate <= 0:
+            raise ValueError('rate must be positive')
+        if speed <= 0:
+            raise ValueError('speed must be positive')
+        if burst_size < 1:
+            raise ValueError('burst_size must be at least 1')
+        self.values = np.asarray(values, dtype=np.float64)
+        if rate is not None:
+            due = np.arange(len(self.values)) / rate
+        else:
+            seconds = np.array([_seconds(t) for t in timestamps], dtype=np.float64)
+            if len(seconds) != len(self.values):
+                raise ValueError('Need one timestamp per value')
+            due = (seconds - seconds[0]) / speed if len(seconds) else seconds
+        due = due[np.arange(len(due)) // burst_size * burst_size]      # Each burst is due with its first value
+        if jitter > 0:
+            due = np.maximum(due + np.random.default_rng(seed).uniform(-jitter, jitter, len(due)), 0.)
+        self.due = due
+        self.return_float = return_float
+        self.clock = clock
+        self.sleep = sleep
+        self.lags = np.zeros(len(self.values))
+        self.elapsed = 0.
+        self.num_emitted = 0
+
+    @classmethod
+    def from_stream(cls, stream_id, category='train', timestamp_column: str = None, cache=None, offline=False,
+                    source=None, max_values: int = None, on_error: str = 'skip', errors: dict = None, **kwargs):
+        """
+        A replay of a stream, read as chunk_generator does (from the cache, a data source or the remote data).
+        :param timestamp_column:  Replay with the times in this column of the files (in seconds), rather than at a
+                                  fixed rate. Rows without a readable time or value are then dropped.
+        :param on_error, errors:  As for stream_generator
+        """
+        from endersgame.datasources.csvparser import parse_stream_csv
+        from endersgame.datasources.datasource import iter_files, open_source
+        errors = errors if errors is not None else {}
+        values, timestamps, num_values = [], [], 0
+        files = iter_files(open_source(source=source, cache=cache, offline=offline), stream_id=stream_id,
+                           category=category, errors=errors)
+        for content in files:
+            if timestamp_column is None:
+                xs = parse_stream_csv(content, on_error=on_error, errors=errors)
+            else:
+                # Bad rows are read as nan in both columns, so that values and times stay aligned
+                xs = parse_stream_csv(content, on_error='nan', errors=errors)
+                ts = parse_stream_csv(content, on_error='nan', value_columns=(timestamp_column,))
+                if len(ts) != len(xs):
+                    raise ValueError(f'Stream files have no {timestamp_column} column')
+                readable = ~(np.isnan(xs) | np.isnan(ts))
+                xs = xs[readable]
+                timestamps.append(ts[readable])
+            values.append(xs)
+            num_values += len(xs)
+            if max_values is not None and num_values >= max_values:
+                files.close()
+                break
+        values = np.concatenate(values)[:max_values] if values else np.zeros(0)
+        if timestamp_column is not None:
+            kwargs['timestamps'] = np.concatenate(timestamps)[:len(values)] if timestamps else np.zeros(0)
+        return cls(values, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        start = self.clock()
+        self.num_emitted = 0
+        try:
+            for ndx, x in enumerate(self.values.tolist()):
+                wait = start + self.due[ndx] - self.clock()
+                if wait > 0:
+                    self.sleep(wait)
+                self._emitted(ndx, start)
+                yield x if self.return_float else {'x': x}
+        finally:
+            self.elapsed = self.clock() - start
+
+    async def __aiter__(self):
+        start = self.clock()
+        self.num_emitted = 0
+        try:
+            for ndx, x in enumerate(self.values.tolist()):
+                wait = start + self.due[ndx] - self.clock()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._emitted(ndx, start)
+                yield x if self.return_float else {'x': x}
+        finally:
+            self.elapsed = self.clock() - start
+
+    def _emitted(self, ndx: int, start: float):
+        self.lags[ndx] = max(self.clock() - start - self.due[ndx], 0.)
+        self.num_emitted = ndx + 1
+
+    def stats(self, tolerance: float = DEFAULT_TOLERANCE) -> dict:
+        """
+        How far behind schedule values were released, over those replayed so far.
+        """
+        lags = self.lags[:self.num_emitted]
+        if not len(lags):
+            return {'num_values': 0}
+        scheduled = float(self.due[self.num_emitted - 1])
+        return {'num_values': int(len(lags)),
+                'elapsed_seconds': self.elapsed,
+                'scheduled_seconds': scheduled,
+                'values_per_second': len(lags) / self.elapsed if self.elapsed > 0 else None,
+                'mean_lag_seconds': float(np.mean(lags)),
+                'p99_lag_seconds': float(np.percentile(lags, 99)),
+                'max_lag_seconds': float(np.max(lags)),
+                'final_lag_seconds': float(lags[-1]),
+                'num_late': int(np.sum(lags > tolerance)),
+                'kept_up': bool(np.max(lags) <= tolerance)}
+
+
+def load_test(attacker, source: ReplaySource, horizon: int = HORIZON, tolerance: float = DEFAULT_TOLERANCE) -> dict:
+    """
+    Feeds the replay to attacker.tick_and_predict() as it is released.
+    :return: The replay's lag statistics, and the time spent in tick_and_predict
+    """
+    busy = 0.
+    clock = source.clock
+    for x in source:
+        busy_start = clock()
+        attacker.tick_and_predict(x=x['x'] if isinstance(x, dict) else x, horizon=horizon)
+        busy += clock() - busy_start
+    stats = source.stats(tolerance=tolerance)
+    stats['mean_tick_seconds'] = busy / stats['num_values'] if stats['num_values'] else None
+    stats['busy_fraction'] = busy / stats['elapsed_seconds'] if stats.get('elapsed_seconds') else None
+    return stats
+
+
+def _seconds(timestamp) -> float:
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    try:
+        return float(timestamp)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(timestamp)).timestamp()
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+from endersgame.datasources.streamurl import stream_url
+
+"""
+    Local disk cache for the remote stream files read by stream_generator():
+
+        cache = StreamCache()                       # ~/.cache/endersgame, or $ENDERSGAME_CACHE
+        gen = stream_generator(stream_id=0, cache=cache)
+        cache.stats                                 # hits, downloads, bytes ...
+
+        gen = stream_generator(stream_id=0, cache=cache, offline=True)    # Never touches the network
+
+    Files are stored once under the sha256 of their content (objects/ab/abcdef...) and index.json maps
+    (category, stream_id, file_number) to that digest, the size and the server's ETag. A cached file is
+    served if its size still matches. With revalidate=True it is first checked against the server with
+    If-None-Match, and still served if the server fails to answer. Missing files (a 404 or 410, at the end of
+    a stream) are remembered too, but only trusted offline,
+    so that files published since are picked up.
+"""
+
+CACHE_ENV_VAR = 'ENDERSGAME_CACHE'
+OFFLINE_MISS_STATUS = 504       # As for an HTTP only-if-cached request that cannot be satisfied
+GONE_STATUSES = (404, 410)      # Responses recorded as the file not existing; other errors are taken to be transient
+
+
+class CachedResponse:
+
+    def __init__(self, status_code: int, content: bytes = b''):
+        self.status_code = status_code
+        self.content = content
+
+
+class StreamCache:
+
+    def __init__(self, directory: str = None, offline: bool = False, revalidate: bool = False):
+        """
+        :param directory:   Where to keep files, default $ENDERSGAME_CACHE or ~/.cache/endersgame
+        :param offline:     Serve only from the cache
+        :param revalidate:  Check cached files against the server's ETag before serving them
+        """
+        self.directory = directory or default_cache_directory()
+        self.offline = offline
+        self.revalidate = revalidate
+        self.index_path = os.path.join(self.directory, 'index.json')
+        self.index = self._read_index()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'revalidation_errors': 0, 'downloads': 0, 'invalid': 0,
+                      'bytes_from_cache': 0, 'bytes_downloaded': 0}
+
+    def fetch(self, category: str, stream_id: int, file_number: int, offline: bool = None) -> CachedResponse:
+        """
+        The file, from the cache if possible. A response with status_code other than 200 means there is no such file
+        (or, when offline, that it is not cached).
+        :param offline:  Overrides self.offline for this call
+        """
+        key = cache_key(category=category, stream_id=stream_id, file_number=file_number)
+        entry = self.index.get(key)
+        content = self._read_object(entry) if entry and entry.get('sha256') else None
+        if entry and entry.get('sha256') and content is None:
+            self.stats['invalid'] += 1
+            entry = None
+
+        offline = self.offline if offline is None else offline
+        if offline:
+            if content is not None:
+                return self._hit(content)
+            self.stats['misses'] += 1
+            return CachedResponse(status_code=404 if entry else OFFLINE_MISS_STATUS)
+
+        if content is not None and not self.revalidate:
+            return self._hit(content)
+
+        import requests
+        url = stream_url(category=category, stream_id=stream_id, file_number=file_number)
+        etag = entry.get('etag') if content is not None else None
+        try:
+            response = requests.get(url, headers={'If-None-Match': etag}) if etag else requests.get(url)
+        except requests.exceptions.RequestException:
+            if content is None:
+                raise
+            response = None
+        if content is not None and (response is None or response.status_code not in (200, 304, *GONE_STATUSES)):
+            # The server could not answer just now (a 5xx or 429, say), which says nothing against the cached copy
+            self.stats['revalidation_errors'] += 1
+            return self._hit(content)
+        if response.status_code == 304 and content is not None:
+            self.stats['revalidated'] += 1
+            return self._hit(content)
+
+        self.stats['misses'] += 1
+        if response.status_code != 200:
+            if response.status_code in GONE_STATUSES:
+                self._update_index(key, {'missing': True})
+            return CachedResponse(status_code=response.status_code)
+        content = response.content
+        self.stats['downloads'] += 1
+        self.stats['bytes_downloaded'] += len(content)
+        self._update_index(key, {'sha256': self._write_object(content), 'size': len(content),
+                                 'etag': _header(response, 'ETag')})
+        return CachedResponse(status_code=200, content=content)
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory, topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+        self.index = {}
+
+    def _hit(self, content: bytes) -> CachedResponse:
+        self.stats['hits'] += 1
+        self.stats['bytes_from_cache'] += len(content)
+        return CachedResponse(status_code=200, content=content)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'objects', digest[:2], digest)
+
+    def _read_object(self, entry: dict):
+        path = self._object_path(entry['sha256'])
+        try:
+            if os.path.getsize(path) != entry['size']:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_object(self, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path) or os.path.getsize(path) != len(content):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomically(path, content)
+        return digest
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_index(self, key: str, entry: dict):
+        # Merge with what other processes may have written since
+        self.index = {**self._read_index(), **self.index, key: entry}
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomically(self.index_path, json.dumps(self.index, indent=1).encode('utf-8'))
+
+
+def cache_key(category: str, stream_id: int, file_number: int) -> str:
+    return f'{category.lower()}/{stream_id}/{file_number}'
+
+
+def default_cache_directory() -> str:
+    return os.environ.get(CACHE_ENV_VAR) or os.path.join(os.path.expanduser('~'), '.cache', 'endersgame')
+
+
+def _header(response, name: str):
+    value = response.headers.get(name) if hasattr(response, 'headers') else None
+    return value if isinstance(value, str) else None
+
+
+def _write_atomically(path: str, content: bytes):
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(content)
+    os.replace(temporary, path)
@@ -0,0 +1,88 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from endersgame.datasources.streamurl import stream_url, DEFAULT_BASE_URL
+
+"""
+    Find which stream ids exist without probing them one at a time:
+
+        stream_ids = discover_streams(category='train')         # [0, 1, 2, ...]
+
+    Ids are probed with concurrent HEAD requests, batch_size at a time, over one pooled session. As with
+    stream_generator_generator, the streams are taken to be numbered without gaps, so discovery stops at the
+    first id with no first file. The result is saved as a manifest in the cache directory and reused for ttl seconds.
+"""
+
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_MANIFEST_TTL = 24 * 60 * 60     # Seconds
+
+
+def discover_streams(category='train', start_stream_id: int = 0, batch_size: int = DEFAULT_BATCH_SIZE,
+                     base_url: str = None, session=None, cache_dir: str = None, ttl: float = DEFAULT_MANIFEST_TTL,
+                     clock=time.time) -> list:
+    """
+    :param batch_size:  Ids probed concurrently. Enumerating up to this many streams takes one round trip.
+    :param cache_dir:   Where manifests are kept, default that of StreamCache
+    :param ttl:         Seconds a manifest is trusted. Use 0 to always probe.
+    :return: Consecutive stream ids from start_stream_id
+    """
+    manifest_path = _manifest_path(cache_dir=cache_dir, category=category)
+    manifest_key = {'base_url': base_url or DEFAULT_BASE_URL, 'category': category.lower(),
+                    'start_stream_id': start_stream_id}
+    if ttl > 0:
+        manifest = _read_manifest(manifest_path)
+        if manifest and manifest.get('key') == manifest_key and clock() - manifest['created'] < ttl:
+            return manifest['stream_ids']
+
+    from endersgame.datasources.prefetcher import make_session
+    own_session = session is None
+    session = make_session(pool_size=batch_size) if own_session else session
+    stream_ids = []
+    try:
+        with ThreadPoolExecutor(max_workers=batch_size) as executor:
+            batch_start = start_stream_id
+            while True:
+                batch = list(range(batch_start, batch_start + batch_size))
+                urls = [stream_url(category=category, stream_id=stream_id, file_number=1, base_url=base_url)
+                        for stream_id in batch]
+                exists = list(executor.map(lambda url: _exists(session, url), urls))
+                for stream_id, found in zip(batch, exists):
+                    if not found:
+                        break
+                    stream_ids.append(stream_id)
+                if not all(exists):
+                    break
+                batch_start += batch_size
+    finally:
+        if own_session:
+            session.close()
+
+    if ttl > 0:
+        _write_manifest(manifest_path, {'key': manifest_key, 'created': clock(), 'stream_ids': stream_ids})
+    return stream_ids
+
+
+def _exists(session, url) -> bool:
+    return session.head(url).status_code == 200
+
+
+def _manifest_path(cache_dir: str, category: str) -> str:
+    from endersgame.datasources.streamcache import default_cache_directory
+    return os.path.join(cache_dir or default_cache_directory(), 'manifests', f'{category.lower()}.json')
+
+
+def _read_manifest(path: str):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(path: str, manifest: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(temporary, path)
@@ -1,5 +1,5 @@
-import csv
-from endersgame.datasources.streamurl import stream_url
+from endersgame.datasources.csvparser import StreamCsvParser, new_error_counts
+from endersgame.datasources.datasource import iter_files, open_source
 
 """
        Just for convenience, here is a float generator with a limited amount of data stored on github
@@ -13,59 +13,46 @@ from endersgame.datasources.streamurl import stream_url
 VALID_PUBLIC_CATEGORIES = ['train','test']
 
 
-def stream_generator(stream_id, category='train', verbose=False, return_float=False):
+def stream_generator(stream_id, category='train', verbose=False, return_float=False, cache=None, offline=False,
+                     prefetch=0, base_url=None, source=None, on_error='skip', errors=None):
     """
     A generator that yields values from remote CSV files on GitHub.
 
     Parameters:
     - stream_id (int): The index of the currency pair.
     - category (str): One of 'train', 'test', or 'validate'.
+    - cache: A StreamCache, a cache directory, or True for the default directory. None downloads every time.
+    - offline (bool): Serve only from the cache (the default cache if none is given).
+    - prefetch (int): If positive (and there is no cache), download this many files ahead with a PrefetchingSource.
+    - base_url (str): Root of the remote data, when not using the cache.
+    - source: A data source, registered source name, URL or directory to read files from instead (see datasource.py).
+      Defaults to $ENDERSGAME_SOURCE when that is set. Cache, offline and prefetch apply only without a source.
+    - on_error (str): What to do with a row that cannot be read: 'skip' it, yield 'nan' instead, or 'raise' ValueError.
+    - errors (dict): If given, counts of rows read and of problems met (see csvparser.py) are added to it.
 
     Yields:
     - float: The next value from the sequence of CSV files.
     """
     assert category.lower() in VALID_PUBLIC_CATEGORIES,'Only train and test data is available,sorry! '
+    errors = errors if errors is not None else {}
+    for key in [*new_error_counts(), 'fetch_errors', 'empty_files']:
+        errors.setdefault(key, 0)
 
-    import requests
-    file_number = 1  # Start from the first file
-    while True:
-        # Construct the raw URL for the current file
-        url = stream_url(category=category, stream_id=stream_id, file_number=file_number)
-        try:
-            # Fetch the content of the CSV file from GitHub
-            response = requests.get(url)
-            if response.status_code != 200:
-                # If the file doesn't exist, assume we've reached the end
-                if verbose:
-                    print(f"No more files found for stream_id={stream_id} in category='{category}'.")
-                break
-
-            # Read the CSV content
-            content = response.content.decode('utf-8').strip()
-            lines = content.splitlines()
-            reader = csv.DictReader(lines)
-
-            # Yield each value from the 'value' column
-            values_found = False
-            for row in reader:
-                values_found = True
-                value = float(row['value'])
-                if return_float:
-                    yield value
-                else:
-                    yield {'x':value}
-
-            if not values_found:
-                # If the file is empty or doesn't contain 'value' column
+    source = open_source(source=source, cache=cache, offline=offline, prefetch=prefetch, base_url=base_url)
+    files = iter_files(source, stream_id=stream_id, category=category, errors=errors, verbose=verbose)
+    for file_number, content in enumerate(files, start=1):
+        # Malformed rows are counted in errors, and skipped or replaced by nan as on_error says
+        parser = StreamCsvParser(on_error=on_error, errors=errors)
+        values = parser.feed(content).tolist() + parser.close().tolist()
+        if not values:
+            errors['empty_files'] += 1
+            if verbose:
                 print(f"File stream_{stream_id}_file_{file_number}.csv is empty or invalid.")
-
-            file_number += 1  # Move to the next file
-
-        except Exception as e:
-            # Handle any exceptions (e.g., network errors)
-            print(f"An error occurred while processing file_number={file_number}: {e}")
-            break
-
+        for value in values:
+            if return_float:
+                yield value
+            else:
+                yield {'x':value}
 
 if __name__=='__main__':
     gen = stream_generator(stream_id=0)
@@ -1,30 +1,43 @@
-import requests
 from endersgame.datasources.streamgenerator import stream_generator, VALID_PUBLIC_CATEGORIES
 from endersgame.datasources.streamurl import stream_url
 
 
-def stream_generator_generator(start_stream_id=0, category='train', return_float=False):
+def stream_generator_generator(start_stream_id=0, category='train', return_float=False, parallel=False,
+                               base_url=None, **discovery_kwargs):
     """
     Returns the next valid stream generator that checks for the existence of the remote file.
 
     Parameters:
     - start_stream_id (int): The starting stream ID to look for.
     - category:              Only works for 'train'
+    - parallel (bool):       Find all the streams up front with concurrent probes (see discover_streams)
+    - base_url (str):        Root of the remote data
+    - discovery_kwargs:      Passed to discover_streams, e.g. batch_size, cache_dir or ttl
 
     Yields:
     - A stream generator for the next valid stream.
     """
     assert category.lower() in VALID_PUBLIC_CATEGORIES,' Only test and train data is avaiable'
 
+    if parallel:
+        from endersgame.datasources.streamdiscovery import discover_streams
+        stream_ids = discover_streams(category=category, start_stream_id=start_stream_id, base_url=base_url,
+                                      **discovery_kwargs)
+        for stream_id in stream_ids:
+            yield stream_generator(stream_id=stream_id, category=category, return_float=return_float, base_url=base_url)
+        return
+
+    import requests
+
     stream_id = start_stream_id
     while True:
         # Construct the first URL to check if the stream exists
-        url = stream_url(category=category, stream_id=stream_id, file_number=1)
+        url = stream_url(category=category, stream_id=stream_id, file_number=1, base_url=base_url)
 
         response = requests.head(url)
         if response.status_code == 200:
             # If the file exists, yield the stream generator for this stream_id
-            yield stream_generator(stream_id=stream_id, category=category, return_float=return_float)
+            yield stream_generator(stream_id=stream_id, category=category, return_float=return_float, base_url=base_url)
         else:
             break
 
@@ -1,8 +1,10 @@
 from unicodedata import category
 
+DEFAULT_BASE_URL = 'https://raw.githubusercontent.com/microprediction/endersdata/main/data'
 
-def stream_url(category, stream_id, file_number):
-    url = f'https://raw.githubusercontent.com/microprediction/endersdata/main/data/{category.lower()}/stream_{stream_id}_file_{file_number}.csv'
+
+def stream_url(category, stream_id, file_number, base_url=None):
+    url = f'{(base_url or DEFAULT_BASE_URL).rstrip("/")}/{category.lower()}/stream_{stream_id}_file_{file_number}.csv'
     return url
 
 
@@ -13,4 +15,4 @@ if __name__=='__main__':
 
     import matplotlib.pyplot as plt
     plt.plot(df['value'])
-    plt.show()
\ No newline at end of file
+    plt.show()
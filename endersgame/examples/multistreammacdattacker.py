@@ -0,0 +1,77 @@
+import numpy as np
+from endersgame.attackers.multistreamattacker import MultiStreamAttacker
+
+
+class MultiStreamMacdAttacker(MultiStreamAttacker):
+    """
+
+        MacdAttacker for many streams at once. The fast and slow FEWMean averages, the exponentially
+        weighted variance of the MACD line (as river's EWVar computes it) and the abstention counters
+        are arrays indexed by stream.
+
+    """
+
+    def __init__(self, num_streams: int, window_slow=26, window_fast=12, decision_threshold=2.0, min_abstention=50,
+                 fading_factor=0.01, warmup=500, polarity=1, epsilon=0.01, **kwargs):
+        """
+        Parameters are those of MacdAttacker, less window_sign which plays no part in its decisions.
+        """
+        super().__init__(num_streams=num_streams, epsilon=epsilon, **kwargs)
+        self.fading_slow = 2 / (window_slow + 1)
+        self.fading_fast = 2 / (window_fast + 1)
+        self.fading_factor = fading_factor
+        self.decision_threshold = decision_threshold
+        self.min_abstention = min_abstention
+        self.warmup = warmup
+        self.polarity = polarity
+
+        self.observation_count = np.zeros(num_streams, dtype=np.int64)
+        self.abstention_count = np.full(num_streams, min_abstention, dtype=np.int64)
+        self.ema_slow = np.zeros(num_streams)
+        self.ema_slow_weight = np.zeros(num_streams)
+        self.ema_fast = np.zeros(num_streams)
+        self.ema_fast_weight = np.zeros(num_streams)
+        self.line_value = np.zeros(num_streams)
+        self.line_mean = np.zeros(num_streams)
+        self.line_mean_square = np.zeros(num_streams)
+
+    def tick(self, xs, ndxs):
+        observed = ~np.isnan(xs)
+        ndxs, xs = ndxs[observed], xs[observed]
+        first = self.observation_count[ndxs] == 0
+        self.observation_count[ndxs] += 1
+
+        fast = _fewmean_update(self.ema_fast, self.ema_fast_weight, ndxs, xs, first, self.fading_fast)
+        slow = _fewmean_update(self.ema_slow, self.ema_slow_weight, ndxs, xs, first, self.fading_slow)
+        line = fast - slow
+        self.line_value[ndxs] = line
+
+        f = self.fading_factor
+        self.line_mean[ndxs] = np.where(first, line, f * line + (1. - f) * self.line_mean[ndxs])
+        self.line_mean_square[ndxs] = np.where(first, line * line,
+                                               f * (line * line) + (1. - f) * self.line_mean_square[ndxs])
+
+    def predict(self, ndxs, horizon: int = None):
+        decisions = np.zeros(len(ndxs))
+        warm = self.observation_count[ndxs] >= self.warmup
+        abstaining = warm & (self.abstention_count[ndxs] < self.min_abstention)
+        self.abstention_count[ndxs[abstaining]] += 1
+
+        active = np.flatnonzero(warm & ~abstaining)
+        streams = ndxs[active]
+        variance = self.line_mean_square[streams] - self.line_mean[streams] ** 2
+        std = np.sqrt(np.maximum(variance, 0.))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            standardized_signal = np.where(std > 0, self.line_value[streams] / std * np.sign(self.polarity), 0.)
+        decisions[active] = np.trunc(standardized_signal / self.decision_threshold)
+        self.abstention_count[streams[decisions[active] != 0]] = 0
+        return decisions
+
+
+def _fewmean_update(ewa, weight_sum, ndxs, xs, first, fading_factor):
+    """ FEWMean.update() for the streams ndxs, in place. Returns the new averages. """
+    weight = (1 - fading_factor) * weight_sum[ndxs]
+    updated = np.where(first, xs, (weight * ewa[ndxs] + xs) / (weight + 1))
+    ewa[ndxs] = updated
+    weight_sum[ndxs] = np.where(first, 1., weight + 1)
+    return updated
@@ -0,0 +1,33 @@
+import numpy as np
+from endersgame.attackers.multistreamattacker import MultiStreamAttacker
+
+
+class MultiStreamMeanReversionAttacker(MultiStreamAttacker):
+    """
+        MeanReversionAttacker for many streams at once, with the moving averages held in one array.
+    """
+
+    def __init__(self, num_streams: int, a=0.01, **kwargs):
+        super().__init__(num_streams=num_streams, **kwargs)
+        self.a = a
+        self.running_avg = np.full(num_streams, np.nan)     # NaN until a stream has seen a value
+        self.current_value = np.full(num_streams, np.nan)
+
+    def tick(self, xs, ndxs):
+        # Maintains an expon moving average of each stream, skipping missing values
+        self.current_value[ndxs] = xs
+        avg = self.running_avg[ndxs]
+        updated = np.where(np.isnan(avg), xs, (1 - self.a) * avg + self.a * xs)
+        self.running_avg[ndxs] = np.where(np.isnan(xs), avg, updated)
+
+    def predict(self, ndxs, horizon: int = None):
+        current, avg = self.current_value[ndxs], self.running_avg[ndxs]
+        return np.where(current > avg + 1, -1., np.where(current < avg - 1, 1., 0.))
+
+
+if __name__ == '__main__':
+    attacker = MultiStreamMeanReversionAttacker(num_streams=1000)
+    xs = np.cumsum(np.random.randn(2000, 1000), axis=0)
+    for row in xs:
+        attacker.tick_and_predict(xs=row)
+    print(sum(s['total_profit'] for s in attacker.pnl.summaries()))
@@ -1,4 +1,8 @@
 from collections import deque
+import numpy as np
+from endersgame.mixins.arrayhistory import ArrayHistory
+from endersgame.mixins.memmaphistory import MemmapHistory
+from endersgame.mixins.deltahistory import DeltaHistory, DEFAULT_HISTORY_SCALE, DELTA_HISTORY_DTYPES
 
 DEFAULT_HISTORY_LEN = 1000
 
@@ -8,11 +12,21 @@ class HistoryMixin:
     A mixin that provides history management functionality with a fixed-length buffer.
     Classes that require history tracking can inherit from this mixin to manage
     a deque-based history.
+
+    Supplying history_path stores the buffer in a memory-mapped float64 file instead (see MemmapHistory),
+    which suits very long lookbacks and lets a restarted process reopen the window instantly.
+
+    Supplying history_dtype trades precision for memory when only approximate lags are needed:
+       'float32'                 Half the memory of float64, relative error below 6e-8 (see ArrayHistory)
+       'int8','int16','int32'    Delta encoding in units of history_scale, absolute error at most
+                                 history_scale/2 for moderate moves (see DeltaHistory)
     """
 
-    def __init__(self, max_history_len=DEFAULT_HISTORY_LEN):
+    def __init__(self, max_history_len=DEFAULT_HISTORY_LEN, history_path:str=None, history_dtype:str=None,
+                 history_scale:float=DEFAULT_HISTORY_SCALE):
         self.max_history_len = max_history_len  # Store as an instance attribute
-        self.history = deque(maxlen=max_history_len)  # Fixed-length buffer for history
+        self.history = HistoryMixin.make_history(maxlen=max_history_len, history_path=history_path,
+                                                 history_dtype=history_dtype, history_scale=history_scale)
 
     def tick_history(self, x) -> None:
         """
@@ -28,6 +42,21 @@ class HistoryMixin:
             x = 0.0  # Default value if conversion fails
         self.history.append(x)
 
+    def tick_history_many(self, xs) -> None:
+        """
+        Adds a chunk of values to the history, coercing them as tick_history() would.
+
+        Parameters:
+        - xs: List, ndarray or float64 buffer of values in chronological order.
+        """
+        xs = HistoryMixin.coerce_history(xs)
+        if isinstance(self.history, deque):
+            if self.history.maxlen is not None:
+                xs = xs[max(len(xs) - self.history.maxlen, 0):]
+            self.history.extend(xs.tolist())
+        else:
+            self.history.extend(xs)
+
     def get_recent_history(self, n: int=None) -> list:
         """
         Returns the `n` most recent values from the history.
@@ -41,8 +70,10 @@ class HistoryMixin:
         """
         if n is None:
             return list(self.history)
-        else:
+        elif isinstance(self.history, deque):
             return list(self.history)[-n:]
+        else:
+            return self.history.recent(n)
 
     def __len__(self):
         return len(self.history)
@@ -63,6 +94,8 @@ class HistoryMixin:
         Returns:
         - dict: A dictionary containing the serialized state.
         """
+        if isinstance(self.history, ArrayHistory):
+            return {'max_history_len': self.max_history_len, **self.history.to_dict()}
         return {
             'max_history_len': self.max_history_len,
             'history': list(self.history)  # Convert deque to list for serialization
@@ -81,19 +114,89 @@ class HistoryMixin:
         """
         max_history_len_with_fallback = state.get('max_history_len', DEFAULT_HISTORY_LEN)
         instance = cls(max_history_len=max_history_len_with_fallback)
-        history_data = state.get('history', [])
-        instance.history = HistoryMixin.set_history(history_data=history_data, maxlen=max_history_len_with_fallback)
+        instance.history = HistoryMixin.history_from_dict(state)
         return instance
 
+    @staticmethod
+    def make_history(maxlen, history_path:str=None, history_dtype:str=None, history_scale:float=DEFAULT_HISTORY_SCALE):
+        """
+        Creates an empty history buffer, or reopens the memory-mapped one at history_path.
+        """
+        if history_dtype in [None, 'float64']:
+            if history_path is not None:
+                return MemmapHistory(path=history_path, maxlen=maxlen)
+            return deque(maxlen=maxlen)
+        if history_path is not None:
+            raise ValueError('Memory-mapped history is always float64, so history_dtype cannot be set as well')
+        if history_dtype == 'float32':
+            return ArrayHistory(maxlen=maxlen, dtype=np.float32)
+        if history_dtype in DELTA_HISTORY_DTYPES:
+            return DeltaHistory(maxlen=maxlen, dtype=history_dtype, scale=history_scale)
+        raise ValueError(f'history_dtype must be float64, float32 or one of {DELTA_HISTORY_DTYPES}')
+
+    @staticmethod
+    def history_from_dict(state: dict):
+        """
+        Restores the history buffer serialized by to_dict().
+        """
+        maxlen = state.get('max_history_len', DEFAULT_HISTORY_LEN)
+        if state.get('history_path') is not None:
+            return MemmapHistory(path=state['history_path'], maxlen=maxlen)
+        history_dtype = state.get('history_dtype')
+        if history_dtype in DELTA_HISTORY_DTYPES:
+            return DeltaHistory.from_codes(maxlen=maxlen, dtype=history_dtype,
+                                           scale=state.get('history_scale', DEFAULT_HISTORY_SCALE),
+                                           anchor=state.get('history_anchor'), codes=state.get('history_codes', []))
+        if history_dtype == 'float32':
+            compact_history = ArrayHistory(maxlen=maxlen, dtype=np.float32)
+            compact_history.extend(HistoryMixin.coerce_history(state.get('history', [])))
+            return compact_history
+        return HistoryMixin.set_history(history_data=state.get('history', []), maxlen=maxlen)
+
     @staticmethod
     def set_history(history_data, maxlen):
-        coerced_history = []
-        for item in history_data:
+        """
+        Builds a history deque from serialized data, coercing items to float (0.0 if that fails).
+
+        Parameters:
+        - history_data: A list, ndarray, or float64 buffer (bytes, memoryview, array.array).
+        - maxlen (int): Length of the buffer.
+        """
+        if isinstance(history_data, list):
             try:
-                coerced_item = float(item)
+                return deque(map(float, history_data), maxlen=maxlen)   # No per-item Python work
             except (ValueError, TypeError):
-                coerced_item = 0.0  # Default value if conversion fails
-            coerced_history.append(coerced_item)
-        history = deque(coerced_history, maxlen=maxlen)
+                return deque(map(_coerce_item, history_data), maxlen=maxlen)
+        coerced_history = HistoryMixin.coerce_history(history_data)
+        if maxlen is not None and len(coerced_history) > maxlen:
+            coerced_history = coerced_history[len(coerced_history) - maxlen:]
+        history = deque(coerced_history.tolist(), maxlen=maxlen)
         return history
 
+    @staticmethod
+    def coerce_history(history_data) -> np.ndarray:
+        """
+        Converts history_data to a float64 array in one step.
+
+        Numeric arrays and buffers are converted directly (bytes, and memoryviews of bytes, are read as raw float64). Anything else
+        goes through float() as in tick_history(), with items that cannot be converted becoming 0.0.
+        """
+        if isinstance(history_data, (bytes, bytearray)) or \
+                (isinstance(history_data, memoryview) and history_data.format in ('B', 'b', 'c')):
+            return np.frombuffer(history_data, dtype=np.float64)
+        if isinstance(history_data, memoryview) or \
+                (isinstance(history_data, np.ndarray) and history_data.dtype.kind in 'biuf'):
+            return np.asarray(history_data, dtype=np.float64).ravel()
+        if not hasattr(history_data, '__len__'):
+            history_data = list(history_data)
+        try:
+            return np.fromiter(map(float, history_data), dtype=np.float64, count=len(history_data))
+        except (ValueError, TypeError):
+            return np.fromiter(map(_coerce_item, history_data), dtype=np.float64, count=len(history_data))
+
+
+def _coerce_item(item) -> float:
+    try:
+        return float(item)
+    except (ValueError, TypeError):
+        return 0.0  # Default value if conversion fails
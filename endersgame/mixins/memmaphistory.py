@@ -0,0 +1,50 @@
+import os
+import numpy as np
+from endersgame.mixins.arrayhistory import ArrayHistory
+
+MEMMAP_HISTORY_MAGIC = 0x454E4445525348    # 'ENDERSH'
+MEMMAP_HISTORY_HEADER_LEN = 4                # [magic, maxlen, start, count] as int64
+
+
+class MemmapHistory(ArrayHistory):
+    """
+    A float64 ring buffer stored in a memory-mapped file.
+
+    Intended for very long lookback windows. Re-opening an existing file restores the window
+    instantly (the OS page cache does the work) and only the pages actually touched become resident.
+
+    File layout:  int64 header [magic, maxlen, start, count] followed by maxlen float64 values.
+    """
+
+    def __init__(self, path: str, maxlen: int):
+        self.path = str(path)
+        self.maxlen = int(maxlen)
+        header_bytes = MEMMAP_HISTORY_HEADER_LEN * 8
+        if not os.path.exists(self.path):
+            with open(self.path, 'wb') as f:
+                f.truncate(header_bytes + 8 * self.maxlen)   # Sparse until written
+            header = np.memmap(self.path, dtype=np.int64, mode='r+', shape=(MEMMAP_HISTORY_HEADER_LEN,))
+            header[:2] = [MEMMAP_HISTORY_MAGIC, self.maxlen]
+        else:
+            header = np.memmap(self.path, dtype=np.int64, mode='r+', shape=(MEMMAP_HISTORY_HEADER_LEN,))
+            if int(header[0]) != MEMMAP_HISTORY_MAGIC:
+                raise ValueError(f'{self.path} is not a history file')
+            if int(header[1]) != self.maxlen:
+                raise ValueError(f'{self.path} holds a history of length {int(header[1])}, not {self.maxlen}')
+        self._file_header = header
+        self._header = header[2:]
+        self._values = np.memmap(self.path, dtype=np.float64, mode='r+', offset=header_bytes, shape=(max(self.maxlen, 1),))
+
+    def flush(self) -> None:
+        """
+        Pushes dirty pages to disk. The OS will do this eventually anyway.
+        """
+        self._values.flush()
+        self._file_header.flush()
+
+    def to_dict(self) -> dict:
+        """
+        The file is the state, so only its location is serialized.
+        """
+        self.flush()
+        return {'history_path': self.path}
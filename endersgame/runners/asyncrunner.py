@@ -0,0 +1,163 @@
+import asyncio
+import time
+from collections import deque
+import numpy as np
+from endersgame.gameconfig import HORIZON
+
+"""
+    Run attackers live over many concurrent feeds:
+
+        runner = AsyncRunner(attacker_factory=MyAttacker)
+        result = asyncio.run(runner.run(feeds={'btc': btc_feed(), 'eth': eth_feed()}))
+
+    Each feed is an async iterator of floats (or {'x': value} dicts) with its own attacker and a bounded
+    queue. A single consumer per stream keeps values in arrival order. When a feed gets ahead of its
+    attacker the queue fills and the feed is paused (backpressure) rather than buffering without limit.
+
+    Slow attackers can be moved off the event loop with executor=ThreadPoolExecutor() or ProcessPoolExecutor().
+    With a process pool, the attacker is shipped to the worker and back on every batch, so raise max_batch_size
+    to amortize that.
+"""
+
+DEFAULT_MAX_QUEUE_SIZE = 1000
+LATENCY_WINDOW = 10000      # Latest latencies kept per stream for percentiles, so that memory stays bounded
+_END = object()     # Marks the end of a feed in its queue
+
+
+class AsyncRunner:
+
+    def __init__(self, attacker_factory, horizon: int = HORIZON, max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+                 max_batch_size: int = 1, executor=None, on_decision=None):
+        """
+        :param attacker_factory:  Callable returning a new attacker, one per stream
+        :param horizon:           Prediction horizon
+        :param max_queue_size:    Values buffered per stream before its feed is paused
+        :param max_batch_size:    Most queued values passed to the attacker at once (via tick_and_predict_many)
+        :param executor:          Optional concurrent.futures executor for the attacker calls
+        :param on_decision:       Optional callable (name, x, decision) invoked for every value, in order
+        """
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.attacker_factory = attacker_factory
+        self.horizon = horizon
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.on_decision = on_decision
+        self.attackers = {}
+        self.metrics = {}
+        self._queues = {}
+
+    def queue_depths(self) -> dict:
+        """
+        Values waiting for each stream's attacker right now.
+        """
+        return {name: queue.qsize() for name, queue in self._queues.items()}
+
+    async def run(self, feeds: dict) -> dict:
+        """
+        :param feeds:  Dict from stream name to async iterator of values
+        :return: Per stream Pnl summary and metrics
+        """
+        start_time = time.perf_counter()
+        self.attackers = {name: self.attacker_factory() for name in feeds}
+        self.metrics = {name: StreamMetrics() for name in feeds}
+        self._queues = {name: asyncio.Queue(maxsize=self.max_queue_size) for name in feeds}
+        tasks = []
+        for name, feed in feeds.items():
+            tasks.append(asyncio.ensure_future(self._produce(name, feed)))
+            tasks.append(asyncio.ensure_future(self._consume(name)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        streams = {}
+        for name, attacker in self.attackers.items():
+            pnl = getattr(attacker, 'pnl', None)
+            streams[name] = {'summary': pnl.summary() if pnl is not None else None,
+                             **self.metrics[name].to_dict()}
+        return {'streams': streams, 'elapsed_seconds': time.perf_counter() - start_time}
+
+    async def _produce(self, name, feed):
+        queue = self._queues[name]
+        metrics = self.metrics[name]
+        async for value in feed:
+            x = value['x'] if isinstance(value, dict) else value
+            if queue.full():
+                metrics.backpressure_events += 1
+            await queue.put((x, time.perf_counter()))
+            metrics.max_queue_depth = max(metrics.max_queue_depth, queue.qsize())
+        await queue.put(_END)
+
+    async def _consume(self, name):
+        queue = self._queues[name]
+        metrics = self.metrics[name]
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch[-1] is _END:
+                batch.pop()
+                finished = True
+            if not batch:
+                continue
+            xs = [x for x, _ in batch]
+            if self.executor is None:
+                attacker, decisions = _advance(self.attackers[name], xs, self.horizon)
+            else:
+                attacker, decisions = await loop.run_in_executor(self.executor, _advance,
+                                                                 self.attackers[name], xs, self.horizon)
+            self.attackers[name] = attacker     # A process pool hands back a copy
+            done_time = time.perf_counter()
+            metrics.num_points += len(batch)
+            metrics.num_batches += 1
+            metrics.record_latencies([done_time - arrival_time for _, arrival_time in batch])
+            if self.on_decision is not None:
+                for x, decision in zip(xs, decisions):
+                    self.on_decision(name, x, decision)
+
+
+class StreamMetrics:
+
+    def __init__(self, latency_window: int = LATENCY_WINDOW):
+        self.num_points = 0
+        self.num_batches = 0
+        self.max_queue_depth = 0
+        self.backpressure_events = 0    # Times the feed found the queue full and had to wait
+        self.latencies = deque(maxlen=latency_window)     # Recent seconds from arrival to decision, per value
+        self.num_latencies = 0
+        self.total_latency = 0.
+        self.max_latency = None
+
+    def record_latencies(self, latencies: list):
+        if not latencies:
+            return
+        self.latencies.extend(latencies)
+        self.num_latencies += len(latencies)
+        self.total_latency += sum(latencies)
+        self.max_latency = max(latencies) if self.max_latency is None else max(self.max_latency, max(latencies))
+
+    def to_dict(self) -> dict:
+        """
+        Mean and max latencies are over all values, the percentile over the most recent latency_window.
+        """
+        return {'num_points': self.num_points,
+                'num_batches': self.num_batches,
+                'max_queue_depth': self.max_queue_depth,
+                'backpressure_events': self.backpressure_events,
+                'mean_latency_seconds': self.total_latency / self.num_latencies if self.num_latencies else None,
+                'p99_latency_seconds': float(np.percentile(self.latencies, 99)) if self.latencies else None,
+                'max_latency_seconds': self.max_latency}
+
+
+def _advance(attacker, xs: list, horizon: int):
+    """
+    Feeds values to the attacker, possibly in another process, and returns it with its decisions.
+    """
+    if len(xs) == 1:
+        return attacker, [attacker.tick_and_predict(xs[0], horizon)]
+    decisions = attacker.tick_and_predict_many(np.asarray(xs, dtype=np.float64), horizon=horizon)
+    return attacker, list(decisions)
@@ -0,0 +1,70 @@
+import json
+import os
+
+"""
+    Crash-safe persistence of runner progress in a local directory.
+
+    A checkpoint is written to a temporary file, fsync'd, and atomically renamed over the previous one, so
+    checkpoint.json is always complete. The write-ahead marker checkpoint.pending exists only while a write
+    is in flight. Finding it on load means the process died mid-write, and the leftover temporary file is discarded.
+"""
+
+CHECKPOINT_FILE = 'checkpoint.json'
+PENDING_MARKER = 'checkpoint.pending'
+
+
+def save_checkpoint(directory: str, state: dict) -> None:
+    os.makedirs(directory, exist_ok=True)
+    marker = os.path.join(directory, PENDING_MARKER)
+    target = os.path.join(directory, CHECKPOINT_FILE)
+    temporary = target + '.tmp'
+    with open(marker, 'w') as f:
+        f.write(str(state.get('offset')))
+        _sync(f)
+    with open(temporary, 'w') as f:
+        json.dump(state, f)
+        _sync(f)
+    os.replace(temporary, target)
+    _sync_directory(directory)
+    os.remove(marker)
+
+
+def load_checkpoint(directory: str):
+    """
+    :return: The last complete checkpoint, or None if there is none
+    """
+    marker = os.path.join(directory, PENDING_MARKER)
+    target = os.path.join(directory, CHECKPOINT_FILE)
+    if os.path.exists(marker):
+        for interrupted in [target + '.tmp', marker]:
+            if os.path.exists(interrupted):
+                os.remove(interrupted)
+    if not os.path.exists(target):
+        return None
+    with open(target) as f:
+        return json.load(f)
+
+
+def clear_checkpoint(directory: str) -> None:
+    target = os.path.join(directory, CHECKPOINT_FILE)
+    for leftover in [target, target + '.tmp', os.path.join(directory, PENDING_MARKER)]:
+        if os.path.exists(leftover):
+            os.remove(leftover)
+
+
+def _sync(f) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _sync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return      # Not possible on every platform
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
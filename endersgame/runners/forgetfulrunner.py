@@ -1 +1,244 @@
+import time
+from functools import partial
+from itertools import islice
+import numpy as np
+from endersgame.accounting.pnl import Pnl
+from endersgame.accounting.pnlutil import zero_pnl_summary, add_pnl_summaries
+from endersgame.attackers.baseattacker import BaseAttacker
+from endersgame.runners.checkpoint import save_checkpoint, load_checkpoint, clear_checkpoint
+from endersgame.gameconfig import HORIZON
 
+"""
+    Evaluate an attacker over many streams, starting afresh on each one:
+
+        runner = ForgetfulRunner(attacker_factory=MyAttacker)
+        result = runner.run(streams=[xs_1, xs_2, ...])
+        result['total']                     # Aggregated Pnl summary
+        result['streams']                   # Pnl summary per stream
+
+    Streams can be lists or arrays of floats, or generators such as stream_generator() yielding
+    either floats or {'x': value} dicts, or chunk_generator() yielding arrays.
+"""
+
+CHECK_EVERY = 1000              # Points between early termination checks when not chunking
+ARRAY_BLOCK_SIZE = 65536        # Values of an array converted to floats at a time
+OVERHEAD_BUDGET_NS = 300        # Target for runner cost per point, beyond the attacker's own tick_and_predict
+
+
+class ForgetfulRunner:
+
+    def __init__(self, attacker_factory, horizon: int = HORIZON, chunk_size: int = None,
+                 max_points_per_stream: int = None, max_streams: int = None, stop_condition=None,
+                 checkpoint_dir: str = None, checkpoint_every: int = 10000, keep_records: bool = False):
+        """
+        :param attacker_factory:        Callable returning a new attacker, e.g. the attacker class
+        :param horizon:                 Prediction horizon passed to tick_and_predict
+        :param chunk_size:              If set, feed attackers chunks via tick_and_predict_many()
+        :param max_points_per_stream:   Truncate each stream
+        :param max_streams:             Stop after this many streams
+        :param stop_condition:          Callable (stream_ndx, attacker) -> bool, checked between chunks. True ends the run.
+        :param checkpoint_dir:          If set, progress is saved here and a restarted run() resumes from it
+        :param checkpoint_every:        Points between checkpoints (rounded up to whole chunks)
+        :param keep_records:            Include each stream's Pnl ledger (pnl.to_records()) in the result
+        """
+        self.attacker_factory = attacker_factory
+        self.horizon = horizon
+        self.chunk_size = chunk_size
+        self.max_points_per_stream = max_points_per_stream
+        self.max_streams = max_streams
+        self.stop_condition = stop_condition
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_every = checkpoint_every
+        self.keep_records = keep_records
+        self.stopped_early = False
+        self.attacker = None        # The most recent attacker
+        self.pnl = None             # ... and the Pnl it was scored with
+        self._completed = None      # Summaries and records of finished streams, when checkpointing
+
+    def run(self, streams) -> dict:
+        """
+        Runs a fresh attacker over each stream and aggregates the Pnl summaries.
+
+        Streams are assumed to replay identically, so that a run restarted with the same streams
+        and checkpoint_dir picks up exactly where the last checkpoint left off. Attackers must then
+        round-trip through to_dict() and from_dict(), constructor arguments included: the attacker
+        class's from_dict() rebuilds a resumed attacker, so arguments that attacker_factory binds
+        (e.g. with functools.partial) are not applied again.
+        """
+        self.stopped_early = False
+        start_time = time.perf_counter()
+        checkpoint = load_checkpoint(self.checkpoint_dir) if self.checkpoint_dir else None
+        stream_summaries = checkpoint['streams'] if checkpoint else []
+        stream_records = checkpoint.get('records', []) if checkpoint else []
+        self._completed = {'streams': stream_summaries, 'records': stream_records}
+        for stream_ndx, stream in enumerate(islice(streams, self.max_streams)):
+            attacker, pnl, offset = None, None, 0
+            if checkpoint is not None:
+                if stream_ndx < checkpoint['stream_ndx']:
+                    continue
+                if stream_ndx == checkpoint['stream_ndx'] and checkpoint['attacker'] is not None:
+                    attacker = _attacker_class(self.attacker_factory).from_dict(checkpoint['attacker'])
+                    pnl = Pnl.from_dict(checkpoint['pnl']) if checkpoint.get('pnl') is not None else None
+                    offset = checkpoint['offset']
+            summary = self.run_stream(stream=stream, stream_ndx=stream_ndx, attacker=attacker, offset=offset,
+                                      pnl=pnl)
+            stream_summaries.append(summary)
+            if self.keep_records:
+                stream_records.append(self.pnl.to_records())
+            if self.checkpoint_dir:
+                self._save(stream_ndx=stream_ndx + 1, offset=0, attacker=None)
+            if self.stopped_early:
+                break
+        if self.checkpoint_dir:
+            clear_checkpoint(self.checkpoint_dir)
+
+        total = zero_pnl_summary()
+        for summary in stream_summaries:
+            total = add_pnl_summaries(total, summary)
+        result = {'total': total,
+                  'streams': stream_summaries,
+                  'num_streams': len(stream_summaries),
+                  'num_points': total['current_ndx'],
+                  'elapsed_seconds': time.perf_counter() - start_time,
+                  'stopped_early': self.stopped_early}
+        if self.keep_records:
+            result['records'] = stream_records
+        return result
+
+    def run_stream(self, stream, stream_ndx: int = 0, attacker=None, offset: int = 0, pnl: Pnl = None) -> dict:
+        """
+        Runs an attacker (a new one unless supplied) over one stream.
+        :param offset:  Number of points at the start of the stream that the attacker has already seen
+        :param pnl:     When resuming an attacker without its own Pnl, the Pnl that scored those points
+        :return: The attacker's Pnl summary
+        """
+        attacker = self.attacker_factory() if attacker is None else attacker
+        attacker_pnl = getattr(attacker, 'pnl', None)
+        own_pnl = None if attacker_pnl is not None else Pnl() if pnl is None else pnl     # For attackers without one
+        self.attacker, self.pnl = attacker, (attacker_pnl if own_pnl is None else own_pnl)
+        values = _iter_values(stream)
+        if offset or self.max_points_per_stream is not None:
+            values = islice(values, offset, self.max_points_per_stream)
+        block_size = self.chunk_size or CHECK_EVERY
+        horizon = self.horizon
+        num_points = last_checkpoint = offset
+        while True:
+            block = list(islice(values, block_size))
+            if not block:
+                break
+            if self.chunk_size:
+                decisions = attacker.tick_and_predict_many(np.asarray(block, dtype=np.float64), horizon=horizon)
+            elif own_pnl is None:
+                tick_and_predict = attacker.tick_and_predict
+                for x in block:
+                    tick_and_predict(x, horizon)
+            else:
+                tick_and_predict = attacker.tick_and_predict
+                decisions = [tick_and_predict(x, horizon) for x in block]
+            if own_pnl is not None:
+                own_pnl.tick_many(xs=block, horizon=horizon, decisions=decisions)
+            num_points += len(block)
+            if self.checkpoint_dir and num_points - last_checkpoint >= self.checkpoint_every:
+                self._save(stream_ndx=stream_ndx, offset=num_points, attacker=attacker, pnl=own_pnl)
+                last_checkpoint = num_points
+            if self.stop_condition is not None and self.stop_condition(stream_ndx, attacker):
+                self.stopped_early = True
+                break
+        return self.pnl.summary()
+
+    def _save(self, stream_ndx: int, offset: int, attacker, pnl: Pnl = None) -> None:
+        """
+        :param pnl:  The runner's own Pnl for an attacker without one, which the attacker's state does not include
+        """
+        completed = self._completed or {'streams': [], 'records': []}
+        save_checkpoint(self.checkpoint_dir, {'stream_ndx': stream_ndx,
+                                              'offset': offset,
+                                              'attacker': None if attacker is None else attacker.to_dict(),
+                                              'pnl': None if pnl is None else pnl.to_dict(),
+                                              'streams': completed['streams'],
+                                              'records': completed['records']})
+
+
+def _attacker_class(attacker_factory) -> type:
+    """
+    The class of attacker that attacker_factory makes, without making one when the factory is a class or a partial of one.
+    """
+    factory = attacker_factory
+    while isinstance(factory, partial):
+        factory = factory.func
+    return factory if isinstance(factory, type) else type(attacker_factory())
+
+
+def _iter_values(stream):
+    """
+    Floats from a stream of floats, an ndarray, a stream of {'x': value} dicts, or a stream of
+    ndarray chunks such as chunk_generator() yields.
+    """
+    if isinstance(stream, np.ndarray):
+        return _iter_array(stream)
+    values = iter(stream)
+    try:
+        first = next(values)
+    except StopIteration:
+        return iter([])
+    if isinstance(first, dict):
+        return (message['x'] for message in _chain(first, values))
+    if isinstance(first, np.ndarray):
+        return (x for chunk in _chain(first, values) for x in _iter_array(chunk))
+    return _chain(first, values)
+
+
+def _iter_array(xs: np.ndarray):
+    """
+    Floats from an array, converted a block at a time so that a memory mapped or shared array is never copied whole.
+    """
+    for start in range(0, len(xs), ARRAY_BLOCK_SIZE):
+        yield from xs[start:start + ARRAY_BLOCK_SIZE].tolist()
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+class _NullAttacker(BaseAttacker):
+
+    def __init__(self):
+        super().__init__()
+        self.pnl = Pnl()
+
+    def tick_and_predict(self, x, horizon=HORIZON):
+        return 0
+
+
+def benchmark_overhead(num_points: int = 200000, chunk_size: int = None) -> dict:
+    """
+    Measures the runner's own cost per point by running an attacker that does nothing,
+    and comparing against calling its tick_and_predict() directly in a loop.
+    """
+    xs = np.random.randn(num_points)
+    attacker = _NullAttacker()
+    values = xs.tolist()
+    start_time = time.perf_counter()
+    tick_and_predict = attacker.tick_and_predict
+    for x in values:
+        tick_and_predict(x, HORIZON)
+    bare_seconds = time.perf_counter() - start_time
+
+    runner = ForgetfulRunner(attacker_factory=_NullAttacker, chunk_size=chunk_size)
+    start_time = time.perf_counter()
+    runner.run(streams=[xs])
+    runner_seconds = time.perf_counter() - start_time
+
+    bare_ns = 1e9 * bare_seconds / num_points
+    runner_ns = 1e9 * runner_seconds / num_points
+    return {'num_points': num_points,
+            'bare_ns_per_point': bare_ns,
+            'runner_ns_per_point': runner_ns,
+            'overhead_ns_per_point': runner_ns - bare_ns,
+            'overhead_budget_ns': OVERHEAD_BUDGET_NS}
+
+
+if __name__ == '__main__':
+    from pprint import pprint
+    pprint(benchmark_overhead())
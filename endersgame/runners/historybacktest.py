@@ -0,0 +1,72 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from endersgame.accounting.pnl import Pnl
+from endersgame.gameconfig import HORIZON
+
+"""
+    Offline scoring of attackers that are pure functions of a fixed length window, i.e. subclasses
+    of Attacker that only implement predict_using_history(xs). Instead of ticking the attacker one
+    point at a time, every window of the series is viewed at once (no copies) and scored in one call
+    to predict_using_history_batch(windows) if the attacker provides it.
+
+        pnl = history_backtest(attacker=MyAttacker(max_history_len=100), xs=xs)
+        pnl.summary()
+
+"""
+
+
+def history_decisions(attacker, xs, horizon: int = HORIZON, backoff: int = None) -> np.ndarray:
+    """
+    Decisions of attacker.predict_using_history() at every point of xs, as Attacker.tick_and_predict()
+    would make them: zero until max_history_len points have been seen.
+
+    If the attacker has no predict_using_history_batch(), the scalar function is called on each window
+    instead, skipping points where a Pnl with this backoff would discard the decision anyway. Those
+    points are left at zero, so the Pnl that results is unchanged.
+
+    :param attacker:  An Attacker, used only for its max_history_len and prediction functions
+    :param xs:        The whole series
+    :param horizon:   The prediction horizon
+    :param backoff:   Pnl backoff, defaulting to that of attacker.pnl
+    :return: Array of decisions the same length as xs
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    window_len = attacker.max_history_len
+    if window_len < 1:
+        raise ValueError('history_decisions requires max_history_len of at least 1')
+    decisions = np.zeros(len(xs))
+    if len(xs) < window_len:
+        return decisions
+
+    windows = sliding_window_view(xs, window_len)
+    batch_decisions = attacker.predict_using_history_batch(windows=windows, horizon=horizon)
+    if batch_decisions is not None:
+        decisions[window_len - 1:] = batch_decisions
+        return decisions
+
+    if backoff is None:
+        backoff = attacker.pnl.backoff
+    last_attack_ndx = None
+    for window_ndx in range(len(windows)):
+        ndx = window_ndx + window_len - 1
+        if last_attack_ndx is not None and ndx - last_attack_ndx < backoff:
+            continue
+        decision = attacker.predict_using_history(xs=windows[window_ndx].tolist(), horizon=horizon)
+        decisions[ndx] = decision
+        if decision != 0:
+            last_attack_ndx = ndx
+    return decisions
+
+
+def history_backtest(attacker, xs, horizon: int = HORIZON) -> Pnl:
+    """
+    Scores attacker over the series xs with the same epsilon and backoff as attacker.pnl.
+    The attacker's own state is not modified.
+
+    :return: A Pnl holding the resolved decisions
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    pnl = Pnl(epsilon=attacker.pnl.epsilon, backoff=attacker.pnl.backoff)
+    decisions = history_decisions(attacker=attacker, xs=xs, horizon=horizon, backoff=pnl.backoff)
+    pnl.tick_many(xs=xs, horizon=horizon, decisions=decisions)
+    return pnl
@@ -0,0 +1,187 @@
+import time
+from collections import deque
+import numpy as np
+from endersgame.gameconfig import HORIZON
+
+"""
+    Group ticks from many streams so that vectorized attackers see them in one call:
+
+        batcher = MicroBatcher(groups={'mr': StreamGroup(MeanReversionAttacker, num_streams=5000)},
+                               max_batch_size=1024, max_delay=0.002)
+        for group, stream_ndx, x in arrivals:
+            for group, stream_ndx, x, decision in batcher.submit(group, stream_ndx, x):
+                ...
+        batcher.flush()
+
+    A group is any object with the multi-stream method
+
+        tick_and_predict_streams(ndxs, xs, horizon) -> decisions
+
+    which advances stream ndxs[i] by xs[i] and returns the decision for each. Streams in one call are distinct.
+    StreamGroup adapts scalar attackers to that protocol, one instance per stream.
+
+    A group's pending ticks are passed on once there are max_batch_size of them, once the oldest has waited
+    max_delay seconds (checked on submit() and poll()), or when a stream ticks again before its last value
+    was passed on, which preserves per stream order. Larger batches give more throughput and more latency.
+"""
+
+DEFAULT_MAX_BATCH_SIZE = 1024
+DEFAULT_MAX_DELAY = 0.001       # Seconds
+LATENCY_WINDOW = 100000         # Latest latencies kept for percentiles, so that memory stays bounded
+
+
+class StreamGroup:
+
+    def __init__(self, attacker_factory, num_streams: int):
+        """
+        :param attacker_factory:  Callable returning a new scalar attacker
+        :param num_streams:       Number of streams, indexed 0 .. num_streams-1
+        """
+        self.attackers = [attacker_factory() for _ in range(num_streams)]
+
+    @property
+    def num_streams(self) -> int:
+        return len(self.attackers)
+
+    def tick_and_predict_streams(self, ndxs, xs, horizon: int = HORIZON) -> np.ndarray:
+        attackers = self.attackers
+        return np.array([attackers[ndx].tick_and_predict(x, horizon) for ndx, x in zip(ndxs, xs)], dtype=np.float64)
+
+
+class MicroBatcher:
+
+    def __init__(self, groups: dict, horizon: int = HORIZON, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY, clock=time.perf_counter, latency_window: int = LATENCY_WINDOW):
+        """
+        :param groups:          Dict from group name to a multi-stream attacker (or StreamGroup)
+        :param horizon:         Prediction horizon
+        :param max_batch_size:  Pending ticks per group that trigger a call
+        :param max_delay:       Seconds the oldest pending tick of a group may wait
+        :param clock:           Returns the time in seconds
+        :param latency_window:  Latest latencies kept, over which latency_percentile() is computed
+        """
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.groups = dict(groups)
+        self.horizon = horizon
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.clock = clock
+        self._pending = {name: _Pending() for name in self.groups}
+        self.num_ticks = 0
+        self.num_calls = 0
+        self.latencies = deque(maxlen=latency_window)     # Seconds from submit() to decision, for the latest ticks
+
+    def submit(self, group, stream_ndx: int, x: float) -> list:
+        """
+        :return: List of (group, stream_ndx, x, decision) for ticks passed on as a result, possibly empty
+        """
+        now = self.clock()
+        results = []
+        if stream_ndx in self._pending[group].streams:
+            results += self._flush_group(group)
+        pending = self._pending[group]
+        pending.add(stream_ndx, x, now)
+        if len(pending.ndxs) >= self.max_batch_size or now - pending.arrivals[0] >= self.max_delay:
+            results += self._flush_group(group)
+        return results
+
+    def poll(self) -> list:
+        """
+        Passes on groups whose oldest pending tick has waited max_delay. Call this when no ticks are arriving.
+        """
+        now = self.clock()
+        results = []
+        for name, pending in self._pending.items():
+            if pending.ndxs and now - pending.arrivals[0] >= self.max_delay:
+                results += self._flush_group(name)
+        return results
+
+    def flush(self) -> list:
+        """
+        Passes on all pending ticks.
+        """
+        results = []
+        for name, pending in self._pending.items():
+            if pending.ndxs:
+                results += self._flush_group(name)
+        return results
+
+    def num_pending(self) -> int:
+        return sum(len(pending.ndxs) for pending in self._pending.values())
+
+    def latency_percentile(self, q: float = 99) -> float:
+        return float(np.percentile(self.latencies, q)) if self.latencies else None
+
+    def _flush_group(self, name) -> list:
+        pending = self._pending[name]
+        ndxs, xs, arrivals = pending.ndxs, pending.xs, pending.arrivals
+        self._pending[name] = _Pending()
+        decisions = self.groups[name].tick_and_predict_streams(np.asarray(ndxs, dtype=np.int64),
+                                                               np.asarray(xs, dtype=np.float64), self.horizon)
+        now = self.clock()
+        self.num_ticks += len(ndxs)
+        self.num_calls += 1
+        self.latencies.extend(now - arrival for arrival in arrivals)
+        return [(name, ndx, x, decision) for ndx, x, decision in zip(ndxs, xs, np.asarray(decisions).tolist())]
+
+
+class _Pending:
+
+    __slots__ = ('ndxs', 'xs', 'arrivals', 'streams')
+
+    def __init__(self):
+        self.ndxs = []
+        self.xs = []
+        self.arrivals = []
+        self.streams = set()
+
+    def add(self, stream_ndx, x, arrival):
+        self.ndxs.append(stream_ndx)
+        self.xs.append(x)
+        self.arrivals.append(arrival)
+        self.streams.add(stream_ndx)
+
+
+def benchmark_microbatching(num_streams: int = 2000, num_rounds: int = 20, batch_sizes=(1, 16, 256, 2000),
+                            max_delay: float = 0.01, p99_budget: float = 0.01) -> dict:
+    """
+    Every stream ticks once per round, as a burst arriving together. Compares one scalar MeanReversionAttacker
+    per stream (StreamGroup, one tick per call) with MultiStreamMeanReversionAttacker at several batch sizes.
+    The multi-stream attacker also keeps its Pnl, which the scalar one does not.
+
+    :param p99_budget:  Latency budget in seconds; the best configuration is the fastest one within it
+    :return: Ticks per second and p99 latency for each configuration
+    """
+    from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+    from endersgame.examples.multistreammeanreversionattacker import MultiStreamMeanReversionAttacker
+    rng = np.random.default_rng(0)
+    rounds = np.cumsum(rng.standard_normal((num_rounds, num_streams)), axis=0).tolist()
+    configurations = [('scalar', lambda: StreamGroup(MeanReversionAttacker, num_streams), 1)]
+    configurations += [(f'vectorized_{size}', lambda: MultiStreamMeanReversionAttacker(num_streams), size)
+                       for size in batch_sizes]
+
+    report = {}
+    for label, make_group, batch_size in configurations:
+        batcher = MicroBatcher(groups={'mr': make_group()}, max_batch_size=batch_size, max_delay=max_delay)
+        start_time = time.perf_counter()
+        for xs in rounds:
+            for stream_ndx, x in enumerate(xs):
+                batcher.submit('mr', stream_ndx, x)
+            batcher.poll()
+        batcher.flush()
+        elapsed = time.perf_counter() - start_time
+        report[label] = {'max_batch_size': batch_size,
+                         'ticks_per_second': batcher.num_ticks / elapsed,
+                         'p99_latency_seconds': batcher.latency_percentile(99)}
+    within_budget = [label for label, row in report.items() if row['p99_latency_seconds'] <= p99_budget]
+    best = max(within_budget, key=lambda label: report[label]['ticks_per_second'], default=None)
+    return {'configurations': report,
+            'p99_budget_seconds': p99_budget,
+            'best_within_budget': best,
+            'speedup_vs_scalar': report[best]['ticks_per_second'] / report['scalar']['ticks_per_second'] if best else None}
+
+
+if __name__ == '__main__':
+    from pprint import pprint
+    pprint(benchmark_microbatching())
@@ -0,0 +1,93 @@
+import math
+import time
+import numpy as np
+from endersgame.gameconfig import HORIZON
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+"""
+    Screen many attacker configurations without paying for the losers:
+
+        runner = SuccessiveHalvingRunner(attacker_factories={f'a={a}': partial(MyAttacker, a=a) for a in grid})
+        leaderboard = runner.run(xs=xs)
+
+    All candidates see the first initial_budget points. The best keep_fraction by standardized profit
+    per decision carry on, from where they left off, over the next budget_growth times as many points,
+    and so on until min_survivors remain, which then consume the rest of the data.
+"""
+
+
+class SuccessiveHalvingRunner:
+
+    def __init__(self, attacker_factories: dict, horizon: int = HORIZON, initial_budget: int = 1000,
+                 keep_fraction: float = 0.5, budget_growth: float = 2.0, min_survivors: int = 1, chunk_size: int = None):
+        """
+        :param attacker_factories:  Dict from name to callable returning a new attacker with a pnl attribute
+        :param horizon:             Prediction horizon
+        :param initial_budget:      Points in the first round
+        :param keep_fraction:       Fraction of candidates surviving each round (at least one survives)
+        :param budget_growth:       Factor by which the points per round grow
+        :param min_survivors:       Stop eliminating when this many candidates remain
+        :param chunk_size:          Passed to ForgetfulRunner
+        """
+        if not 0 < keep_fraction < 1:
+            raise ValueError('keep_fraction must be strictly between 0 and 1')
+        self.attacker_factories = dict(attacker_factories)
+        self.horizon = horizon
+        self.initial_budget = initial_budget
+        self.keep_fraction = keep_fraction
+        self.budget_growth = budget_growth
+        self.min_survivors = min_survivors
+        self.runner = ForgetfulRunner(attacker_factory=None, horizon=horizon, chunk_size=chunk_size)
+        self.rounds = []
+        self.elapsed_seconds = None
+
+    def run(self, xs) -> list:
+        """
+        :param xs:  The stream, as an array of floats
+        :return: Leaderboard sorted by rounds survived, then standardized profit per decision
+        """
+        start_time = time.perf_counter()
+        xs = np.asarray(xs, dtype=np.float64)
+        attackers = {name: factory() for name, factory in self.attacker_factories.items()}
+        summaries = {}
+        rounds_survived = {name: 0 for name in attackers}
+        survivors = list(attackers)
+        self.rounds = []
+        start, budget = 0, self.initial_budget
+        while start < len(xs) and survivors:
+            final_round = len(survivors) <= self.min_survivors
+            end = len(xs) if final_round else min(start + int(budget), len(xs))
+            for name in survivors:
+                summaries[name] = self.runner.run_stream(stream=xs[start:end], attacker=attackers[name])
+                rounds_survived[name] += 1
+            self.rounds.append({'start': start, 'end': end, 'candidates': list(survivors)})
+            start, budget = end, budget * self.budget_growth
+            if not final_round:
+                num_keep = max(self.min_survivors, math.ceil(self.keep_fraction * len(survivors)))
+                survivors = sorted(survivors, key=lambda name: ranking_key(summaries[name]), reverse=True)[:num_keep]
+
+        self.elapsed_seconds = time.perf_counter() - start_time
+        entries = [{'name': name, 'rounds_survived': rounds_survived[name], **summaries[name]}
+                   for name in attackers if name in summaries]
+        return sorted(entries, key=lambda entry: (entry['rounds_survived'], ranking_key(entry)), reverse=True)
+
+    @property
+    def points_evaluated(self) -> int:
+        """
+        Total attacker ticks spent in the last run(), to compare with len(xs) * number of candidates.
+        """
+        return sum((r['end'] - r['start']) * len(r['candidates']) for r in self.rounds)
+
+
+def ranking_key(summary: dict) -> tuple:
+    """
+    Standardized profit per decision, then total profit. Candidates that have not yet had a decision resolved rank last.
+    Pnl.summary() reports an infinite ratio when the pnl has no dispersion, so that is given the sign of the profit.
+    """
+    total_profit = summary.get('total_profit', 0)
+    standardized_profit = summary.get('standardized_profit_per_decision')
+    if standardized_profit is None:
+        return False, -math.inf, total_profit
+    if not math.isfinite(standardized_profit):
+        standardized_profit = math.inf if total_profit > 0 else -math.inf
+    return True, standardized_profit, total_profit
@@ -0,0 +1,145 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from endersgame.accounting.pnlutil import zero_pnl_summary, add_pnl_summaries
+from endersgame.gameconfig import HORIZON
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+"""
+    Compare N attackers across M streams in parallel:
+
+        runner = TournamentRunner(attacker_factories={'macd': MacdAttacker, 'mine': MyAttacker})
+        leaderboard = runner.run(streams=[xs_1, xs_2, ...])
+
+    Each (attacker, stream) pair is a job for a process pool. Streams are copied once into shared memory
+    and workers map them rather than receiving pickled lists. Streams given as paths of .npy files
+    (see npystore) are not copied at all, as workers memory map the files themselves. Factories must
+    be picklable, which module-level classes and functions (or functools.partial of them) are.
+"""
+
+
+class TournamentRunner:
+
+    def __init__(self, attacker_factories: dict, horizon: int = HORIZON, chunk_size: int = None,
+                 max_points_per_stream: int = None, max_workers: int = None):
+        """
+        :param attacker_factories:      Dict from name to callable returning a new attacker
+        :param horizon:                 Prediction horizon
+        :param chunk_size:              Passed to ForgetfulRunner
+        :param max_points_per_stream:   Passed to ForgetfulRunner
+        :param max_workers:             Processes in the pool (default: one per core). Use 0 to run in-process.
+        """
+        self.attacker_factories = dict(attacker_factories)
+        self.horizon = horizon
+        self.chunk_size = chunk_size
+        self.max_points_per_stream = max_points_per_stream
+        self.max_workers = max_workers
+        self.elapsed_seconds = None
+
+    def run(self, streams) -> list:
+        """
+        :param streams:  Arrays (or anything np.asarray accepts) of floats, or paths of .npy files
+        :return: Leaderboard, a list of dicts sorted by total_profit, best first
+        """
+        start_time = time.perf_counter()
+        streams = [stream if isinstance(stream, str) else np.ascontiguousarray(stream, dtype=np.float64)
+                   for stream in streams]
+        runner_kwargs = {'horizon': self.horizon, 'chunk_size': self.chunk_size,
+                         'max_points_per_stream': self.max_points_per_stream}
+        jobs = [(name, stream_ndx) for stream_ndx in range(len(streams)) for name in self.attacker_factories]
+        results = {}
+        if self.max_workers == 0:
+            for name, stream_ndx in jobs:
+                results[(name, stream_ndx)] = _run_job(self.attacker_factories[name], _open(streams[stream_ndx]),
+                                                       runner_kwargs)
+        else:
+            shared = [(None, stream) if isinstance(stream, str) else _share(stream) for stream in streams]
+            try:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = {executor.submit(_run_shared_job, self.attacker_factories[name], shared[stream_ndx][1],
+                                               runner_kwargs): (name, stream_ndx)
+                               for name, stream_ndx in jobs}
+                    for future, job in futures.items():
+                        results[job] = future.result()
+            finally:
+                for shm, _ in shared:
+                    if shm is not None:
+                        shm.close()
+                        shm.unlink()
+        self.elapsed_seconds = time.perf_counter() - start_time
+        return leaderboard(names=list(self.attacker_factories), num_streams=len(streams), results=results)
+
+
+def leaderboard(names, num_streams: int, results: dict) -> list:
+    """
+    Reduces per (name, stream_ndx) Pnl summaries to one entry per name, sorted by total_profit.
+    """
+    entries = []
+    for name in names:
+        stream_summaries = [results[(name, stream_ndx)] for stream_ndx in range(num_streams)]
+        total = zero_pnl_summary()
+        for summary in stream_summaries:
+            total = add_pnl_summaries(total, summary)
+        num_resolved = total['num_resolved_decisions']
+        entries.append({'name': name,
+                        'total_profit': total['total_profit'],
+                        'num_resolved_decisions': num_resolved,
+                        'wins': total['wins'],
+                        'losses': total['losses'],
+                        'num_points': total['current_ndx'],
+                        'profit_per_decision': total['total_profit'] / num_resolved if num_resolved else None,
+                        'streams': stream_summaries})
+    return sorted(entries, key=lambda entry: entry['total_profit'], reverse=True)
+
+
+def _share(stream: np.ndarray):
+    """
+    Copies a stream into a new shared memory block. Returns the block and a picklable handle.
+    """
+    shm = SharedMemory(create=True, size=max(stream.nbytes, 1))
+    np.ndarray(stream.shape, dtype=np.float64, buffer=shm.buf)[:] = stream
+    return shm, (shm.name, len(stream))
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Attaches to a block owned by the parent. Pool workers share the parent's resource tracker,
+    so (re-)registering the block here is harmless and the parent's unlink() remains the only cleanup.
+    """
+    try:
+        return SharedMemory(name=name, track=False)      # Python 3.13+
+    except TypeError:
+        return SharedMemory(name=name)
+
+
+def _run_job(attacker_factory, xs: np.ndarray, runner_kwargs: dict) -> dict:
+    return ForgetfulRunner(attacker_factory=attacker_factory, **runner_kwargs).run_stream(stream=xs)
+
+
+def _open(stream):
+    if isinstance(stream, str):
+        from endersgame.datasources.npystore import open_npy
+        return open_npy(stream)
+    return stream
+
+
+def _run_shared_job(attacker_factory, handle, runner_kwargs: dict) -> dict:
+    if isinstance(handle, str):
+        return _run_job(attacker_factory, _open(handle), runner_kwargs)
+    name, length = handle
+    shm = _attach(name)
+    xs = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+    failed = True
+    try:
+        summary = _run_job(attacker_factory, xs, runner_kwargs)
+        failed = False
+    finally:
+        del xs      # Release the view before closing
+        try:
+            shm.close()
+        except BufferError:
+            if not failed:
+                raise
+            # Views of the block held by the traceback. Raising here would hide the job's own exception.
+    return summary
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from endersgame.accounting.multistreampnl import MultiStreamPnl
+from endersgame.accounting.pnl import Pnl
+
+
+def assert_same_summary(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if value is None:
+            assert actual[key] is None
+        else:
+            assert actual[key] == pytest.approx(value, rel=1e-9), key
+
+
+@pytest.mark.parametrize('backoff', [1, 7])
+def test_matches_one_pnl_per_stream(backoff):
+    num_streams, n, horizon = 6, 400, 5
+    rng = np.random.default_rng(2)
+    xs = np.cumsum(rng.standard_normal((n, num_streams)), axis=0)
+    decisions = rng.choice([-1., 0., 0., 0., 1.], size=(n, num_streams))
+    decisions[:, 0] = 0     # A stream that never attacks
+
+    multi = MultiStreamPnl(num_streams=num_streams, backoff=backoff, max_horizon=horizon)
+    singles = [Pnl(backoff=backoff) for _ in range(num_streams)]
+    for row, decision_row in zip(xs, decisions):
+        multi.tick(xs=row, horizon=horizon, decisions=decision_row)
+        for pnl, x, decision in zip(singles, row.tolist(), decision_row.tolist()):
+            pnl.tick(x=x, horizon=horizon, decision=decision)
+    for stream_ndx, pnl in enumerate(singles):
+        assert_same_summary(multi.summary(stream_ndx), pnl.summary())
+        assert multi.num_pending()[stream_ndx] == len(pnl.pending_decisions)
+
+
+def test_subsets_of_streams_advance_independently():
+    multi = MultiStreamPnl(num_streams=3, max_horizon=2)
+    multi.tick(xs=[10., 20.], horizon=2, decisions=[1., -1.], ndxs=[0, 2])
+    multi.tick(xs=[11.], ndxs=[0])
+    multi.tick(xs=[13., 17.], ndxs=[0, 2])
+    assert multi.current_ndx.tolist() == [3, 0, 2]
+    assert multi.summary(0)['total_profit'] == pytest.approx(3 - multi.epsilon)
+    assert multi.summary(1)['num_resolved_decisions'] == 0
+    assert multi.summary(2)['num_resolved_decisions'] == 0     # Resolves at its third point
+    multi.tick(xs=[15.], ndxs=[2])
+    assert multi.summary(2)['total_profit'] == pytest.approx(5 - multi.epsilon)
+
+
+def test_backing_off():
+    multi = MultiStreamPnl(num_streams=2, backoff=3, max_horizon=10)
+    multi.tick(xs=[0., 0.], horizon=10, decisions=[1., 0.])
+    assert multi.is_backing_off().tolist() == [True, False]
+    multi.tick(xs=[0., 0.])
+    multi.tick(xs=[0., 0.])
+    assert multi.is_backing_off().tolist() == [False, False]
+
+
+def test_horizon_checks():
+    multi = MultiStreamPnl(num_streams=1, max_horizon=3)
+    with pytest.raises(ValueError):
+        multi.tick(xs=[0.], horizon=4, decisions=[1.])
+    with pytest.raises(ValueError):
+        multi.tick(xs=[0.], horizon=0, decisions=[1.])
+    multi.tick(xs=[0.], horizon=2, decisions=[0.])
+    assert multi.current_ndx.tolist() == [1]
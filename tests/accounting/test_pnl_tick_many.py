@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from endersgame.accounting.pnl import Pnl
+
+
+@pytest.mark.parametrize('backoff', [1, 3, 10])
+def test_tick_many_matches_tick(backoff):
+    rng = np.random.default_rng(1)
+    xs = np.cumsum(rng.standard_normal(400))
+    decisions = rng.choice([-1, 0, 0, 0, 1], size=len(xs))
+
+    one_at_a_time = Pnl(backoff=backoff)
+    chunked = Pnl(backoff=backoff)
+    ndx = 0
+    for chunk_len, horizon in [(7, 5), (50, 5), (1, 12), (100, 12), (42, 3), (200, 8)]:
+        for x, decision in zip(xs[ndx:ndx + chunk_len], decisions[ndx:ndx + chunk_len]):
+            one_at_a_time.tick(x=x, horizon=horizon, decision=decision)
+        chunked.tick_many(xs=xs[ndx:ndx + chunk_len], horizon=horizon, decisions=decisions[ndx:ndx + chunk_len])
+        ndx += chunk_len
+
+    assert chunked.current_ndx == one_at_a_time.current_ndx == len(xs)
+    assert chunked.last_attack_ndx == one_at_a_time.last_attack_ndx
+    assert chunked.pending_decisions == one_at_a_time.pending_decisions
+    assert chunked.pnl_data == one_at_a_time.pnl_data
+
+
+def test_tick_many_with_trading_lag():
+    xs = np.arange(20, dtype=float)
+    decisions = np.zeros(20)
+    decisions[[2, 9]] = [1, -1]
+    one_at_a_time = Pnl(with_trading_lag=True)
+    for x, decision in zip(xs, decisions):
+        one_at_a_time.tick(x=x, horizon=4, decision=decision)
+    chunked = Pnl(with_trading_lag=True)
+    chunked.tick_many(xs=xs, horizon=4, decisions=decisions)
+    assert chunked.pnl_data == one_at_a_time.pnl_data
+
+
+def test_tick_many_requires_horizon():
+    with pytest.raises(ValueError):
+        Pnl().tick_many(xs=[1.0, 2.0], horizon=0, decisions=[0, 1])
+
+
+def test_tick_many_without_decisions():
+    pnl = Pnl()
+    pnl.tick_many(xs=[1.0, 2.0, 3.0])
+    assert pnl.current_ndx == 3
+    assert pnl.pnl_data == []
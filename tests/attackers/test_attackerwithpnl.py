@@ -160,5 +160,51 @@ def test_attackerwithpnl_from_dict_with_malformed_pnl():
     with pytest.raises(AttributeError):
         AttackerWithPnl.from_dict(state)
 
+
+
+class CountingAttacker(AttackerWithPnl):
+    """
+    Always wants to trade, and counts how often it is asked.
+    """
+
+    def __init__(self, epsilon: float = EPSILON, backoff: int = DEFAULT_TRADE_BACKOFF, skip_during_backoff: bool = False):
+        super().__init__(epsilon=epsilon, backoff=backoff, skip_during_backoff=skip_during_backoff)
+        self.num_predict_calls = 0
+
+    def predict(self, horizon: int = 10) -> float:
+        self.num_predict_calls += 1
+        return 1.0
+
+
+def test_skip_during_backoff_avoids_wasted_predictions():
+    """
+    Test that skipping predict() during backoff leaves the Pnl ledger unchanged.
+    """
+    xs = [float(i % 7) for i in range(250)]
+    eager = CountingAttacker(backoff=20)
+    lazy = CountingAttacker(backoff=20, skip_during_backoff=True)
+    for x in xs:
+        eager.tick_and_predict(x=x, horizon=5)
+        lazy.tick_and_predict(x=x, horizon=5)
+
+    assert lazy.pnl.to_dict() == eager.pnl.to_dict()
+    assert eager.num_predict_calls == len(xs)
+    assert lazy.num_predict_calls == 13
+    assert lazy.skipped_predictions == len(xs) - 13
+    assert eager.skipped_predictions == 0
+
+
+def test_skip_during_backoff_serialization():
+    attacker = CountingAttacker(backoff=20, skip_during_backoff=True)
+    for x in range(30):
+        attacker.tick_and_predict(x=float(x), horizon=5)
+    state = attacker.to_dict()
+    assert state['skip_during_backoff'] is True
+    restored = CountingAttacker.from_dict(state)
+    assert restored.skip_during_backoff
+    assert restored.skipped_predictions == attacker.skipped_predictions
+    assert 'skip_during_backoff' not in CountingAttacker().to_dict()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from endersgame.accounting.pnl import Pnl
+from endersgame.attackers.multistreamattacker import MultiStreamAttacker
+from endersgame.examples.macdattacker import MacdAttacker
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.examples.multistreammacdattacker import MultiStreamMacdAttacker
+from endersgame.examples.multistreammeanreversionattacker import MultiStreamMeanReversionAttacker
+from endersgame.runners.microbatcher import MicroBatcher
+
+
+def make_xs(n=1500, num_streams=4, seed=4):
+    rng = np.random.default_rng(seed)
+    return np.cumsum(rng.standard_normal((n, num_streams)), axis=0)
+
+
+def test_base_class_requires_predict():
+    with pytest.raises(NotImplementedError):
+        MultiStreamAttacker(num_streams=2).tick_and_predict(xs=[1., 2.])
+
+
+def test_mean_reversion_port_matches_scalar_attackers():
+    xs = make_xs()
+    xs[40, 1] = np.nan
+    num_streams = xs.shape[1]
+    multi = MultiStreamMeanReversionAttacker(num_streams=num_streams, a=0.05)
+    singles = [MeanReversionAttacker(a=0.05) for _ in range(num_streams)]
+    pnls = [Pnl() for _ in range(num_streams)]
+    for row in xs:
+        decisions = multi.tick_and_predict(xs=row, horizon=10)
+        for k, x in enumerate(row.tolist()):
+            decision = singles[k].tick_and_predict(x=x, horizon=10)
+            pnls[k].tick(x=x, horizon=10, decision=decision)
+            assert decisions[k] == decision
+    for k in range(num_streams):
+        assert multi.pnl.summary(k)['num_resolved_decisions'] == pnls[k].summary()['num_resolved_decisions'] > 0
+        assert multi.pnl.summary(k)['total_profit'] == pytest.approx(pnls[k].summary()['total_profit'])
+
+
+def test_macd_port_matches_scalar_attackers():
+    xs = make_xs(n=3000, num_streams=3)
+    kwargs = dict(warmup=100, min_abstention=20, decision_threshold=1.0)
+    multi = MultiStreamMacdAttacker(num_streams=xs.shape[1], **kwargs)
+    singles = [MacdAttacker(**kwargs) for _ in range(xs.shape[1])]
+    for row in xs:
+        decisions = multi.tick_and_predict(xs=row, horizon=10)
+        expected = [attacker.tick_and_predict(x=x, horizon=10) for attacker, x in zip(singles, row.tolist())]
+        assert decisions.tolist() == expected
+    for k, attacker in enumerate(singles):
+        expected = attacker.pnl.summary()
+        assert expected['num_resolved_decisions'] > 0
+        assert multi.pnl.summary(k)['num_resolved_decisions'] == expected['num_resolved_decisions']
+        assert multi.pnl.summary(k)['total_profit'] == pytest.approx(expected['total_profit'])
+
+
+def test_serves_as_a_microbatcher_group():
+    xs = make_xs(n=200, num_streams=5)
+    batched = MultiStreamMeanReversionAttacker(num_streams=5)
+    direct = MultiStreamMeanReversionAttacker(num_streams=5)
+    batcher = MicroBatcher(groups={'mr': batched}, max_batch_size=3, max_delay=10)
+    for row in xs:
+        direct.tick_and_predict(xs=row)
+        for k, x in enumerate(row.tolist()):
+            batcher.submit('mr', k, x)
+    batcher.flush()
+    assert batched.pnl.summaries() == direct.pnl.summaries()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from endersgame.attackers.baseattacker import BaseAttacker
+from endersgame.attackers.attackerwithpnl import AttackerWithPnl
+from endersgame.attackers.attacker import Attacker
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+
+
+class ThresholdAttacker(AttackerWithPnl):
+    """
+    Buys after a drop and sells after a rise. The decision only depends on the latest two points,
+    so predict_many() can be written without a loop.
+    """
+
+    def __init__(self, threshold=1.0, vectorized=True, **kwargs):
+        super().__init__(**kwargs)
+        self.threshold = threshold
+        self.vectorized = vectorized
+        self.previous = None
+        self.current = None
+
+    def tick(self, x):
+        self.previous, self.current = self.current, x
+
+    def predict(self, horizon=10):
+        if self.previous is None:
+            return 0
+        change = self.current - self.previous
+        return -1 if change > self.threshold else (1 if change < -self.threshold else 0)
+
+    def tick_many(self, xs):
+        self.previous, self.current = (self.current, xs[0]) if len(xs) == 1 else (xs[-2], xs[-1])
+
+    def predict_many(self, xs, horizon=10):
+        if not self.vectorized:
+            return None
+        changes = np.diff(np.concatenate([[np.nan if self.current is None else self.current], xs]))
+        return np.where(changes > self.threshold, -1, np.where(changes < -self.threshold, 1, 0))
+
+
+class LastTwoAttacker(Attacker):
+
+    def predict_using_history(self, xs, horizon=10):
+        return 1 if xs[-1] < xs[-2] - 1 else 0
+
+
+def random_walk(n=500):
+    return np.cumsum(np.random.default_rng(3).standard_normal(n))
+
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_attackerwithpnl_tick_and_predict_many(vectorized):
+    xs = random_walk()
+    one_at_a_time = ThresholdAttacker(backoff=5)
+    expected = [one_at_a_time.tick_and_predict(x=x, horizon=10) for x in xs]
+
+    chunked = ThresholdAttacker(backoff=5, vectorized=vectorized)
+    decisions = np.concatenate([chunked.tick_and_predict_many(xs[k:k + 64], horizon=10) for k in range(0, len(xs), 64)])
+    np.testing.assert_array_equal(decisions, expected)
+    assert chunked.pnl.to_dict() == one_at_a_time.pnl.to_dict()
+
+
+@pytest.mark.parametrize('chunk_size', [3, 64])
+def test_tick_and_predict_many_skips_during_backoff(chunk_size):
+    xs = random_walk()
+    one_at_a_time = ThresholdAttacker(backoff=5, skip_during_backoff=True)
+    expected = [one_at_a_time.tick_and_predict(x=x, horizon=10) for x in xs]
+
+    chunked = ThresholdAttacker(backoff=5, skip_during_backoff=True)
+    decisions = np.concatenate([chunked.tick_and_predict_many(xs[k:k + chunk_size], horizon=10)
+                                for k in range(0, len(xs), chunk_size)])
+    np.testing.assert_array_equal(decisions, expected)
+    assert one_at_a_time.skipped_predictions > 0
+    assert chunked.skipped_predictions == one_at_a_time.skipped_predictions
+    assert chunked.pnl.to_dict() == one_at_a_time.pnl.to_dict()
+
+
+def test_baseattacker_tick_and_predict_many():
+    xs = [1, 3, 4, 2, 4, 5, 1, 5, 2, 5, 10] * 20
+    one_at_a_time = MeanReversionAttacker()
+    expected = [one_at_a_time.tick_and_predict(x=x) for x in xs]
+    chunked = MeanReversionAttacker()
+    decisions = chunked.tick_and_predict_many(xs)
+    assert isinstance(decisions, np.ndarray)
+    np.testing.assert_array_equal(decisions, expected)
+    assert chunked.state == one_at_a_time.state
+
+
+def test_attacker_tick_and_predict_many_maintains_history():
+    xs = random_walk(300)
+    one_at_a_time = LastTwoAttacker(max_history_len=20)
+    expected = [one_at_a_time.tick_and_predict(x=x, horizon=10) for x in xs]
+    chunked = LastTwoAttacker(max_history_len=20)
+    decisions = np.concatenate([chunked.tick_and_predict_many(xs[k:k + 50], horizon=10) for k in range(0, len(xs), 50)])
+    np.testing.assert_array_equal(decisions, expected)
+    assert chunked.get_recent_history() == one_at_a_time.get_recent_history()
+    assert chunked.pnl.to_dict() == one_at_a_time.pnl.to_dict()
+
+
+def test_attacker_tick_history_many():
+    attacker = LastTwoAttacker(max_history_len=5)
+    attacker.tick_history_many([1.0, "2", None])
+    attacker.tick_history_many(np.arange(3.0, 9.0))
+    assert attacker.get_recent_history() == [4.0, 5.0, 6.0, 7.0, 8.0]
+
+
+def test_base_predict_many_defaults_to_none():
+    assert BaseAttacker().predict_many(xs=np.zeros(3)) is None
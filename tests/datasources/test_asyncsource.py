@@ -0,0 +1,157 @@
+import asyncio
+import re
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import numpy as np
+import pytest
+from endersgame.datasources.asyncsource import AsyncStreamSource, http_get, _body
+from endersgame.datasources.datasource import MemorySource
+from endersgame.datasources.streamgenerator import stream_generator
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.runners.asyncrunner import AsyncRunner
+
+NUM_STREAMS = 4
+NUM_FILES = 5
+VALUES_PER_FILE = 30
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    delay = 0.01        # Seconds per file number, so later files arrive later
+
+    def do_GET(self):
+        match = re.search(r'_file_(\d+)', self.path)
+        time.sleep(self.delay * int(match.group(1)) if match else 0)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def expected_values(stream_id):
+    return [float(1000 * stream_id + 100 * file_number + k)
+            for file_number in range(1, NUM_FILES + 1) for k in range(VALUES_PER_FILE)]
+
+
+@pytest.fixture(scope='module')
+def base_url(tmp_path_factory):
+    root = tmp_path_factory.mktemp('data')
+    (root / 'train').mkdir()
+    for stream_id in range(NUM_STREAMS):
+        xs = expected_values(stream_id)
+        for file_number in range(1, NUM_FILES + 1):
+            rows = xs[(file_number - 1) * VALUES_PER_FILE:file_number * VALUES_PER_FILE]
+            (root / 'train' / f'stream_{stream_id}_file_{file_number}.csv').write_text(
+                'timestamp,value\n' + ''.join(f'{k},{x}\n' for k, x in enumerate(rows)))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(SlowHandler, directory=str(root)))
+    server.request_queue_size = 64
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+async def collect(iterable):
+    return [x async for x in iterable]
+
+
+def test_values_and_chunks_match_stream_generator(base_url):
+    source = AsyncStreamSource(stream_id=1, base_url=base_url)
+    assert asyncio.run(collect(source)) == list(stream_generator(stream_id=1, source=base_url))
+    assert source.stats['files'] == NUM_FILES
+    chunks = asyncio.run(collect(AsyncStreamSource(stream_id=1, base_url=base_url).chunks(chunk_size=40)))
+    assert [len(xs) for xs in chunks] == [40, 40, 40, 30]
+    assert np.concatenate(chunks).tolist() == expected_values(1)
+    assert asyncio.run(collect(AsyncStreamSource(stream_id=99, base_url=base_url))) == []
+
+
+class CountingSemaphore(asyncio.Semaphore):
+
+    def __init__(self, value):
+        super().__init__(value)
+        self.held = 0
+        self.max_held = 0
+
+    async def acquire(self):
+        await super().acquire()
+        self.held += 1
+        self.max_held = max(self.max_held, self.held)
+        return True
+
+    def release(self):
+        self.held -= 1
+        super().release()
+
+
+def test_shared_connection_limit(base_url):
+    async def run():
+        sources = [AsyncStreamSource(stream_id=k, base_url=base_url, prefetch=3, connections=connections,
+                                     return_float=True) for k in range(NUM_STREAMS)]
+        return await asyncio.gather(*[collect(source) for source in sources])
+
+    connections = CountingSemaphore(2)
+    assert asyncio.run(run()) == [expected_values(k) for k in range(NUM_STREAMS)]
+    assert connections.max_held == 2
+
+
+def test_stopping_early_cancels_requests(base_url):
+    async def run():
+        source = AsyncStreamSource(stream_id=0, base_url=base_url, prefetch=4, return_float=True)
+        stream = source.chunks()
+        first = await stream.__anext__()
+        await stream.aclose()
+        return source, first, len(asyncio.all_tasks())
+
+    SlowHandler.delay = 0.05
+    try:
+        source, first, num_tasks = asyncio.run(run())
+    finally:
+        SlowHandler.delay = 0.01
+    assert first.tolist() == expected_values(0)[:VALUES_PER_FILE]
+    assert source.stats['cancelled'] >= 1
+    assert num_tasks == 1
+
+
+def test_cancelling_the_consumer(base_url):
+    async def run():
+        source = AsyncStreamSource(stream_id=2, base_url=base_url, prefetch=1, return_float=True)
+        task = asyncio.ensure_future(collect(source))
+        await asyncio.sleep(0.005)
+        start = time.perf_counter()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.perf_counter() - start
+
+    SlowHandler.delay = 0.3
+    try:
+        assert asyncio.run(run()) < 0.2
+    finally:
+        SlowHandler.delay = 0.01
+
+
+def test_other_sources_and_runner(base_url):
+    memory = MemorySource({0: [1., 2., 3.]}, values_per_file=2)
+    assert asyncio.run(collect(AsyncStreamSource(stream_id=0, source=memory, return_float=True))) == [1., 2., 3.]
+    feeds = {k: AsyncStreamSource(stream_id=k, source=base_url) for k in range(2)}
+    result = asyncio.run(AsyncRunner(attacker_factory=MeanReversionAttacker, horizon=5).run(feeds=feeds))
+    assert [result['streams'][k]['num_points'] for k in range(2)] == [NUM_FILES * VALUES_PER_FILE] * 2
+
+
+def test_http_get_and_chunked_bodies(base_url):
+    response = asyncio.run(http_get(f'{base_url}/train/stream_0_file_1.csv'))
+    assert response.status_code == 200 and response.content.startswith(b'timestamp,value\n0,100')
+    assert asyncio.run(http_get(f'{base_url}/train/missing.csv')).status_code == 404
+
+    async def read(data):
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return b''.join([piece async for piece in _body(reader, {'transfer-encoding': 'chunked'})])
+
+    assert asyncio.run(read(b'6\r\nvalue\n\r\n4;ext=1\r\n1.5\n\r\n0\r\n\r\n')) == b'value\n1.5\n'
+
+    with pytest.raises(asyncio.IncompleteReadError):
+        asyncio.run(read(b'6\r\nvalue\n\r\n4\r\n1.5\n\r\n'))      # No terminating 0 chunk
@@ -0,0 +1,79 @@
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pytest
+from endersgame.datasources.chunkgenerator import chunk_generator, csv_to_array, rechunk
+from endersgame.datasources.streamgenerator import stream_generator
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+FILES = {'stream_0_file_1.csv': b'timestamp,value\n0,1.5\n1,2.5\n2,-3.0\n',
+         'stream_0_file_2.csv': b'timestamp,value\n3,4.0\n4,5.25\n'}
+
+
+def fake_get(url):
+    response = MagicMock()
+    name = url.rsplit('/', 1)[-1]
+    response.status_code = 200 if name in FILES else 404
+    response.content = FILES.get(name, b'')
+    return response
+
+
+def test_csv_to_array():
+    assert csv_to_array(FILES['stream_0_file_1.csv']).tolist() == [1.5, 2.5, -3.0]
+    assert csv_to_array('value\n7\n').tolist() == [7.0]
+    assert csv_to_array('"timestamp","value"\n"0","1.0"\n"1","2.0"\n').tolist() == [1.0, 2.0]
+    assert csv_to_array(b'').tolist() == []
+    assert csv_to_array(b'value\n').tolist() == []
+    with pytest.raises(ValueError):
+        csv_to_array('timestamp,price\n0,1.0\n')
+
+
+def test_rechunk():
+    arrays = [np.arange(5.), np.arange(5., 7.), np.zeros(0), np.arange(7., 10.)]
+    chunks = list(rechunk(arrays, chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert np.concatenate(chunks).tolist() == list(range(10))
+
+
+@patch('requests.get', side_effect=fake_get)
+def test_chunks_match_stream_generator(mock_get):
+    expected = list(stream_generator(stream_id=0, return_float=True))
+    per_file = list(chunk_generator(stream_id=0))
+    assert [chunk.dtype for chunk in per_file] == [np.float64, np.float64]
+    assert [len(chunk) for chunk in per_file] == [3, 2]
+    assert np.concatenate(per_file).tolist() == expected
+    fixed = list(chunk_generator(stream_id=0, chunk_size=2))
+    assert [chunk.tolist() for chunk in fixed] == [[1.5, 2.5], [-3.0, 4.0], [5.25]]
+    assert list(chunk_generator(stream_id=1)) == []
+
+
+@patch('requests.get', side_effect=fake_get)
+def test_chunks_from_cache_offline(mock_get, tmp_path):
+    online = np.concatenate(list(chunk_generator(stream_id=0, cache=str(tmp_path))))
+    num_calls = mock_get.call_count
+    offline = np.concatenate(list(chunk_generator(stream_id=0, cache=str(tmp_path), offline=True)))
+    assert offline.tolist() == online.tolist()
+    assert mock_get.call_count == num_calls
+
+
+def test_fetch_error_ends_chunks_as_it_ends_values():
+    def flaky_get(url):
+        if url.endswith('file_2.csv'):
+            raise ConnectionError('reset')
+        return fake_get(url)
+    with patch('requests.get', side_effect=flaky_get):
+        chunk_errors, value_errors = {}, {}
+        chunks = list(chunk_generator(stream_id=0, errors=chunk_errors))
+        values = list(stream_generator(stream_id=0, return_float=True, errors=value_errors))
+    assert np.concatenate(chunks).tolist() == values == [1.5, 2.5, -3.0]
+    assert chunk_errors['fetch_errors'] == value_errors['fetch_errors'] == 1
+
+
+def test_forgetful_runner_accepts_chunks():
+    rng = np.random.default_rng(0)
+    xs = np.cumsum(rng.standard_normal(500))
+    runner = ForgetfulRunner(attacker_factory=MeanReversionAttacker, horizon=10)
+    from_chunks = runner.run(streams=[rechunk([xs], chunk_size=64)])
+    from_array = runner.run(streams=[xs])
+    assert from_chunks['streams'] == from_array['streams']
+    assert from_chunks['num_points'] == 500
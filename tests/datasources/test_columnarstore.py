@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from endersgame.datasources.columnarstore import ColumnarStore, ColumnarStoreWriter, write_columnar_store
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+
+def make_streams():
+    rng = np.random.default_rng(9)
+    lengths = [1000, 0, 37, 2500, 1]
+    return {stream_id: np.cumsum(rng.standard_normal(n)) for stream_id, n in zip([0, 1, 'btc', 812, 5], lengths)}
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_streams_and_slices(tmp_path, compress):
+    streams = make_streams()
+    store = write_columnar_store(str(tmp_path), streams, compress=compress, block_size=256)
+    assert len(store) == 5
+    assert store.stream_ids == [0, 1, 'btc', 812, 5]
+    assert 'btc' in store and 'eth' not in store
+    for stream_id, xs in streams.items():
+        assert store.length(stream_id) == len(xs)
+        assert store[stream_id].tolist() == xs.tolist()
+    xs = streams[812]
+    for start, stop in [(0, 10), (255, 257), (300, 2100), (-5, None), (2400, 9999), (10, 5)]:
+        assert store.get(812, start, stop).tolist() == xs[start:stop].tolist()
+    assert [stream_id for stream_id, _ in store] == list(streams)
+    assert [len(xs) for xs in store.iter_streams()] == [len(xs) for xs in streams.values()]
+    assert np.concatenate(list(store.iter_chunks(812, 1000))).tolist() == xs.tolist()
+    store.close()
+
+
+def test_uncompressed_slices_are_views(tmp_path):
+    store = write_columnar_store(str(tmp_path), make_streams())
+    xs = store.get(812, 100, 200)
+    assert isinstance(xs, np.memmap)
+    assert not xs.flags.writeable
+
+
+def test_compression_shrinks_repetitive_data(tmp_path):
+    streams = {k: np.round(np.cumsum(np.ones(5000)), 2) for k in range(3)}
+    plain = write_columnar_store(str(tmp_path / 'plain'), streams)
+    packed = write_columnar_store(str(tmp_path / 'packed'), streams, compress=True, block_size=1000)
+    size = lambda store: (tmp_path / store / 'values.bin').stat().st_size
+    assert size('packed') < size('plain') / 4
+    assert packed.get(2, 4990).tolist() == plain.get(2, 4990).tolist()
+
+
+def test_duplicate_stream_rejected(tmp_path):
+    with ColumnarStoreWriter(str(tmp_path)) as writer:
+        writer.append(0, [1.0])
+        with pytest.raises(ValueError):
+            writer.append(0, [2.0])
+    assert ColumnarStore(str(tmp_path))[0].tolist() == [1.0]
+
+
+def test_failed_write_leaves_no_manifest(tmp_path):
+    with pytest.raises(RuntimeError):
+        with ColumnarStoreWriter(str(tmp_path)) as writer:
+            writer.append(0, [1.0])
+            raise RuntimeError('interrupted')
+    assert writer._file.closed
+    with pytest.raises(FileNotFoundError):
+        ColumnarStore(str(tmp_path))
+
+
+def test_runner_walks_the_store(tmp_path):
+    streams = make_streams()
+    store = write_columnar_store(str(tmp_path), streams, compress=True, block_size=500)
+    runner = ForgetfulRunner(attacker_factory=MeanReversionAttacker, horizon=10)
+    assert runner.run(streams=store.iter_streams())['streams'] == runner.run(streams=list(streams.values()))['streams']
@@ -0,0 +1,122 @@
+import asyncio
+import math
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pytest
+from endersgame.datasources.asyncsource import AsyncStreamSource
+from endersgame.datasources.chunkgenerator import chunk_generator
+from endersgame.datasources.csvparser import StreamCsvParser, parse_stream_csv
+from endersgame.datasources.datasource import LocalDirectorySource
+from endersgame.datasources.streamgenerator import stream_generator
+
+CONTENT = b'timestamp,value\n0,1.5\n1,2.5\n2,-3.0\n3,4.0\n'
+
+
+def test_bytes_may_be_split_anywhere():
+    for split in range(len(CONTENT) + 1):
+        parser = StreamCsvParser()
+        xs = np.concatenate([parser.feed(CONTENT[:split]), parser.feed(CONTENT[split:]), parser.close()])
+        assert xs.tolist() == [1.5, 2.5, -3.0, 4.0]
+    parser = StreamCsvParser()
+    assert parser.feed(b'value\n1.0\n2.').tolist() == [1.0]
+    assert parser.close().tolist() == [2.0]
+    assert parser.errors['rows'] == 2
+
+
+def test_header_variations():
+    assert parse_stream_csv(b'\xef\xbb\xbftimestamp,value\r\n0,1.0\r\n1,2.0').tolist() == [1.0, 2.0]
+    assert parse_stream_csv('"Timestamp", "Value"\n"0","1.0"\n').tolist() == [1.0]
+    assert parse_stream_csv(b'x\n1.0\n2.0\n').tolist() == [1.0, 2.0]
+    assert parse_stream_csv(b'1.0\n2.0\n').tolist() == [1.0, 2.0]
+    assert parse_stream_csv(b'value,price\n1.0,7\n').tolist() == [1.0]
+    assert parse_stream_csv(b'value\n1.0\nvalue\n2.0\n').tolist() == [1.0, 2.0]
+    assert parse_stream_csv(b'\n\nvalue\n\n1.0\n').tolist() == [1.0]
+    assert parse_stream_csv(b'').tolist() == []
+
+
+@pytest.mark.parametrize('on_error, expected', [('skip', [1.0, 4.0]), ('nan', [1.0, math.nan, math.nan, 4.0])])
+def test_bad_rows_are_counted(on_error, expected):
+    parser = StreamCsvParser(on_error=on_error)
+    xs = np.concatenate([parser.feed(b'timestamp,value\n0,1.0\n1,oops\n2\n3,4.0\n'), parser.close()])
+    assert np.array_equal(xs, expected, equal_nan=True)
+    assert parser.errors == {'rows': len(expected), 'bad_value': 1, 'short_row': 1, 'truncated_row': 0,
+                             'no_value_column': 0}
+    assert parser.error_samples == [(3, 'bad_value', '1,oops'), (4, 'short_row', '2')]
+
+
+def test_raise_truncation_and_missing_column():
+    with pytest.raises(ValueError, match='line 3'):
+        parse_stream_csv(b'value\n1.0\nbad\n', on_error='raise')
+    with pytest.raises(ValueError):
+        parse_stream_csv(b'timestamp,price\n0,1.0\n', on_error='raise')
+    assert parse_stream_csv(b'timestamp,price\n0,1.0\n').tolist() == []
+
+    parser = StreamCsvParser()
+    assert parser.feed(b'value\n1.0\n2.0\n3.1').tolist() == [1.0, 2.0]
+    assert parser.close(complete=False).tolist() == []
+    assert parser.errors['truncated_row'] == 1
+
+
+def test_errors_total_over_files():
+    errors = {}
+    assert parse_stream_csv(b'value\n1\nx\n', errors=errors).tolist() == [1.0]
+    assert parse_stream_csv(b'value\ny\n2\n', errors=errors).tolist() == [2.0]
+    assert errors['rows'] == 2 and errors['bad_value'] == 2
+
+
+@patch('requests.get')
+def test_stream_generator_survives_bad_rows(mock_get, capsys):
+    files = {'stream_0_file_1.csv': b'value\n1.0\nnot a number\n2.0\n', 'stream_0_file_2.csv': b'value\n3.0\n'}
+
+    def side_effect(url):
+        name = url.rsplit('/', 1)[-1]
+        return MagicMock(status_code=200 if name in files else 404, content=files.get(name, b''))
+
+    mock_get.side_effect = side_effect
+    errors = {}
+    assert list(stream_generator(stream_id=0, return_float=True, errors=errors)) == [1.0, 2.0, 3.0]
+    assert errors['bad_value'] == 1 and errors['rows'] == 3 and errors['fetch_errors'] == 0
+    assert capsys.readouterr().out == ''
+    assert len(list(stream_generator(stream_id=0, return_float=True, on_error='nan'))) == 4
+    with pytest.raises(ValueError):
+        list(stream_generator(stream_id=0, on_error='raise'))
+
+
+def test_chunk_generator_policies(tmp_path):
+    (tmp_path / 'train').mkdir()
+    (tmp_path / 'train' / 'stream_0_file_1.csv').write_bytes(b'timestamp,value\n0,1.0\n1,\n2,3.0\n')
+    source = LocalDirectorySource(str(tmp_path))
+    errors = {}
+    assert np.concatenate(list(chunk_generator(stream_id=0, source=source, errors=errors))).tolist() == [1.0, 3.0]
+    assert errors['bad_value'] == 1
+    with pytest.raises(ValueError):
+        list(chunk_generator(stream_id=0, source=source, on_error='raise'))
+
+
+@pytest.mark.parametrize('response, truncated_rows', [
+    (b'Content-Length: 1000\r\n\r\nvalue\n1.0\n2.0\n3.', 1),
+    (b'Transfer-Encoding: chunked\r\n\r\n6\r\nvalue\n\r\n0b\r\n1.0\n2.0\n3.', 1),
+    (b'Transfer-Encoding: chunked\r\n\r\n6\r\nvalue\n\r\n8\r\n1.0\n2.0\n\r\n', 0)])     # No closing 0 chunk
+def test_async_source_keeps_rows_of_a_cut_short_download(response, truncated_rows):
+    async def handle(reader, writer):
+        request_line = (await reader.readline()).decode()
+        while (await reader.readline()) not in (b'\r\n', b''):
+            pass
+        if 'file_1' in request_line:
+            writer.write(b'HTTP/1.1 200 OK\r\n' + response)
+        else:
+            writer.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n')
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            source = AsyncStreamSource(stream_id=0, base_url=f'http://127.0.0.1:{port}', return_float=True)
+            return source, [x async for x in source]
+
+    source, xs = asyncio.run(run())
+    assert xs == [1.0, 2.0]
+    assert source.stats['truncated_files'] == 1
+    assert source.errors['truncated_row'] == truncated_rows
@@ -0,0 +1,103 @@
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import numpy as np
+import pytest
+from endersgame.datasources.chunkgenerator import chunk_generator
+from endersgame.datasources.datasource import (CacheSource, HttpSource, LocalDirectorySource, MemorySource,
+                                               get_source, open_source, register_source, unregister_source)
+from endersgame.datasources.prefetcher import PrefetchingSource
+from endersgame.datasources.streamgenerator import stream_generator
+
+VALUES_PER_FILE = 40
+NUM_VALUES = 150
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+def stream_values():
+    return np.round(np.cumsum(np.random.default_rng(3).standard_normal(NUM_VALUES)), 6).tolist()
+
+
+@pytest.fixture(scope='module')
+def directory(tmp_path_factory):
+    root = tmp_path_factory.mktemp('data')
+    (root / 'train').mkdir()
+    xs = stream_values()
+    for file_number, start in enumerate(range(0, NUM_VALUES, VALUES_PER_FILE), start=1):
+        rows = ''.join(f'{k},{x!r}\n' for k, x in enumerate(xs[start:start + VALUES_PER_FILE]))
+        (root / 'train' / f'stream_5_file_{file_number}.csv').write_text('timestamp,value\n' + rows)
+    return str(root)
+
+
+@pytest.fixture(scope='module')
+def base_url(directory):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=directory))
+    server.request_queue_size = 64
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_sources_iterate_identically(directory, base_url):
+    memory = MemorySource({5: stream_values()}, values_per_file=VALUES_PER_FILE)
+    for source in [directory, f'file://{directory}', base_url, LocalDirectorySource(directory), memory]:
+        assert list(stream_generator(stream_id=5, source=source, return_float=True)) == stream_values()
+        assert list(stream_generator(stream_id=5, source=source))[0] == {'x': stream_values()[0]}
+        assert np.concatenate(list(chunk_generator(stream_id=5, source=source, chunk_size=64))).tolist() == stream_values()
+        assert list(stream_generator(stream_id=6, source=source)) == []
+
+
+def test_source_types(directory, base_url):
+    assert isinstance(get_source(base_url), HttpSource)
+    assert isinstance(get_source(directory), LocalDirectorySource)
+    assert get_source(None).base_url is None
+    with pytest.raises(ValueError):
+        get_source('no-such-source')
+    with pytest.raises(TypeError):
+        get_source(3)
+
+
+def test_memory_source_files():
+    source = MemorySource({0: [1., 2., 3.]}, values_per_file=2)
+    assert source.fetch('train', 0, 1).content == b'value\n1.0\n2.0\n'
+    assert source.fetch('train', 0, 2).content == b'value\n3.0\n'
+    assert source.fetch('train', 0, 3).status_code == 404
+    assert source.fetch('test', 0, 1).status_code == 404
+
+
+def test_source_selected_by_name_and_environment(monkeypatch):
+    register_source('fixture', MemorySource({0: [4., 5.]}))
+    try:
+        assert list(stream_generator(stream_id=0, source='fixture', return_float=True)) == [4., 5.]
+        monkeypatch.setenv('ENDERSGAME_SOURCE', 'fixture')
+        assert list(stream_generator(stream_id=0, return_float=True)) == [4., 5.]
+        assert np.concatenate(list(chunk_generator(stream_id=0))).tolist() == [4., 5.]
+    finally:
+        unregister_source('fixture')
+
+
+def test_open_source_wraps_cache_and_prefetch(tmp_path, directory, monkeypatch):
+    monkeypatch.delenv('ENDERSGAME_SOURCE', raising=False)
+    assert isinstance(open_source(cache=str(tmp_path)), CacheSource)
+    assert open_source(offline=True, cache=str(tmp_path)).offline
+    assert isinstance(open_source(prefetch=2), PrefetchingSource)
+    default = open_source(base_url='http://example.com/data')
+    assert isinstance(default, HttpSource) and default.base_url == 'http://example.com/data'
+    assert isinstance(open_source(source=directory, cache=str(tmp_path)), LocalDirectorySource)
+
+
+def test_prefetching_source_reads_ahead_of_any_source():
+    source = PrefetchingSource(source=MemorySource({5: stream_values()}, values_per_file=VALUES_PER_FILE), prefetch=3)
+    try:
+        assert list(stream_generator(stream_id=5, source=source, return_float=True)) == stream_values()
+        assert source.stats['max_in_flight'] == 3
+        assert source.stats['requests'] <= NUM_VALUES // VALUES_PER_FILE + 3
+    finally:
+        source.close()
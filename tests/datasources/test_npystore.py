@@ -0,0 +1,78 @@
+from unittest.mock import patch, MagicMock
+import numpy as np
+import pytest
+from endersgame.datasources.npystore import convert_stream, convert_streams, load_stream, read_manifest, stream_path
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.runners.tournamentrunner import TournamentRunner
+
+RNG = np.random.default_rng(6)
+STREAMS = {stream_id: np.cumsum(RNG.standard_normal(700)) for stream_id in range(2)}
+
+
+def fake_get(url):
+    """ Serves each stream as two files """
+    response = MagicMock()
+    name = url.rsplit('/', 1)[-1]
+    _, stream_id, _, file_number = name[:-len('.csv')].split('_')
+    xs = STREAMS.get(int(stream_id))
+    if xs is None or int(file_number) > 2:
+        response.status_code = 404
+        return response
+    part = xs[:400] if file_number == '1' else xs[400:]
+    response.status_code = 200
+    response.content = ('value\n' + ''.join(f'{x!r}\n' for x in part.tolist())).encode('utf-8')
+    return response
+
+
+@pytest.fixture
+def store(tmp_path):
+    with patch('requests.get', side_effect=fake_get):
+        convert_streams([0, 1], directory=str(tmp_path))
+    return str(tmp_path)
+
+
+def test_converted_stream_is_memory_mapped(store):
+    xs = load_stream(stream_id=0, directory=store)
+    assert isinstance(xs, np.memmap)
+    assert xs.dtype == np.float64
+    assert not xs.flags.writeable
+    assert xs.tolist() == STREAMS[0].tolist()
+    assert read_manifest(store) == {'train/0': {'path': 'train/stream_0.npy', 'length': 700},
+                                    'train/1': {'path': 'train/stream_1.npy', 'length': 700}}
+
+
+def test_reconversion_replaces_file(store):
+    with patch('requests.get', side_effect=fake_get):
+        STREAMS[5] = np.arange(3.)
+        try:
+            path = convert_stream(stream_id=5, directory=store)
+        finally:
+            del STREAMS[5]
+        assert path == stream_path(stream_id=5, directory=store)
+        assert load_stream(stream_id=5, directory=store).tolist() == [0., 1., 2.]
+        with pytest.raises(ValueError):
+            convert_stream(stream_id=5, directory=store)      # The stream is gone, which must not erase the copy
+    assert load_stream(stream_id=5, directory=store).tolist() == [0., 1., 2.]
+    assert read_manifest(store)['train/5']['length'] == 3
+
+
+def test_failed_download_keeps_previous_file(store):
+    def failing_get(url):
+        if url.endswith('file_2.csv'):
+            raise ConnectionError('reset')
+        return fake_get(url)
+    before = load_stream(stream_id=0, directory=store).tolist()
+    with patch('requests.get', side_effect=failing_get):
+        with pytest.raises(ConnectionError):
+            convert_stream(stream_id=0, directory=store)
+    assert load_stream(stream_id=0, directory=store).tolist() == before
+
+
+@pytest.mark.parametrize('max_workers', [0, 1])
+def test_tournament_reads_npy_paths(store, max_workers):
+    paths = [stream_path(stream_id=stream_id, directory=store) for stream_id in range(2)]
+    factories = {'mr': MeanReversionAttacker}
+    from_paths = TournamentRunner(attacker_factories=factories, horizon=10, max_workers=max_workers).run(streams=paths)
+    from_arrays = TournamentRunner(attacker_factories=factories, horizon=10, max_workers=0).run(
+        streams=[STREAMS[0], STREAMS[1]])
+    assert from_paths == from_arrays
@@ -0,0 +1,136 @@
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import pytest
+from endersgame.datasources import prefetcher as prefetcher_module
+from endersgame.datasources.prefetcher import StreamPrefetcher
+from endersgame.datasources.streamgenerator import stream_generator
+
+NUM_FILES = 6
+VALUES_PER_FILE = 50
+
+
+class QuietSlowHandler(SimpleHTTPRequestHandler):
+    delay = 0.02
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def base_url(tmp_path_factory):
+    root = tmp_path_factory.mktemp('data')
+    (root / 'train').mkdir()
+    for file_number in range(1, NUM_FILES + 1):
+        values = [100 * file_number + k for k in range(VALUES_PER_FILE)]
+        (root / 'train' / f'stream_0_file_{file_number}.csv').write_text(
+            'timestamp,value\n' + ''.join(f'{k},{v}\n' for k, v in enumerate(values)))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietSlowHandler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def expected_values():
+    return [float(100 * file_number + k) for file_number in range(1, NUM_FILES + 1) for k in range(VALUES_PER_FILE)]
+
+
+@pytest.mark.parametrize('prefetch', [1, 3])
+def test_prefetcher_yields_stream_in_order(base_url, prefetch):
+    prefetcher = StreamPrefetcher(stream_id=0, prefetch=prefetch, base_url=base_url, return_float=True)
+    assert list(prefetcher) == expected_values()
+    assert prefetcher.stats['files'] == NUM_FILES
+    assert prefetcher.stats['max_in_flight'] <= prefetch
+    assert prefetcher.stats['requests'] <= NUM_FILES + prefetch
+    assert prefetcher.stats['bytes_per_second'] > 0
+
+
+def test_prefetching_overlaps_downloads(base_url):
+    sequential = StreamPrefetcher(stream_id=0, prefetch=1, base_url=base_url, return_float=True)
+    list(sequential)
+    concurrent = StreamPrefetcher(stream_id=0, prefetch=4, base_url=base_url, return_float=True)
+    list(concurrent)
+    assert concurrent.stats['elapsed_seconds'] < sequential.stats['elapsed_seconds']
+
+
+def test_stream_generator_prefetch_option(base_url):
+    values = list(stream_generator(stream_id=0, prefetch=2, base_url=base_url))
+    assert values[:2] == [{'x': 100.0}, {'x': 101.0}]
+    assert len(values) == NUM_FILES * VALUES_PER_FILE
+    assert [v['x'] for v in stream_generator(stream_id=0, base_url=base_url)] == expected_values()
+
+
+def test_missing_stream_and_early_stop(base_url):
+    assert list(StreamPrefetcher(stream_id=7, base_url=base_url)) == []
+    prefetcher = iter(StreamPrefetcher(stream_id=0, prefetch=4, base_url=base_url, return_float=True))
+    assert next(prefetcher) == 100.0
+    prefetcher.close()
+
+
+def test_failed_download_ends_stream_cleanly():
+    prefetcher = StreamPrefetcher(stream_id=0, prefetch=3, base_url='http://127.0.0.1:1', timeout=1)
+    assert list(prefetcher) == []
+    assert prefetcher.errors['fetch_errors'] == 1
+    errors = {}
+    assert list(stream_generator(stream_id=0, prefetch=3, base_url='http://127.0.0.1:1', errors=errors)) == []
+    assert errors['fetch_errors'] == 1
+
+
+def test_early_stop_does_not_wait_for_downloads(base_url):
+    QuietSlowHandler.delay = 0.3
+    try:
+        prefetcher = iter(StreamPrefetcher(stream_id=0, prefetch=4, max_workers=1, base_url=base_url))
+        next(prefetcher)
+        start = time.perf_counter()
+        prefetcher.close()
+        assert time.perf_counter() - start < 0.2
+    finally:
+        QuietSlowHandler.delay = 0.02
+
+
+def test_session_closed_only_after_running_downloads(base_url, monkeypatch):
+    sessions = []
+    real_make_session = prefetcher_module.make_session
+
+    def make_session(pool_size):
+        session = real_make_session(pool_size)
+        session.closed_while_downloading = False
+        get, close = session.get, session.close
+
+        def tracked_get(*args, **kwargs):
+            session.downloading = getattr(session, 'downloading', 0) + 1
+            try:
+                return get(*args, **kwargs)
+            finally:
+                session.downloading -= 1
+
+        def tracked_close():
+            session.closed_while_downloading |= getattr(session, 'downloading', 0) > 0
+            session.closed = True
+            close()
+
+        session.get, session.close = tracked_get, tracked_close
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(prefetcher_module, 'make_session', make_session)
+    QuietSlowHandler.delay = 0.3
+    try:
+        prefetcher = iter(StreamPrefetcher(stream_id=0, prefetch=4, max_workers=2, base_url=base_url))
+        next(prefetcher)
+        prefetcher.close()
+        session, = sessions
+        assert not getattr(session, 'closed', False)
+        deadline = time.perf_counter() + 5
+        while not getattr(session, 'closed', False) and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        assert session.closed and not session.closed_while_downloading
+    finally:
+        QuietSlowHandler.delay = 0.02
@@ -0,0 +1,113 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from endersgame.attackers.baseattacker import BaseAttacker
+from endersgame.datasources.datasource import DataSource, MemorySource
+from endersgame.datasources.replay import ReplaySource, load_test
+from endersgame.datasources.streamcache import CachedResponse
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class SlowAttacker(BaseAttacker):
+
+    def __init__(self, clock, seconds_per_tick):
+        super().__init__()
+        self.clock = clock
+        self.seconds_per_tick = seconds_per_tick
+
+    def tick(self, x):
+        self.clock.sleep(self.seconds_per_tick)
+
+    def predict(self, horizon=None):
+        return 0.
+
+
+def replay(xs, clock, **kwargs):
+    return ReplaySource(xs, clock=clock, sleep=clock.sleep, return_float=True, **kwargs)
+
+
+def test_fixed_rate_schedule():
+    clock = FakeClock()
+    times = [(x, clock()) for x in replay([1., 2., 3., 4.], clock, rate=10)]
+    assert times == [(1., 0.), (2., pytest.approx(0.1)), (3., pytest.approx(0.2)), (4., pytest.approx(0.3))]
+
+
+def test_timestamps_bursts_and_jitter():
+    clock = FakeClock()
+    assert replay(range(4), clock, timestamps=[100, 101, 103, 106], speed=2).due.tolist() == [0, 0.5, 1.5, 3]
+    assert replay(range(5), clock, rate=10, burst_size=2).due.tolist() == pytest.approx([0, 0, 0.2, 0.2, 0.4])
+    iso = ['2024-01-01T00:00:00', '2024-01-01T00:00:30']
+    assert replay([1, 2], clock, timestamps=iso).due.tolist() == [0, 30]
+    jittered = replay(range(1000), clock, rate=100, jitter=0.004, seed=1).due
+    assert np.all(np.abs(jittered[1:] - np.arange(1, 1000) / 100) <= 0.004 + 1e-12)
+    assert not np.allclose(jittered, np.arange(1000) / 100)
+    with pytest.raises(ValueError):
+        ReplaySource([1, 2])
+    with pytest.raises(ValueError):
+        ReplaySource([1, 2], rate=1, timestamps=[0, 1])
+
+
+def test_lag_of_fast_and_slow_consumers():
+    clock = FakeClock()
+    fast = load_test(SlowAttacker(clock, 0.001), replay(np.zeros(100), clock, rate=100), horizon=5)
+    assert fast['kept_up'] and fast['max_lag_seconds'] == pytest.approx(0)
+    assert fast['busy_fraction'] == pytest.approx(0.1, rel=0.02)
+
+    clock = FakeClock()
+    slow = load_test(SlowAttacker(clock, 0.02), replay(np.zeros(100), clock, rate=100), horizon=5)
+    assert not slow['kept_up']
+    assert slow['final_lag_seconds'] == pytest.approx(99 * 0.01)     # Falls 10ms further behind per value
+    assert slow['values_per_second'] == pytest.approx(50, rel=0.02)
+    assert slow['mean_tick_seconds'] == pytest.approx(0.02)
+
+
+def test_bursts_absorb_a_consumer_slower_than_the_burst():
+    clock = FakeClock()
+    stats = load_test(SlowAttacker(clock, 0.005), replay(np.zeros(100), clock, rate=100, burst_size=10),
+                      horizon=5, tolerance=0.05)
+    assert stats['max_lag_seconds'] == pytest.approx(0.045)
+    assert stats['kept_up']
+
+
+def test_from_stream_and_async_iteration():
+    source = MemorySource({0: np.arange(10.)}, values_per_file=3)
+    replay_source = ReplaySource.from_stream(stream_id=0, source=source, rate=2000, max_values=8)
+    assert len(replay_source) == 8
+
+    async def collect():
+        return [x async for x in replay_source]
+
+    start = time.perf_counter()
+    assert asyncio.run(collect()) == [{'x': float(x)} for x in range(8)]
+    assert time.perf_counter() - start >= 7 / 2000
+    assert replay_source.stats()['num_values'] == 8
+
+
+def test_from_stream_with_timestamps_skips_bad_rows():
+    class OneFileSource(DataSource):
+        def fetch(self, category, stream_id, file_number):
+            if file_number > 1:
+                return CachedResponse(status_code=404)
+            return CachedResponse(status_code=200, content=b'"time","value"\n0,1.0\n2,oops\n4,3.0\n6,4.0\n')
+
+    source = OneFileSource()
+    errors = {}
+    replay_source = ReplaySource.from_stream(stream_id=0, source=source, timestamp_column='time', speed=2,
+                                             errors=errors)
+    assert replay_source.values.tolist() == [1.0, 3.0, 4.0]
+    assert replay_source.due.tolist() == [0, 2, 3]
+    assert errors['bad_value'] == 1
+    with pytest.raises(ValueError):
+        ReplaySource.from_stream(stream_id=0, source=source, timestamp_column='timestamp', speed=2)
@@ -0,0 +1,126 @@
+import os
+from unittest.mock import patch, MagicMock
+import pytest
+import requests
+from endersgame.datasources.streamcache import StreamCache, OFFLINE_MISS_STATUS
+from endersgame.datasources.streamgenerator import stream_generator
+
+FILES = {'stream_0_file_1.csv': b'value\n1.0\n2.0\n', 'stream_0_file_2.csv': b'value\n3.0\n'}
+
+
+class FakeServer:
+    """ Stands in for requests.get, serving FILES with ETags and honouring If-None-Match """
+
+    def __init__(self, files):
+        self.files = dict(files)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url.rsplit('/', 1)[-1], headers))
+        response = MagicMock()
+        name = url.rsplit('/', 1)[-1]
+        if name not in self.files:
+            response.status_code = 404
+            return response
+        etag = f'"{hash(self.files[name])}"'
+        response.headers = {'ETag': etag}
+        if headers and headers.get('If-None-Match') == etag:
+            response.status_code = 304
+        else:
+            response.status_code = 200
+            response.content = self.files[name]
+        return response
+
+
+@pytest.fixture
+def server():
+    server = FakeServer(FILES)
+    with patch('requests.get', side_effect=server.get):
+        yield server
+
+
+def test_second_run_reads_from_disk(tmp_path, server):
+    cache = StreamCache(directory=str(tmp_path))
+    assert list(stream_generator(stream_id=0, return_float=True, cache=cache)) == [1.0, 2.0, 3.0]
+    assert cache.stats['downloads'] == 2
+    assert len(server.requests) == 3            # Two files and the 404 that ends the stream
+
+    cache = StreamCache(directory=str(tmp_path))
+    assert list(stream_generator(stream_id=0, return_float=True, cache=cache)) == [1.0, 2.0, 3.0]
+    assert cache.stats['hits'] == 2
+    assert cache.stats['downloads'] == 0
+    assert cache.stats['bytes_from_cache'] == sum(len(content) for content in FILES.values())
+    assert [name for name, _ in server.requests[3:]] == ['stream_0_file_3.csv']    # Only the end is rechecked
+
+
+def test_offline_replay_without_network(tmp_path, server):
+    list(stream_generator(stream_id=0, return_float=True, cache=str(tmp_path)))
+    num_requests = len(server.requests)
+    assert list(stream_generator(stream_id=0, return_float=True, cache=str(tmp_path), offline=True)) == [1.0, 2.0, 3.0]
+    assert len(server.requests) == num_requests
+    assert list(stream_generator(stream_id=5, return_float=True, cache=str(tmp_path), offline=True)) == []
+    cache = StreamCache(directory=str(tmp_path), offline=True)
+    assert cache.fetch(category='train', stream_id=5, file_number=1).status_code == OFFLINE_MISS_STATUS
+    assert cache.fetch(category='train', stream_id=0, file_number=3).status_code == 404
+    assert cache.stats['misses'] == 2
+
+
+def test_revalidation_with_etag(tmp_path, server):
+    cache = StreamCache(directory=str(tmp_path), revalidate=True)
+    list(stream_generator(stream_id=0, return_float=True, cache=cache))
+    list(stream_generator(stream_id=0, return_float=True, cache=cache))
+    assert cache.stats['revalidated'] == 2
+    assert server.requests[3][1] == {'If-None-Match': f'"{hash(FILES["stream_0_file_1.csv"])}"'}
+
+    server.files['stream_0_file_2.csv'] = b'value\n3.5\n'
+    assert list(stream_generator(stream_id=0, return_float=True, cache=cache)) == [1.0, 2.0, 3.5]
+    assert cache.stats['downloads'] == 3
+
+
+@pytest.mark.parametrize('failure', [503, 429, ConnectionError])
+def test_failed_revalidation_serves_cached_file(tmp_path, server, failure):
+    cache = StreamCache(directory=str(tmp_path), revalidate=True)
+    list(stream_generator(stream_id=0, return_float=True, cache=cache))
+
+    def failing_get(url, headers=None):
+        if failure is ConnectionError:
+            raise requests.exceptions.ConnectionError('reset')
+        return MagicMock(status_code=failure)
+    with patch('requests.get', side_effect=failing_get):
+        assert list(stream_generator(stream_id=0, return_float=True, cache=cache)) == [1.0, 2.0, 3.0]
+        assert cache.stats['revalidation_errors'] == 2
+    assert cache.index['train/0/1']['size'] == len(FILES['stream_0_file_1.csv'])
+    assert list(stream_generator(stream_id=0, return_float=True, cache=cache, offline=True)) == [1.0, 2.0, 3.0]
+
+
+def test_only_gone_files_are_recorded_missing(tmp_path):
+    cache = StreamCache(directory=str(tmp_path))
+    with patch('requests.get', return_value=MagicMock(status_code=503)):
+        assert cache.fetch(category='train', stream_id=0, file_number=1).status_code == 503
+    assert 'train/0/1' not in cache.index
+    with patch('requests.get', return_value=MagicMock(status_code=410)):
+        assert cache.fetch(category='train', stream_id=0, file_number=1).status_code == 410
+    assert cache.index['train/0/1'] == {'missing': True}
+
+
+def test_corrupt_file_is_downloaded_again(tmp_path, server):
+    cache = StreamCache(directory=str(tmp_path))
+    list(stream_generator(stream_id=0, return_float=True, cache=cache))
+    entry = cache.index['train/0/1']
+    path = os.path.join(str(tmp_path), 'objects', entry['sha256'][:2], entry['sha256'])
+    with open(path, 'wb') as f:
+        f.write(b'value\n1.0\n')
+    assert list(stream_generator(stream_id=0, return_float=True, cache=cache)) == [1.0, 2.0, 3.0]
+    assert cache.stats['invalid'] == 1
+    assert cache.stats['downloads'] == 3
+
+
+def test_identical_files_are_stored_once(tmp_path):
+    server = FakeServer({'stream_0_file_1.csv': b'value\n1.0\n', 'stream_1_file_1.csv': b'value\n1.0\n'})
+    with patch('requests.get', side_effect=server.get):
+        cache = StreamCache(directory=str(tmp_path))
+        list(stream_generator(stream_id=0, cache=cache))
+        list(stream_generator(stream_id=1, cache=cache))
+    assert cache.index['train/0/1']['sha256'] == cache.index['train/1/1']['sha256']
+    objects = [name for _, _, files in os.walk(os.path.join(str(tmp_path), 'objects')) for name in files]
+    assert len(objects) == 1
@@ -0,0 +1,87 @@
+import threading
+import time
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import pytest
+from endersgame.datasources.streamdiscovery import discover_streams
+from endersgame.datasources.streamgeneratorgenerator import stream_generator_generator
+
+NUM_STREAMS = 21
+
+
+class CountingHandler(SimpleHTTPRequestHandler):
+    delay = 0.05
+    heads = []
+    lock = threading.Lock()
+
+    def do_HEAD(self):
+        with self.lock:
+            self.heads.append(self.path)
+        time.sleep(self.delay)
+        super().do_HEAD()
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 64     # Accept a whole batch of connections at once
+
+
+@pytest.fixture(scope='module')
+def base_url(tmp_path_factory):
+    root = tmp_path_factory.mktemp('data')
+    (root / 'train').mkdir()
+    for stream_id in range(NUM_STREAMS):
+        (root / 'train' / f'stream_{stream_id}_file_1.csv').write_text(f'value\n{stream_id}.0\n')
+    (root / 'train' / f'stream_{NUM_STREAMS + 1}_file_1.csv').write_text('value\n1.0\n')   # Beyond the gap
+    server = Server(('127.0.0.1', 0), partial(CountingHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def heads():
+    CountingHandler.heads.clear()
+    return CountingHandler.heads
+
+
+def test_discovers_consecutive_streams_concurrently(base_url, heads, tmp_path):
+    start_time = time.perf_counter()
+    stream_ids = discover_streams(base_url=base_url, batch_size=16, cache_dir=str(tmp_path))
+    elapsed = time.perf_counter() - start_time
+    assert stream_ids == list(range(NUM_STREAMS))
+    assert len(heads) == 32                                 # Two batches
+    assert elapsed < NUM_STREAMS * CountingHandler.delay / 2
+
+
+def test_manifest_is_reused_until_it_expires(base_url, heads, tmp_path):
+    now = [1000.0]
+    clock = lambda: now[0]
+    discover_streams(base_url=base_url, cache_dir=str(tmp_path), ttl=60, clock=clock)
+    num_probes = len(heads)
+    now[0] += 59
+    assert discover_streams(base_url=base_url, cache_dir=str(tmp_path), ttl=60, clock=clock) == list(range(NUM_STREAMS))
+    assert len(heads) == num_probes
+    assert discover_streams(base_url=base_url, start_stream_id=5, cache_dir=str(tmp_path), ttl=60, clock=clock) == \
+           list(range(5, NUM_STREAMS))
+    num_probes = len(heads)
+    now[0] += 61
+    discover_streams(base_url=base_url, start_stream_id=5, cache_dir=str(tmp_path), ttl=60, clock=clock)
+    assert len(heads) > num_probes
+
+
+def test_no_manifest_with_zero_ttl(base_url, heads, tmp_path):
+    discover_streams(base_url=base_url, cache_dir=str(tmp_path), ttl=0)
+    discover_streams(base_url=base_url, cache_dir=str(tmp_path), ttl=0)
+    assert len(heads) == 64
+    assert not (tmp_path / 'manifests').exists()
+
+
+def test_parallel_stream_generator_generator(base_url, tmp_path):
+    sequential = [next(gen) for gen in stream_generator_generator(base_url=base_url, return_float=True)]
+    parallel = [next(gen) for gen in stream_generator_generator(base_url=base_url, return_float=True, parallel=True,
+                                                                cache_dir=str(tmp_path))]
+    assert parallel == sequential == [float(stream_id) for stream_id in range(NUM_STREAMS)]
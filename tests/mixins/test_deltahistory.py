@@ -0,0 +1,100 @@
+# tests/mixins/test_deltahistory.py
+
+import json
+import numpy as np
+import pytest
+from endersgame.mixins.historymixin import HistoryMixin
+from endersgame.mixins.arrayhistory import ArrayHistory
+from endersgame.mixins.deltahistory import DeltaHistory
+
+
+class DummyClass(HistoryMixin):
+
+    def __init__(self, max_history_len=50, **kwargs):
+        super().__init__(max_history_len=max_history_len, **kwargs)
+
+
+def random_walk(n=500, seed=0):
+    return 100 + np.cumsum(0.01 * np.random.default_rng(seed).standard_normal(n))
+
+
+def test_float32_history_precision():
+    instance = DummyClass(history_dtype='float32')
+    assert isinstance(instance.history, ArrayHistory)
+    xs = random_walk()
+    for x in xs:
+        instance.tick_history(x)
+    recovered = np.array(instance.get_recent_history())
+    np.testing.assert_allclose(recovered, xs[-50:], rtol=2 ** -24)
+    assert instance.history._values.nbytes == 4 * 50
+
+
+@pytest.mark.parametrize('dtype,scale', [('int8', 1e-3), ('int16', 1e-4), ('int32', 1e-8)])
+def test_delta_history_precision(dtype, scale):
+    instance = DummyClass(history_dtype=dtype, history_scale=scale)
+    assert isinstance(instance.history, DeltaHistory)
+    xs = random_walk(n=2000)
+    for x in xs:
+        instance.tick_history(x)
+    recovered = np.array(instance.get_recent_history())
+    assert np.max(np.abs(recovered - xs[-50:])) <= scale / 2 + 1e-9
+    assert instance.is_history_full()
+
+
+def test_delta_history_clipped_jump_recovers():
+    instance = DummyClass(max_history_len=10, history_dtype='int8', history_scale=0.01)
+    for x in [0.0, 0.0, 2.0, 2.0, 2.0]:
+        instance.tick_history(x)
+    recovered = instance.get_recent_history()
+    assert recovered[2] == pytest.approx(1.27)      # Jump clipped to 127 steps
+    assert recovered[3:] == pytest.approx([2.0, 2.0])    # Error worked off by the next value
+
+
+def test_delta_history_non_finite_values():
+    instance = DummyClass(max_history_len=4, history_dtype='int16')
+    for x in [float('nan'), 1.0, float('inf'), 1.5, 2.0]:
+        instance.tick_history(x)
+    recovered = instance.get_recent_history()
+    assert recovered[0] == pytest.approx(1.0)
+    assert np.isnan(recovered[1])
+    assert recovered[2:] == pytest.approx([1.5, 2.0])
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int16'])
+def test_compact_round_trip_serialization(dtype):
+    instance = DummyClass(max_history_len=20, history_dtype=dtype, history_scale=1e-3)
+    for x in random_walk(n=45):
+        instance.tick_history(x)
+    state = json.loads(json.dumps(instance.to_dict()))
+    assert state['history_dtype'] == dtype
+    restored = HistoryMixin.from_dict(state)
+    assert type(restored.history) is type(instance.history)
+    assert restored.get_recent_history() == pytest.approx(instance.get_recent_history(), abs=1e-12)
+
+    for x in [101.0, 101.5]:
+        instance.tick_history(x)
+        restored.tick_history(x)
+    assert restored.get_recent_history() == pytest.approx(instance.get_recent_history(), abs=1e-12)
+
+
+def test_compact_payload_is_smaller():
+    xs = random_walk(n=1000)
+    payloads = {}
+    for dtype in [None, 'float32', 'int16']:
+        instance = DummyClass(max_history_len=1000, history_dtype=dtype)
+        for x in xs:
+            instance.tick_history(x)
+        payloads[dtype] = len(json.dumps(instance.to_dict()))
+    assert payloads['float32'] < payloads[None]
+    assert payloads['int16'] < payloads['float32']
+
+
+def test_invalid_history_dtype():
+    with pytest.raises(ValueError):
+        DummyClass(history_dtype='float16')
+    with pytest.raises(ValueError):
+        DummyClass(history_dtype='int16', history_path='never_created.bin')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
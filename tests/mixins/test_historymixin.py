@@ -2,6 +2,7 @@
 
 import pytest
 import json
+import numpy as np
 from collections import deque
 from endersgame.mixins.historymixin import HistoryMixin  # Adjust the import path as needed
 
@@ -314,6 +315,43 @@ def test_history_persistence_after_serialization(dummy_instance):
     assert list(restored2.history) == [1.0, 2.0, 3.0, 4.0]
 
 
+def test_set_history_bulk_matches_float_coercion():
+    """
+    Test that the vectorized restore matches per-item float() coercion with a 0.0 fallback.
+    """
+    from decimal import Decimal
+    history_data = [1.0, "2.5", None, "invalid", float('nan'), "nan", True, Decimal('1.5'), b"3.5", [1, 2], 7]
+
+    def slow(item):
+        try:
+            return float(item)
+        except (ValueError, TypeError):
+            return 0.0
+
+    expected = [slow(item) for item in history_data]
+    history = HistoryMixin.set_history(history_data=history_data, maxlen=20)
+    assert isinstance(history, deque)
+    np.testing.assert_array_equal(list(history), expected)
+
+    numeric_with_none = [1.0, None, 3.0, float('nan')]
+    np.testing.assert_array_equal(list(HistoryMixin.set_history(numeric_with_none, maxlen=5)), [1.0, 0.0, 3.0, np.nan])
+
+
+def test_set_history_accepts_arrays_and_buffers():
+    """
+    Test that ndarray and buffer inputs are restored directly, keeping only the last maxlen values.
+    """
+    import array
+    values = np.arange(10, dtype=np.float64)
+    buffers = [values, values.tobytes(), memoryview(values), memoryview(values.tobytes()), array.array('d', values),
+               values.astype(np.int32)]
+    for history_data in buffers:
+        history = HistoryMixin.set_history(history_data=history_data, maxlen=4)
+        assert list(history) == [6.0, 7.0, 8.0, 9.0]
+        assert history.maxlen == 4
+    assert HistoryMixin.coerce_history(memoryview(np.arange(3.).tobytes())).tolist() == [0., 1., 2.]
+
+
 if __name__=='__main__':
     import pytest
     pytest.main(__file__)
\ No newline at end of file
@@ -0,0 +1,93 @@
+# tests/mixins/test_memmaphistory.py
+
+import json
+import os
+import numpy as np
+import pytest
+from endersgame.mixins.historymixin import HistoryMixin
+from endersgame.mixins.memmaphistory import MemmapHistory
+from endersgame.attackers.attacker import Attacker
+
+
+class DummyClass(HistoryMixin):
+
+    def __init__(self, max_history_len=5, history_path=None):
+        super().__init__(max_history_len=max_history_len, history_path=history_path)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    return str(tmp_path / 'history.bin')
+
+
+def test_memmap_backend_selected(history_path):
+    instance = DummyClass(history_path=history_path)
+    assert isinstance(instance.history, MemmapHistory)
+    assert instance.history.maxlen == 5
+    assert len(instance) == 0
+    assert os.path.exists(history_path)
+
+
+def test_memmap_matches_deque(history_path):
+    mapped = DummyClass(max_history_len=5, history_path=history_path)
+    plain = DummyClass(max_history_len=5)
+    for x in [1.0, "2.5", "invalid", None, 4.0, 5.0, 6.0, float('nan')]:
+        mapped.tick_history(x)
+        plain.tick_history(x)
+        np.testing.assert_array_equal(mapped.get_recent_history(), plain.get_recent_history())
+        assert mapped.is_history_full() == plain.is_history_full()
+        for n in [0, 1, 3, 10]:
+            np.testing.assert_array_equal(mapped.get_recent_history(n), plain.get_recent_history(n))
+
+
+def test_memmap_reopen_restores_window(history_path):
+    instance = DummyClass(max_history_len=4, history_path=history_path)
+    for i in range(10):
+        instance.tick_history(float(i))
+    instance.history.flush()
+    del instance
+
+    reopened = DummyClass(max_history_len=4, history_path=history_path)
+    assert reopened.get_recent_history() == [6.0, 7.0, 8.0, 9.0]
+    reopened.tick_history(10.0)
+    assert reopened.get_recent_history() == [7.0, 8.0, 9.0, 10.0]
+
+
+def test_memmap_length_mismatch_raises(history_path):
+    DummyClass(max_history_len=4, history_path=history_path)
+    with pytest.raises(ValueError):
+        DummyClass(max_history_len=8, history_path=history_path)
+
+
+def test_memmap_round_trip_serialization(history_path):
+    instance = DummyClass(max_history_len=3, history_path=history_path)
+    for x in [1.0, 2.0, 3.0, 4.0]:
+        instance.tick_history(x)
+    state = json.loads(json.dumps(instance.to_dict()))
+    assert state == {'max_history_len': 3, 'history_path': history_path}
+
+    restored = HistoryMixin.from_dict(state)
+    assert isinstance(restored.history, MemmapHistory)
+    assert restored.get_recent_history() == [2.0, 3.0, 4.0]
+
+
+def test_attacker_with_memmap_history(history_path):
+
+    class LastValueAttacker(Attacker):
+
+        def predict_using_history(self, xs, horizon=10):
+            return 1 if xs[-1] > xs[0] else 0
+
+    attacker = LastValueAttacker(max_history_len=10, history_path=history_path)
+    for x in range(25):
+        attacker.tick_and_predict(x=float(x), horizon=10)
+    assert attacker.get_recent_history() == [float(x) for x in range(15, 25)]
+    assert attacker.pnl.summary()['num_resolved_decisions'] > 0
+
+    restored = LastValueAttacker.from_dict(attacker.to_dict())
+    assert restored.get_recent_history() == attacker.get_recent_history()
+    assert restored.pnl.to_dict() == attacker.pnl.to_dict()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
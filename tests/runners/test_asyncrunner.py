@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+import pytest
+from endersgame.attackers.attacker import Attacker
+from endersgame.runners.asyncrunner import AsyncRunner, StreamMetrics
+
+
+class LastTwoAttacker(Attacker):
+
+    def __init__(self, epsilon=0.005, backoff=5, **kwargs):
+        super().__init__(epsilon=epsilon, max_history_len=2, backoff=backoff, **kwargs)
+
+    def predict_using_history(self, xs, horizon=10):
+        return 1 if xs[-1] < xs[-2] - 1 else 0
+
+
+async def fake_feed(xs, every: int = 7):
+    """ Yields values, occasionally handing control back to the loop as a network feed would """
+    for ndx, x in enumerate(xs):
+        if ndx % every == 0:
+            await asyncio.sleep(0)
+        yield x
+
+
+def make_streams(num_streams=3, n=500):
+    rng = np.random.default_rng(3)
+    return {f'stream_{k}': np.cumsum(rng.standard_normal(n)).tolist() for k in range(num_streams)}
+
+
+def expected(streams, horizon=10):
+    decisions, summaries = {}, {}
+    for name, xs in streams.items():
+        attacker = LastTwoAttacker()
+        decisions[name] = [attacker.tick_and_predict(x=x, horizon=horizon) for x in xs]
+        summaries[name] = attacker.pnl.summary()
+    return decisions, summaries
+
+
+def run(runner, streams):
+    return asyncio.run(runner.run(feeds={name: fake_feed(xs) for name, xs in streams.items()}))
+
+
+@pytest.mark.parametrize('max_batch_size', [1, 16])
+def test_decisions_arrive_in_order_per_stream(max_batch_size):
+    streams = make_streams()
+    seen = {name: [] for name in streams}
+    runner = AsyncRunner(attacker_factory=LastTwoAttacker, horizon=10, max_batch_size=max_batch_size,
+                         on_decision=lambda name, x, decision: seen[name].append((x, decision)))
+    result = run(runner, streams)
+    expected_decisions, expected_summaries = expected(streams)
+    for name, xs in streams.items():
+        assert [x for x, _ in seen[name]] == xs
+        assert [decision for _, decision in seen[name]] == expected_decisions[name]
+        assert result['streams'][name]['summary'] == expected_summaries[name]
+        assert result['streams'][name]['num_points'] == len(xs)
+    if max_batch_size > 1:
+        assert any(result['streams'][name]['num_batches'] < len(streams[name]) for name in streams)
+
+
+def test_full_queue_pauses_the_feed():
+    streams = make_streams(num_streams=2, n=200)
+    runner = AsyncRunner(attacker_factory=LastTwoAttacker, horizon=10, max_queue_size=4)
+    result = run(runner, streams)
+    for name in streams:
+        metrics = result['streams'][name]
+        assert metrics['max_queue_depth'] <= 4
+        assert metrics['backpressure_events'] > 0
+        assert metrics['p99_latency_seconds'] >= metrics['mean_latency_seconds'] >= 0
+    assert runner.queue_depths() == {name: 0 for name in streams}
+
+
+@pytest.mark.parametrize('executor_cls', [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_executor_gives_same_results(executor_cls):
+    streams = make_streams(num_streams=2, n=300)
+    _, expected_summaries = expected(streams)
+    with executor_cls(max_workers=2) as executor:
+        runner = AsyncRunner(attacker_factory=LastTwoAttacker, horizon=10, max_batch_size=32, executor=executor)
+        result = run(runner, streams)
+    for name in streams:
+        assert result['streams'][name]['summary'] == expected_summaries[name]
+        assert runner.attackers[name].pnl.current_ndx == 300
+
+
+def test_failing_feed_propagates():
+
+    async def broken_feed():
+        yield 1.0
+        raise ConnectionError('feed dropped')
+
+    runner = AsyncRunner(attacker_factory=LastTwoAttacker)
+    with pytest.raises(ConnectionError):
+        asyncio.run(runner.run(feeds={'good': fake_feed([1.0, 2.0, 3.0]), 'bad': broken_feed()}))
+
+
+def test_latency_memory_is_bounded():
+    metrics = StreamMetrics(latency_window=100)
+    for k in range(1000):
+        metrics.record_latencies([0.001 * k, 0.001 * k])
+    assert len(metrics.latencies) == 100
+    report = metrics.to_dict()
+    assert report['mean_latency_seconds'] == pytest.approx(0.4995)
+    assert report['max_latency_seconds'] == pytest.approx(0.999)
+    assert 0.97 <= report['p99_latency_seconds'] <= 0.999
@@ -0,0 +1,135 @@
+import json
+import multiprocessing
+import os
+from functools import partial
+import numpy as np
+import pytest
+from endersgame.attackers.attacker import Attacker
+from endersgame.attackers.baseattacker import BaseAttacker
+from endersgame.runners.checkpoint import save_checkpoint, load_checkpoint, clear_checkpoint, PENDING_MARKER, CHECKPOINT_FILE
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+
+class CrashingAttacker(Attacker):
+    """ Dies abruptly after KILL_AT points in total, as a killed process would """
+
+    KILL_AT = None
+    seen = 0
+
+    def __init__(self, epsilon=0.005, backoff=5, **kwargs):
+        super().__init__(epsilon=epsilon, max_history_len=2, backoff=backoff, **kwargs)
+
+    def tick_and_predict(self, x, horizon=10):
+        CrashingAttacker.seen += 1
+        if CrashingAttacker.KILL_AT is not None and CrashingAttacker.seen >= CrashingAttacker.KILL_AT:
+            os._exit(1)
+        return super().tick_and_predict(x=x, horizon=horizon)
+
+    def predict_using_history(self, xs, horizon=10):
+        if xs[-1] < xs[-2] - 1:
+            return 1
+        if xs[-1] > xs[-2] + 1:
+            return -1
+        return 0
+
+
+class CrashingMomentumAttacker(BaseAttacker):
+    """ Has no Pnl of its own, so the runner keeps one for it """
+
+    def __init__(self):
+        super().__init__()
+        self.last_x = None
+        self.move = 0.
+
+    def tick(self, x):
+        CrashingAttacker.seen += 1
+        if CrashingAttacker.KILL_AT is not None and CrashingAttacker.seen >= CrashingAttacker.KILL_AT:
+            os._exit(1)
+        self.move = 0. if self.last_x is None else x - self.last_x
+        self.last_x = x
+
+    def predict(self, horizon=None):
+        return 1 if self.move > 1 else -1 if self.move < -1 else 0
+
+    def to_dict(self):
+        return {'last_x': self.last_x, 'move': self.move}
+
+    @classmethod
+    def from_dict(cls, state):
+        attacker = cls()
+        attacker.last_x, attacker.move = state['last_x'], state['move']
+        return attacker
+
+
+def make_streams(num_streams=3, n=2500):
+    rng = np.random.default_rng(5)
+    return [np.cumsum(rng.standard_normal(n)) for _ in range(num_streams)]
+
+
+def make_runner(checkpoint_dir, attacker_factory=CrashingAttacker):
+    return ForgetfulRunner(attacker_factory=attacker_factory, horizon=10, checkpoint_dir=checkpoint_dir,
+                           checkpoint_every=300, keep_records=True)
+
+
+def _run_until_killed(checkpoint_dir, kill_at, attacker_factory=CrashingAttacker):
+    CrashingAttacker.KILL_AT, CrashingAttacker.seen = kill_at, 0
+    make_runner(checkpoint_dir, attacker_factory=attacker_factory).run(streams=make_streams())
+
+
+@pytest.mark.parametrize('attacker_factory', [CrashingAttacker, partial(CrashingAttacker, epsilon=0.5), CrashingMomentumAttacker])
+@pytest.mark.parametrize('kill_at', [1234, 2500, 6100])
+def test_killed_run_resumes_to_the_same_ledger(tmp_path, kill_at, attacker_factory):
+    uninterrupted = ForgetfulRunner(attacker_factory=attacker_factory, horizon=10,
+                                    keep_records=True).run(streams=make_streams())
+
+    checkpoint_dir = str(tmp_path / 'checkpoints')
+    process = multiprocessing.get_context('fork').Process(target=_run_until_killed,
+                                                          args=(checkpoint_dir, kill_at, attacker_factory))
+    process.start()
+    process.join()
+    assert process.exitcode == 1
+    checkpoint = load_checkpoint(checkpoint_dir)
+    assert checkpoint is not None
+    assert checkpoint['stream_ndx'] * 2500 + checkpoint['offset'] < kill_at
+
+    resumed = make_runner(checkpoint_dir, attacker_factory=attacker_factory).run(streams=make_streams())
+    assert resumed['records'] == uninterrupted['records']
+    assert resumed['streams'] == uninterrupted['streams']
+    assert resumed['num_points'] == uninterrupted['num_points'] == 7500
+    assert load_checkpoint(checkpoint_dir) is None
+
+
+def test_checkpoints_taken_every_so_many_points(tmp_path):
+    saved = []
+
+    class Spy(ForgetfulRunner):
+        def _save(self, stream_ndx, offset, attacker, pnl=None):
+            saved.append((stream_ndx, offset))
+            super()._save(stream_ndx=stream_ndx, offset=offset, attacker=attacker, pnl=pnl)
+
+    runner = Spy(attacker_factory=CrashingAttacker, chunk_size=100, checkpoint_dir=str(tmp_path), checkpoint_every=250)
+    runner.run(streams=make_streams(num_streams=2, n=700))
+    assert saved == [(0, 300), (0, 600), (1, 0), (1, 300), (1, 600), (2, 0)]
+    assert not os.listdir(str(tmp_path))
+
+
+def test_interrupted_write_leaves_previous_checkpoint(tmp_path):
+    directory = str(tmp_path)
+    save_checkpoint(directory, {'stream_ndx': 0, 'offset': 100})
+    # A crash between writing the temporary file and renaming it
+    with open(os.path.join(directory, PENDING_MARKER), 'w') as f:
+        f.write('200')
+    with open(os.path.join(directory, CHECKPOINT_FILE + '.tmp'), 'w') as f:
+        f.write('{"stream_ndx": 0, "off')
+    assert load_checkpoint(directory) == {'stream_ndx': 0, 'offset': 100}
+    assert sorted(os.listdir(directory)) == [CHECKPOINT_FILE]
+    clear_checkpoint(directory)
+    assert load_checkpoint(directory) is None
+
+
+def test_checkpoint_is_json(tmp_path):
+    directory = str(tmp_path)
+    state = {'stream_ndx': 2, 'offset': 0, 'attacker': CrashingAttacker().to_dict(), 'streams': [], 'records': []}
+    save_checkpoint(directory, state)
+    with open(os.path.join(directory, CHECKPOINT_FILE)) as f:
+        assert json.load(f) == state
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from endersgame.runners import forgetfulrunner
+from endersgame.runners.forgetfulrunner import OVERHEAD_BUDGET_NS, ForgetfulRunner, benchmark_overhead
+from endersgame.attackers.attacker import Attacker
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+
+
+class LastTwoAttacker(Attacker):
+
+    def __init__(self, **kwargs):
+        super().__init__(max_history_len=2, backoff=5, **kwargs)
+
+    def predict_using_history(self, xs, horizon=10):
+        return 1 if xs[-1] < xs[-2] - 1 else 0
+
+
+def make_streams(num_streams=3, n=400):
+    rng = np.random.default_rng(11)
+    return [np.cumsum(rng.standard_normal(n)) for _ in range(num_streams)]
+
+
+def expected_summaries(streams, attacker_factory=LastTwoAttacker, horizon=10):
+    summaries = []
+    for xs in streams:
+        attacker = attacker_factory()
+        for x in xs:
+            attacker.tick_and_predict(x=x, horizon=horizon)
+        summaries.append(attacker.pnl.summary())
+    return summaries
+
+
+@pytest.mark.parametrize('chunk_size', [None, 64])
+def test_forgetful_runner_starts_afresh_on_each_stream(chunk_size):
+    streams = make_streams()
+    result = ForgetfulRunner(attacker_factory=LastTwoAttacker, horizon=10, chunk_size=chunk_size).run(streams=streams)
+    assert result['streams'] == expected_summaries(streams)
+    assert result['num_streams'] == 3
+    assert result['num_points'] == 1200
+    assert result['total']['num_resolved_decisions'] == sum(s['num_resolved_decisions'] for s in result['streams'])
+    assert result['total']['total_profit'] == pytest.approx(sum(s['total_profit'] for s in result['streams']))
+    assert not result['stopped_early']
+
+
+def test_forgetful_runner_converts_arrays_in_blocks(monkeypatch):
+    monkeypatch.setattr(forgetfulrunner, 'ARRAY_BLOCK_SIZE', 7)
+    streams = make_streams()
+    assert list(forgetfulrunner._iter_values(streams[0])) == streams[0].tolist()
+    result = ForgetfulRunner(attacker_factory=LastTwoAttacker, horizon=10).run(streams=streams)
+    assert result['streams'] == expected_summaries(streams)
+
+
+def test_forgetful_runner_accepts_dict_messages():
+    streams = make_streams(num_streams=2)
+    generators = [({'x': x} for x in xs.tolist()) for xs in streams]
+    result = ForgetfulRunner(attacker_factory=LastTwoAttacker, horizon=10).run(streams=iter(generators))
+    assert result['streams'] == expected_summaries(streams)
+
+
+def test_forgetful_runner_attacker_without_pnl():
+    streams = [[1, 3, 4, 2, 4, 5, 1, 5, 2, 5, 10] * 30]
+    result = ForgetfulRunner(attacker_factory=MeanReversionAttacker, horizon=5).run(streams=streams)
+    assert result['streams'][0]['current_ndx'] == 330
+    assert result['streams'][0]['num_resolved_decisions'] > 0
+
+
+def test_forgetful_runner_early_termination():
+    streams = make_streams(num_streams=5, n=5000)
+    runner = ForgetfulRunner(attacker_factory=LastTwoAttacker, horizon=10, max_points_per_stream=300, max_streams=3)
+    result = runner.run(streams=streams)
+    assert result['num_streams'] == 3
+    assert result['num_points'] == 900
+
+    def stop_condition(stream_ndx, attacker):
+        return stream_ndx == 1 and attacker.pnl.current_ndx >= 200
+    stop_after_two = ForgetfulRunner(attacker_factory=LastTwoAttacker, horizon=10, chunk_size=100,
+                                     stop_condition=stop_condition)
+    result = stop_after_two.run(streams=streams)
+    assert result['stopped_early']
+    assert result['num_streams'] == 2
+    assert result['num_points'] == 5200
+
+
+def test_benchmark_overhead():
+    # Timings depend on the machine, so only the report is checked here. `endersgame benchmark` shows the budget.
+    report = benchmark_overhead(num_points=2000)
+    assert report['num_points'] == 2000
+    assert report['runner_ns_per_point'] > 0 and report['bare_ns_per_point'] > 0
+    assert report['overhead_ns_per_point'] == report['runner_ns_per_point'] - report['bare_ns_per_point']
+    assert report['overhead_budget_ns'] == OVERHEAD_BUDGET_NS
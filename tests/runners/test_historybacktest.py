@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from endersgame.attackers.attacker import Attacker
+from endersgame.runners.historybacktest import history_backtest, history_decisions
+
+
+class MeanGapAttacker(Attacker):
+    """
+    Buys when the last value is well below the window mean, sells when well above.
+    """
+
+    def predict_using_history(self, xs, horizon=10):
+        gap = xs[-1] - np.mean(xs)
+        return -1 if gap > 1.0 else (1 if gap < -1.0 else 0)
+
+
+class BatchMeanGapAttacker(MeanGapAttacker):
+
+    def predict_using_history_batch(self, windows, horizon=10):
+        gaps = windows[:, -1] - windows.mean(axis=1)
+        return np.where(gaps > 1.0, -1, np.where(gaps < -1.0, 1, 0))
+
+
+def random_walk(n=2000):
+    return np.cumsum(np.random.default_rng(7).standard_normal(n))
+
+
+@pytest.mark.parametrize('attacker_cls', [MeanGapAttacker, BatchMeanGapAttacker])
+@pytest.mark.parametrize('backoff', [1, 25])
+def test_history_backtest_matches_tick_and_predict(attacker_cls, backoff):
+    xs = random_walk()
+    online = attacker_cls(max_history_len=30, backoff=backoff)
+    for x in xs:
+        online.tick_and_predict(x=x, horizon=10)
+
+    pnl = history_backtest(attacker=attacker_cls(max_history_len=30, backoff=backoff), xs=xs, horizon=10)
+    assert pnl.current_ndx == len(xs)
+    assert pnl.pnl_data == online.pnl.pnl_data
+    assert pnl.pending_decisions == online.pnl.pending_decisions
+    assert pnl.summary()['num_resolved_decisions'] > 0
+
+
+def test_scalar_fallback_skips_predictions_during_backoff():
+    calls = []
+
+    class RecordingAttacker(MeanGapAttacker):
+        def predict_using_history(self, xs, horizon=10):
+            calls.append(len(xs))
+            return 1
+
+    decisions = history_decisions(attacker=RecordingAttacker(max_history_len=5, backoff=10), xs=np.arange(50.), horizon=3)
+    assert np.flatnonzero(decisions).tolist() == [4, 14, 24, 34, 44]
+    assert calls == [5] * 5
+
+
+def test_short_series():
+    decisions = history_decisions(attacker=BatchMeanGapAttacker(max_history_len=30), xs=np.arange(10.))
+    assert decisions.tolist() == [0.0] * 10
+
+
+def test_attacker_tick_and_predict_many_uses_batch():
+    xs = random_walk(500)
+    online = BatchMeanGapAttacker(max_history_len=30)
+    expected = [online.tick_and_predict(x=x, horizon=10) for x in xs]
+    chunked = BatchMeanGapAttacker(max_history_len=30)
+    decisions = np.concatenate([chunked.tick_and_predict_many(xs[k:k + 17], horizon=10) for k in range(0, len(xs), 17)])
+    np.testing.assert_array_equal(decisions, expected)
+    assert chunked.pnl.to_dict() == online.pnl.to_dict()
+    assert chunked.get_recent_history() == online.get_recent_history()
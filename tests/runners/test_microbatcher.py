@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from endersgame.examples.meanreversionattacker import MeanReversionAttacker
+from endersgame.examples.multistreammeanreversionattacker import MultiStreamMeanReversionAttacker
+from endersgame.runners.microbatcher import MicroBatcher, StreamGroup, benchmark_microbatching
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingGroup:
+
+    def __init__(self):
+        self.calls = []
+
+    def tick_and_predict_streams(self, ndxs, xs, horizon):
+        self.calls.append((ndxs.tolist(), xs.tolist()))
+        return np.sign(xs)
+
+
+def test_flushes_when_batch_is_full():
+    group = RecordingGroup()
+    batcher = MicroBatcher(groups={'g': group}, max_batch_size=3, max_delay=10, clock=FakeClock())
+    assert batcher.submit('g', 0, 1.0) == []
+    assert batcher.submit('g', 1, -2.0) == []
+    assert batcher.submit('g', 2, 3.0) == [('g', 0, 1.0, 1.0), ('g', 1, -2.0, -1.0), ('g', 2, 3.0, 1.0)]
+    assert group.calls == [([0, 1, 2], [1.0, -2.0, 3.0])]
+    assert batcher.num_pending() == 0
+
+
+def test_flushes_after_max_delay():
+    clock = FakeClock()
+    group = RecordingGroup()
+    batcher = MicroBatcher(groups={'g': group}, max_batch_size=100, max_delay=0.005, clock=clock)
+    batcher.submit('g', 0, 1.0)
+    clock.now = 0.002
+    batcher.submit('g', 1, 1.0)
+    assert batcher.poll() == []
+    clock.now = 0.006
+    assert [r[1] for r in batcher.poll()] == [0, 1]
+    assert list(batcher.latencies) == [pytest.approx(0.006), pytest.approx(0.004)]
+    assert batcher.latency_percentile(100) == pytest.approx(0.006)
+
+
+def test_repeated_stream_flushes_first_to_keep_order():
+    group = RecordingGroup()
+    batcher = MicroBatcher(groups={'g': group}, max_batch_size=100, max_delay=10, clock=FakeClock())
+    batcher.submit('g', 4, 1.0)
+    batcher.submit('g', 5, 1.0)
+    flushed = batcher.submit('g', 4, 2.0)
+    assert [(r[1], r[2]) for r in flushed] == [(4, 1.0), (5, 1.0)]
+    batcher.flush()
+    assert group.calls == [([4, 5], [1.0, 1.0]), ([4], [2.0])]
+
+
+def test_groups_are_batched_separately():
+    first, second = RecordingGroup(), RecordingGroup()
+    batcher = MicroBatcher(groups={'a': first, 'b': second}, max_batch_size=2, max_delay=10, clock=FakeClock())
+    for ndx in range(3):
+        batcher.submit('a', ndx, 1.0)
+        batcher.submit('b', ndx, -1.0)
+    batcher.flush()
+    assert first.calls == [([0, 1], [1.0, 1.0]), ([2], [1.0])]
+    assert second.calls == [([0, 1], [-1.0, -1.0]), ([2], [-1.0])]
+
+
+@pytest.mark.parametrize('max_batch_size', [1, 7, 64])
+def test_vectorized_group_matches_scalar_attackers(max_batch_size):
+    num_streams, num_rounds = 20, 60
+    rng = np.random.default_rng(1)
+    rounds = np.cumsum(3 * rng.standard_normal((num_rounds, num_streams)), axis=0)
+    scalar = MicroBatcher(groups={'mr': StreamGroup(MeanReversionAttacker, num_streams)}, max_batch_size=1)
+    vector = MicroBatcher(groups={'mr': MultiStreamMeanReversionAttacker(num_streams)}, max_batch_size=max_batch_size,
+                          max_delay=10)
+    scalar_results, vector_results = [], []
+    for xs in rounds:
+        for ndx in rng.permutation(num_streams).tolist():
+            scalar_results += scalar.submit('mr', ndx, float(xs[ndx]))
+            vector_results += vector.submit('mr', ndx, float(xs[ndx]))
+    vector_results += vector.flush()
+    assert sorted(scalar_results) == sorted(vector_results)
+    assert any(decision != 0 for *_, decision in scalar_results)
+
+
+def test_benchmark_runs():
+    report = benchmark_microbatching(num_streams=50, num_rounds=3, batch_sizes=(1, 50))
+    assert set(report['configurations']) == {'scalar', 'vectorized_1', 'vectorized_50'}
+
+
+def test_vectorized_batches_are_faster_within_latency_budget():
+    # Batches of every stream run several times faster than scalar here, with p99 latency well inside 10ms
+    report = benchmark_microbatching(num_streams=500, num_rounds=5, batch_sizes=(500,), p99_budget=0.01)
+    assert report['best_within_budget'] == 'vectorized_500'
+    assert report['speedup_vs_scalar'] > 1
+
+
+def test_latency_window_bounds_memory():
+    clock = FakeClock()
+    batcher = MicroBatcher(groups={'g': RecordingGroup()}, max_batch_size=1, max_delay=10, clock=clock,
+                           latency_window=10)
+    for k in range(100):
+        batcher.submit('g', 0, 1.0)
+    assert batcher.num_ticks == 100
+    assert len(batcher.latencies) == 10
+    assert batcher.latency_percentile(99) == pytest.approx(0)
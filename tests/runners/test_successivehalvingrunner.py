@@ -0,0 +1,70 @@
+import functools
+import numpy as np
+from endersgame.attackers.attackerwithpnl import AttackerWithPnl
+from endersgame.runners.successivehalvingrunner import SuccessiveHalvingRunner, ranking_key
+
+
+class Directional(AttackerWithPnl):
+    """
+    Trades in a fixed direction whenever the last move exceeds a threshold.
+    """
+
+    def __init__(self, direction=1, threshold=0.0, **kwargs):
+        super().__init__(backoff=10, **kwargs)
+        self.direction = direction
+        self.threshold = threshold
+        self.previous = None
+        self.move = 0.0
+
+    def tick(self, x):
+        self.move = 0.0 if self.previous is None else x - self.previous
+        self.previous = x
+
+    def predict(self, horizon=10):
+        return self.direction if abs(self.move) > self.threshold else 0
+
+
+def trending_series(n=40000):
+    rng = np.random.default_rng(2)
+    return np.cumsum(0.2 + rng.standard_normal(n))
+
+
+CANDIDATES = {f'{direction}_{threshold}': functools.partial(Directional, direction=direction, threshold=threshold)
+              for direction in [1, -1] for threshold in [0.0, 0.5, 1.0, 1.5]}
+
+
+def test_successive_halving_keeps_the_winners_and_saves_work():
+    xs = trending_series()
+    runner = SuccessiveHalvingRunner(attacker_factories=CANDIDATES, horizon=10, initial_budget=2000)
+    leaderboard = runner.run(xs=xs)
+
+    assert len(leaderboard) == len(CANDIDATES)
+    assert leaderboard[0]['name'].startswith('1_')
+    assert leaderboard[0]['current_ndx'] == len(xs)
+    assert all(entry['name'].startswith('1_') for entry in leaderboard if entry['rounds_survived'] > 1)
+    assert [len(r['candidates']) for r in runner.rounds] == [8, 4, 2, 1]
+    assert runner.points_evaluated < 0.3 * len(xs) * len(CANDIDATES)
+
+
+def test_survivors_resume_rather_than_restart():
+    xs = trending_series(10000)
+    runner = SuccessiveHalvingRunner(attacker_factories=CANDIDATES, horizon=10, initial_budget=500, min_survivors=2)
+    leaderboard = runner.run(xs=xs)
+
+    winner = leaderboard[0]
+    uninterrupted = CANDIDATES[winner['name']]()
+    for x in xs:
+        uninterrupted.tick_and_predict(x=x, horizon=10)
+    expected = uninterrupted.pnl.summary()
+    assert winner['num_resolved_decisions'] == expected['num_resolved_decisions']
+    assert np.isclose(winner['total_profit'], expected['total_profit'])
+    assert sum(entry['current_ndx'] == len(xs) for entry in leaderboard) == 2
+
+
+def test_ranking_key_orders_degenerate_summaries():
+    no_decisions = {'total_profit': 0, 'num_resolved_decisions': 0}
+    one_loss = {'total_profit': -1.0, 'standardized_profit_per_decision': float('inf')}
+    one_win = {'total_profit': 1.0, 'standardized_profit_per_decision': float('inf')}
+    typical = {'total_profit': 5.0, 'standardized_profit_per_decision': 0.2}
+    ranked = sorted([no_decisions, one_loss, one_win, typical], key=ranking_key, reverse=True)
+    assert ranked == [one_win, typical, one_loss, no_decisions]
@@ -0,0 +1,84 @@
+import functools
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+import pytest
+from endersgame.attackers.attacker import Attacker
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+from endersgame.runners import tournamentrunner
+from endersgame.runners.tournamentrunner import TournamentRunner, _share, _run_shared_job
+
+
+class DipBuyer(Attacker):
+
+    def __init__(self, threshold=1.0, **kwargs):
+        super().__init__(max_history_len=2, backoff=5, **kwargs)
+        self.threshold = threshold
+
+    def predict_using_history(self, xs, horizon=10):
+        return 1 if xs[-1] < xs[-2] - self.threshold else 0
+
+
+class RallySeller(DipBuyer):
+
+    def predict_using_history(self, xs, horizon=10):
+        return -1 if xs[-1] > xs[-2] + self.threshold else 0
+
+
+FACTORIES = {'dip': DipBuyer,
+             'dip_2': functools.partial(DipBuyer, threshold=2.0),
+             'rally': RallySeller}
+
+
+def make_streams(num_streams=3, n=1000):
+    rng = np.random.default_rng(5)
+    return [np.cumsum(rng.standard_normal(n)) for _ in range(num_streams)]
+
+
+@pytest.mark.parametrize('max_workers', [0, 2])
+def test_tournament_matches_forgetful_runner(max_workers):
+    streams = make_streams()
+    leaderboard = TournamentRunner(attacker_factories=FACTORIES, horizon=10, max_workers=max_workers).run(streams=streams)
+
+    assert sorted(entry['name'] for entry in leaderboard) == sorted(FACTORIES)
+    for entry in leaderboard:
+        expected = ForgetfulRunner(attacker_factory=FACTORIES[entry['name']], horizon=10).run(streams=streams)
+        assert entry['streams'] == expected['streams']
+        assert entry['total_profit'] == pytest.approx(expected['total']['total_profit'])
+        assert entry['num_points'] == 3000
+
+
+def test_tournament_leaderboard_is_sorted():
+    leaderboard = TournamentRunner(attacker_factories=FACTORIES, horizon=10, max_workers=0).run(streams=make_streams())
+    profits = [entry['total_profit'] for entry in leaderboard]
+    assert profits == sorted(profits, reverse=True)
+    assert len(leaderboard) == len(FACTORIES)
+
+
+class Exploder(DipBuyer):
+
+    def predict_using_history(self, xs, horizon=10):
+        raise RuntimeError('attacker failed')
+
+
+class CloseFailsOnce(SharedMemory):
+    failed = False
+
+    def close(self):
+        if not self.failed:     # As while a traceback still holds views of the block
+            self.failed = True
+            raise BufferError('cannot close exported pointers exist')
+        super().close()
+
+
+def test_worker_error_is_not_hidden_by_shared_memory_cleanup(monkeypatch):
+    with pytest.raises(RuntimeError, match='attacker failed'):
+        TournamentRunner(attacker_factories={'exploder': Exploder}, horizon=10, max_workers=2).run(streams=make_streams())
+
+    shm, handle = _share(make_streams(num_streams=1)[0])
+    try:
+        monkeypatch.setattr(tournamentrunner, '_attach', lambda name: CloseFailsOnce(name=name))
+        with pytest.raises(RuntimeError, match='attacker failed'):
+            _run_shared_job(Exploder, handle, {'horizon': 10})
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import pytest
+import endersgame
+from endersgame.__main__ import measure_import_time, DEFERRED_DEPENDENCIES
+
+
+def test_import_does_not_load_heavy_dependencies():
+    code = 'import sys, endersgame; print(",".join(m for m in %r if m in sys.modules))' % (DEFERRED_DEPENDENCIES,)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == ''
+
+
+def test_lazy_names_resolve_to_the_same_objects():
+    from endersgame.attackers.attacker import Attacker
+    from endersgame.accounting.pnl import DEFAULT_TRADE_BACKOFF
+    from endersgame.riverstats.fewmean import FEWMean
+    from endersgame.datasources.streamgeneratorgenerator import stream_generator_generator
+    assert endersgame.Attacker is Attacker
+    assert endersgame.DEFAULT_TRADE_BACKOFF == DEFAULT_TRADE_BACKOFF
+    assert endersgame.FEWMean is FEWMean
+    assert endersgame.stream_generator_generator is stream_generator_generator
+    for name in endersgame.__all__:
+        assert name in dir(endersgame)
+        assert getattr(endersgame, name) is not None
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        endersgame.NoSuchThing
+
+
+def test_import_loads_only_lightweight_modules():
+    # Asserts on what `import endersgame` loads, as its wall-clock time depends too much on the machine
+    code = 'import sys, endersgame; print(",".join(m for m in sys.modules if m.startswith("endersgame.")))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    loaded = [name for name in output.strip().split(',') if name]
+    assert all(name.startswith(('endersgame.gameconfig', 'endersgame.mixins')) for name in loaded), loaded
+
+
+def test_import_time_report():
+    report = measure_import_time()
+    assert report['deferred_dependencies_imported'] == []
+    assert report['total_ms'] > 0 and report['budget_ms'] > 0
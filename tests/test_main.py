@@ -0,0 +1,107 @@
+import json
+import numpy as np
+import pytest
+from endersgame.__main__ import main, import_attacker, load_stream
+from endersgame.examples.macdattacker import MacdAttacker
+from endersgame.runners.forgetfulrunner import ForgetfulRunner
+
+
+@pytest.fixture
+def stream_files(tmp_path):
+    rng = np.random.default_rng(8)
+    xs_1, xs_2 = np.cumsum(rng.standard_normal(1200)), np.cumsum(rng.standard_normal(900))
+    csv_path = tmp_path / 'first.csv'
+    csv_path.write_text('timestamp,value\n' + ''.join(f'{k},{x!r}\n' for k, x in enumerate(xs_1.tolist())))
+    npy_path = tmp_path / 'second.npy'
+    np.save(npy_path, xs_2)
+    return [str(csv_path), str(npy_path)], [xs_1, xs_2]
+
+
+def test_load_stream_formats(tmp_path, stream_files):
+    paths, streams = stream_files
+    assert load_stream(paths[0]).tolist() == streams[0].tolist()
+    assert load_stream(paths[1]).tolist() == streams[1].tolist()
+    bare = tmp_path / 'bare.csv'
+    bare.write_text('1.5\n2.5\n')
+    assert load_stream(str(bare)).tolist() == [1.5, 2.5]
+    headed = tmp_path / 'headed.csv'
+    headed.write_text('x\n1.5\n')
+    assert load_stream(str(headed)).tolist() == [1.5]
+
+
+def test_import_attacker():
+    assert import_attacker('endersgame.examples.macdattacker:MacdAttacker') is MacdAttacker
+    assert import_attacker('endersgame.examples.macdattacker.MacdAttacker') is MacdAttacker
+    with pytest.raises(ValueError):
+        import_attacker('MacdAttacker')
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_backtest_prints_json(capsys, stream_files, workers):
+    paths, streams = stream_files
+    argv = ['backtest', 'endersgame.examples.macdattacker:MacdAttacker', '--kwargs', '{"warmup": 100}',
+            '--workers', str(workers)]
+    for path in paths:
+        argv += ['--file', path]
+    assert main(argv) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['streams'] == paths
+    [entry] = result['leaderboard']
+    assert entry['num_points'] == 2100
+    expected = ForgetfulRunner(attacker_factory=lambda: MacdAttacker(warmup=100)).run(streams=streams)
+    assert entry['streams'][paths[0]]['total_profit'] == pytest.approx(expected['streams'][0]['total_profit'])
+    assert entry['total_profit'] == pytest.approx(expected['total']['total_profit'])
+
+
+def test_backtest_writes_output_file(tmp_path, stream_files):
+    paths, _ = stream_files
+    output = tmp_path / 'result.json'
+    assert main(['backtest', 'endersgame.examples.meanreversionattacker:MeanReversionAttacker',
+                 'endersgame.examples.macdattacker:MacdAttacker', '--file', paths[1], '--max-points', '500',
+                 '--output', str(output)]) == 0
+    result = json.loads(output.read_text())
+    assert [entry['num_points'] for entry in result['leaderboard']] == [500, 500]
+
+
+
+def test_backtest_without_losses_prints_strict_json(capsys, tmp_path):
+    path = tmp_path / 'rising.npy'
+    np.save(path, np.arange(1000.))
+    assert main(['backtest', 'endersgame.examples.macdattacker:MacdAttacker', '--kwargs', '{"warmup": 100}',
+                 '--file', str(path)]) == 0
+    out = capsys.readouterr().out
+    assert 'Infinity' not in out and 'NaN' not in out
+    [entry] = json.loads(out)['leaderboard']
+    assert entry['losses'] == 0 and entry['wins'] > 0
+    assert entry['streams'][str(path)]['win_loss_ratio'] is None
+
+def test_backtest_errors(capsys, stream_files):
+    paths, _ = stream_files
+    assert main(['backtest', 'endersgame.examples.nosuchmodule:Nope', '--file', paths[0]]) == 1
+    assert main(['backtest', 'endersgame.examples.macdattacker:MacdAttacker']) == 1
+    assert 'no streams' in capsys.readouterr().err
+    assert main([]) == 1
+
+
+def test_benchmark(capsys):
+    assert main(['benchmark', '--which', 'runner', '--num-points', '2000']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['runner']['num_points'] == 2000
+
+
+def test_convert_then_backtest_npy(capsys, tmp_path):
+    from unittest.mock import patch, MagicMock
+
+    def fake_get(url):
+        response = MagicMock()
+        response.status_code = 200 if url.endswith('stream_3_file_1.csv') else 404
+        response.content = ('value\n' + ''.join(f'{x}\n' for x in range(600))).encode('utf-8')
+        return response
+
+    with patch('requests.get', side_effect=fake_get):
+        assert main(['convert', '--stream-id', '3', '--directory', str(tmp_path)]) == 0
+    converted = json.loads(capsys.readouterr().out)
+    path = converted['streams']['train/3']['path']
+    assert converted['streams']['train/3']['length'] == 600
+    assert main(['backtest', 'endersgame.examples.macdattacker:MacdAttacker', '--file', path, '--workers', '1']) == 0
+    assert json.loads(capsys.readouterr().out)['leaderboard'][0]['num_points'] == 600